@@ -0,0 +1,46 @@
+"""Fixtures for the benchmark suite.
+
+The test database is filled once per session by ``seed_benchmark_data``.
+``BENCHMARK_SCALE`` (default ``0.01``: 50 items, 100k ledger rows) and
+``BENCHMARK_SEED`` control its size and contents, so results are only
+comparable between runs that use the same values.
+"""
+
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+
+SCALE = float(os.environ.get("BENCHMARK_SCALE", "0.01"))
+SEED = int(os.environ.get("BENCHMARK_SEED", "42"))
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        call_command(
+            "seed_benchmark_data", scale=SCALE, seed=SEED, stdout=io.StringIO()
+        )
+
+
+@pytest.fixture
+def admin_client(client, db):
+    from django.contrib.auth import get_user_model
+
+    user, _ = get_user_model().objects.get_or_create(
+        username="bench", defaults={"is_staff": True}
+    )
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def item_ids(db):
+    from inventory.models import Item
+
+    return list(Item.objects.order_by("pk").values_list("pk", flat=True)[:100])
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    output_json["dataset"] = {"scale": SCALE, "seed": SEED}
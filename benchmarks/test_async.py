@@ -0,0 +1,114 @@
+"""Concurrent requests served by one process: WSGI-style vs ASGI.
+
+A sync worker answers ``CONCURRENT_REQUESTS`` requests one after another; an
+ASGI worker with the same memory interleaves them on its event loop while the
+KPI queries run on the ``core.async_db`` pool. The local SQLite database
+answers in microseconds, so every query is delayed by ``BENCHMARK_DB_LATENCY_MS``
+(default 20 ms, a round trip to a hosted Postgres) to model the I/O wait that
+async views are meant to overlap.
+
+Like ``ASGIHandler``, each async request gets its own sync thread (and so its
+own connection). Those connections cannot see rows written inside the test's
+transaction, so the user is created with the seed data and sessions use
+signed cookies instead of the database.
+"""
+
+import asyncio
+import os
+import time
+from importlib import import_module
+
+import pytest
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings as django_settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+
+from core import async_db
+
+CONCURRENT_REQUESTS = 20
+LATENCY = float(os.environ.get("BENCHMARK_DB_LATENCY_MS", "20")) / 1000
+URLS = ["/dashboard/kpis/", "/items/search/?q=Item"]
+
+
+def _delay(execute, sql, params, many, context):
+    time.sleep(LATENCY)
+    return execute(sql, params, many, context)
+
+
+def _add_delay(sender, connection, **kwargs):
+    connection.execute_wrappers.append(_delay)
+
+
+@pytest.fixture(scope="module")
+def bench_user(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        user, _ = get_user_model().objects.get_or_create(
+            username="async-bench", defaults={"is_staff": True}
+        )
+    return user
+
+
+@pytest.fixture
+def remote_db(settings, bench_user):
+    settings.ASYNC_DB_POOL_SIZE = 4
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+    # Pool and request threads open fresh connections, which get the delay here.
+    async_db.shutdown()
+    connection_created.connect(_add_delay)
+    try:
+        with connection.execute_wrapper(_delay):
+            yield
+    finally:
+        connection_created.disconnect(_add_delay)
+        async_db.shutdown()
+
+
+def _login(client, user):
+    """Log ``client`` in without writing to the database."""
+    session = import_module(django_settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    client.cookies[django_settings.SESSION_COOKIE_NAME] = session.session_key
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", URLS)
+def test_sequential_wsgi(benchmark, remote_db, bench_user, url):
+    client = _login(Client(), bench_user)
+
+    def run():
+        for _ in range(CONCURRENT_REQUESTS):
+            assert client.get(url).status_code == 200
+
+    benchmark.extra_info["requests"] = CONCURRENT_REQUESTS
+    benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", URLS)
+def test_concurrent_asgi(benchmark, remote_db, bench_user, url):
+    client = _login(AsyncClient(), bench_user)
+
+    async def one():
+        async with ThreadSensitiveContext():
+            response = await client.get(url)
+        assert response.status_code == 200
+
+    async def burst():
+        await asyncio.gather(*(one() for _ in range(CONCURRENT_REQUESTS)))
+
+    benchmark.extra_info["requests"] = CONCURRENT_REQUESTS
+    # asyncio.run, not async_to_sync: the latter would pin every request's
+    # sync code to this thread.
+    benchmark.pedantic(lambda: asyncio.run(burst()), rounds=5, warmup_rounds=1)
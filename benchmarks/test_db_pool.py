@@ -0,0 +1,49 @@
+"""Connection checkout cost with and without the psycopg pool (PostgreSQL only).
+
+Each round does what a request does with ``CONN_MAX_AGE=0``: take a
+connection, run the hot ledger read and give the connection back. Without a
+pool that means a new (SSL) handshake every time; with one, a checkout from
+the pool. Point ``DATABASE_URL`` at the real server (e.g. Supabase) to see the
+handshake cost, which a local socket hides.
+"""
+
+import pytest
+from django.db import connection
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="needs PostgreSQL"
+)
+
+HOT_QUERY = (
+    "SELECT transaction_id, quantity_change FROM stock_transactions"
+    " WHERE item_id = %s ORDER BY transaction_date DESC LIMIT 20"
+)
+
+
+def _wrapper(alias, pool):
+    settings_dict = dict(connection.settings_dict)
+    options = dict(settings_dict.get("OPTIONS", {}))
+    options.pop("pool", None)
+    if pool:
+        options["pool"] = {"min_size": 1, "max_size": 2}
+    settings_dict.update(OPTIONS=options, CONN_MAX_AGE=0)
+    return type(connection)(settings_dict, alias=alias)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("pool", [False, True], ids=["direct", "pooled"])
+def test_request_connection(benchmark, item_ids, pool):
+    wrapper = _wrapper(f"bench_{'pooled' if pool else 'direct'}", pool)
+
+    def run():
+        with wrapper.cursor() as cursor:
+            cursor.execute(HOT_QUERY, [item_ids[0]])
+            cursor.fetchall()
+        wrapper.close()
+
+    try:
+        benchmark(run)
+    finally:
+        wrapper.close()
+        if pool:
+            wrapper.close_pool()
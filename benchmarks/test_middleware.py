@@ -0,0 +1,60 @@
+"""Per-request cost of the login check, before and after exempt short-circuiting.
+
+Requests run through the session, authentication and login middleware with a
+logged-in session cookie, so loading ``request.user`` costs what it does in
+production: a session read and a user query. ``before`` is the previous
+middleware, which loaded the user first and then tried each exempt regex in
+turn.
+"""
+
+import re
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.middleware import LoginRequiredMiddleware
+
+
+class PreviousLoginRequiredMiddleware(LoginRequiredMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.exempt_urls = [re.compile(expr) for expr in settings.LOGIN_EXEMPT_URLS]
+
+    def process_request(self, request):
+        if not request.user.is_authenticated:
+            path = request.path_info.lstrip("/")
+            for pattern in self.exempt_urls:
+                if pattern.match(path):
+                    return None
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        return None
+
+
+MIDDLEWARE = {
+    "before": PreviousLoginRequiredMiddleware,
+    "after": LoginRequiredMiddleware,
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("version", ["before", "after"])
+@pytest.mark.parametrize("path", ["/healthz", "/static/css/app.css", "/items/"])
+def test_login_check(benchmark, admin_client, version, path):
+    def view(request):
+        return HttpResponse("ok")
+
+    handler = SessionMiddleware(AuthenticationMiddleware(MIDDLEWARE[version](view)))
+    factory = RequestFactory()
+    cookie = admin_client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def run():
+        request = factory.get(path)
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+        return handler(request)
+
+    assert benchmark(run).status_code == 200
@@ -0,0 +1,97 @@
+"""Benchmarks for the hot service functions."""
+
+from decimal import Decimal
+
+import pytest
+from django.test import RequestFactory
+
+from inventory.models import Item
+from inventory.services import kpis, list_utils, ml, reorder_simulation, stock_service
+
+
+@pytest.mark.django_db
+def test_apply_stock_movements_100(benchmark, item_ids):
+    movements = [
+        {"item_id": pk, "quantity_change": Decimal("1"), "transaction_type": "ADJ"}
+        for pk in (item_ids * 100)[:100]
+    ]
+    benchmark(stock_service.apply_stock_movements, movements)
+
+
+@pytest.mark.django_db
+def test_record_stock_transaction(benchmark, item_ids):
+    benchmark(stock_service.record_stock_transaction, item_ids[0], Decimal("1"), "ADJ")
+
+
+@pytest.mark.django_db
+def test_get_stock_history(benchmark, item_ids):
+    benchmark(stock_service.get_stock_history, item_ids[0], 90)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "func",
+    [
+        kpis.stock_value,
+        kpis.receipts_last_7_days,
+        kpis.issues_last_7_days,
+        kpis.low_stock_count,
+        kpis.low_stock_items,
+        kpis.pending_po_status_counts,
+        kpis.pending_indent_counts,
+        kpis.stock_trend_last_7_days,
+        kpis.stale_items,
+    ],
+    ids=lambda f: f.__name__,
+)
+def test_kpis(benchmark, func):
+    benchmark(func)
+
+
+@pytest.mark.django_db
+def test_list_utils_filter_sort_paginate(benchmark):
+    request = RequestFactory().get(
+        "/items/", {"q": "Item", "sort": "name", "direction": "desc", "page": "2"}
+    )
+
+    def run():
+        qs, _ = list_utils.apply_filters_sort(
+            request,
+            Item.objects.all(),
+            search_fields=["name"],
+            allowed_sorts={"name", "current_stock"},
+            default_sort="name",
+        )
+        page, _ = list_utils.paginate(request, qs)
+        return list(page.object_list)
+
+    benchmark(run)
+
+
+@pytest.mark.django_db
+def test_ml_abc_classification(benchmark):
+    benchmark(ml.abc_classification)
+
+
+@pytest.mark.django_db
+def test_ml_train_models(benchmark):
+    benchmark.pedantic(ml.train_models, kwargs={"periods": 7}, rounds=3, iterations=1)
+
+
+@pytest.mark.django_db
+def test_reorder_simulation(benchmark, item_ids):
+    """100 items x 24 scenarios (8 reorder points x 3 lead times) x 200 draws."""
+    items = list(Item.objects.filter(pk__in=item_ids).order_by("pk"))
+    ids = [item.pk for item in items]
+    points, leads = reorder_simulation.scenario_grid(range(0, 80, 10), [1, 3, 7])
+
+    def run():
+        return reorder_simulation.simulate(
+            [float(item.current_stock or 0) for item in items],
+            reorder_simulation.demand_history(ids),
+            points,
+            leads,
+            seed=0,
+        )
+
+    benchmark(run)
@@ -0,0 +1,59 @@
+"""Worker boot time and memory, with and without the lazily imported deps.
+
+``lazy`` is what a gunicorn worker does today; ``eager`` also imports the
+heavy modules that are now deferred to first use, showing what each worker
+saves. Peak RSS (KiB) is reported in ``extra_info``.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+BOOT = """
+import json, resource, time
+start = time.perf_counter()
+import django
+django.setup()
+import inventory_app.wsgi, inventory_app.urls
+{extra}
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+EAGER = (
+    "import statsmodels.tsa.holtwinters, fpdf, supabase; "
+    "from inventory.services import ml, reorder_simulation; ml.SimpleExpSmoothing"
+)
+
+
+def _boot(extra):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="inventory_app.settings")
+    out = subprocess.run(
+        [sys.executable, "-c", BOOT.format(extra=extra)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("mode", ["lazy", "eager"])
+def test_worker_boot(benchmark, mode):
+    samples = []
+
+    def run():
+        samples.append(_boot(EAGER if mode == "eager" else ""))
+
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+    benchmark.extra_info["boot_seconds"] = min(s["seconds"] for s in samples)
+    benchmark.extra_info["rss_kib"] = max(s["rss_kib"] for s in samples)
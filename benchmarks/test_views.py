@@ -0,0 +1,27 @@
+"""Benchmarks for the most requested pages and endpoints."""
+
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/items/table/?q=Item&sort=name",
+        "/suppliers/table/",
+        "/dashboard/",
+        "/dashboard/kpis/",
+        "/dashboard/data/",
+        "/history-reports/",
+        "/api/items/",
+        "/api/stock-transactions/?page_size=500",
+        "/purchase-orders/",
+    ],
+)
+def test_get(benchmark, admin_client, url):
+    def run():
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        return response
+
+    benchmark(run)
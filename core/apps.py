@@ -1,6 +1,7 @@
 """Core application configuration."""
 
 from django.apps import AppConfig
+from django.core.signals import request_finished
 from django.db.models.signals import post_migrate
 
 
@@ -23,6 +24,9 @@ class CoreConfig(AppConfig):
     def ready(self):  # pragma: no cover - executed via Django startup
         """Connect signal handlers when the app is ready."""
 
+        from . import metrics
+
         post_migrate.connect(
             _create_admin_user, dispatch_uid="core.create_admin_user"
         )
+        request_finished.connect(metrics.maybe_flush, dispatch_uid="core.metrics_flush")
@@ -0,0 +1,79 @@
+"""Run independent ORM calls concurrently from async views.
+
+Django's async ORM methods (``acount``, ``aget``, ``async for``...) all run on
+the request's one sync thread, so awaiting several of them with
+``asyncio.gather`` still executes them one after another. :func:`gather` runs
+each call in a small shared thread pool instead. Every pool thread keeps its
+own database connection, so ``ASYNC_DB_POOL_SIZE`` (per worker process) bounds
+how many extra connections concurrent requests can open; calls beyond it wait
+for a free thread. Set it to ``0`` to run the calls sequentially on the
+request's thread, e.g. in tests that run inside a transaction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    return getattr(settings, "ASYNC_DB_POOL_SIZE", 4)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=pool_size(), thread_name_prefix="async-db"
+            )
+        return _executor
+
+
+def _call(func: Callable, args, kwargs) -> Any:
+    # Pool threads outlive requests, so apply CONN_MAX_AGE and drop broken
+    # connections the way request_started/request_finished would.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run(func: Callable, *args, **kwargs) -> Any:
+    """Run the sync ORM callable ``func`` in the bounded pool."""
+    if pool_size() <= 0:
+        return await sync_to_async(func)(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _get_executor(),
+        functools.partial(context.run, _call, func, args, kwargs),
+    )
+
+
+async def gather(*funcs: Callable) -> List[Any]:
+    """Call each zero-argument ``funcs`` concurrently and return their results."""
+    if pool_size() <= 0:
+        return [await run(func) for func in funcs]
+    return list(await asyncio.gather(*(run(func) for func in funcs)))
+
+
+def shutdown() -> None:
+    """Stop the pool; it is recreated on next use."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,112 @@
+"""Helpers for the shared cache configured in ``settings.CACHES``.
+
+Production uses Redis (``CACHE_URL``) with :class:`CompressedRedisSerializer`,
+which zlib-compresses large values such as forecasts and rendered fragments.
+Without ``CACHE_URL`` the cache lives in files under ``CACHE_DIR``; Django's
+file backend compresses every value already. :func:`cache_stats` describes
+either backend for the staff cache page.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache, RedisSerializer
+
+# Pickles start with b"\x80" and integers are stored as digits, so this
+# prefix cannot be mistaken for an uncompressed value.
+COMPRESSED_PREFIX = b"z:"
+
+
+class CompressedRedisSerializer(RedisSerializer):
+    """Pickle values and compress those of ``CACHE_COMPRESS_MIN_BYTES`` or more."""
+
+    def __init__(self, protocol=None):
+        super().__init__(protocol)
+        self.min_bytes = getattr(settings, "CACHE_COMPRESS_MIN_BYTES", 1024)
+
+    def dumps(self, obj):
+        data = super().dumps(obj)
+        if isinstance(data, bytes) and len(data) >= self.min_bytes:
+            return COMPRESSED_PREFIX + zlib.compress(data)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, bytes) and data.startswith(COMPRESSED_PREFIX):
+            data = zlib.decompress(data.removeprefix(COMPRESSED_PREFIX))
+        return super().loads(data)
+
+
+def _redis_stats(backend: RedisCache) -> List[Tuple[str, Any]]:
+    info = backend._cache.get_client().info()
+    hits, misses = info.get("keyspace_hits", 0), info.get("keyspace_misses", 0)
+    keys = sum(
+        db.get("keys", 0)
+        for name, db in info.items()
+        if name.startswith("db") and isinstance(db, dict)
+    )
+    return [
+        ("Keys", keys),
+        ("Memory used", info.get("used_memory_human")),
+        ("Memory limit", info.get("maxmemory_human")),
+        ("Eviction policy", info.get("maxmemory_policy")),
+        ("Hits", hits),
+        ("Misses", misses),
+        ("Hit ratio", f"{hits / (hits + misses):.1%}" if hits + misses else "-"),
+        ("Evicted keys", info.get("evicted_keys")),
+        ("Expired keys", info.get("expired_keys")),
+        ("Connected clients", info.get("connected_clients")),
+    ]
+
+
+def _file_stats(backend: FileBasedCache) -> List[Tuple[str, Any]]:
+    files = backend._list_cache_files()
+    size = 0
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                size += f.seek(0, 2)
+        except OSError:  # culled or expired concurrently
+            pass
+    return [
+        ("Entries", len(files)),
+        ("Entry limit", backend._max_entries),
+        ("Size on disk", f"{size / 1024:.1f} KiB"),
+    ]
+
+
+def cache_stats(backend=None) -> Dict[str, Any]:
+    """Return the configuration and live statistics of a cache backend.
+
+    ``stats`` is a list of ``(label, value)`` pairs that depends on the
+    backend; it is empty for backends without introspection.
+    """
+    backend = backend or caches[DEFAULT_CACHE_ALIAS]
+    stats: List[Tuple[str, Any]] = []
+    error = ""
+    try:
+        if isinstance(backend, RedisCache):
+            stats = _redis_stats(backend)
+        elif isinstance(backend, FileBasedCache):
+            stats = _file_stats(backend)
+        elif isinstance(backend, LocMemCache):
+            stats = [
+                ("Entries", len(backend._cache)),
+                ("Entry limit", backend._max_entries),
+            ]
+    except Exception as exc:  # the page should still load when Redis is down
+        error = str(exc)
+    cls = type(backend)
+    return {
+        "backend": f"{cls.__module__}.{cls.__qualname__}",
+        "key_prefix": backend.key_prefix,
+        "version": backend.version,
+        "default_timeout": backend.default_timeout,
+        "stats": stats,
+        "error": error,
+    }
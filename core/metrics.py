@@ -0,0 +1,540 @@
+"""Lightweight in-process metrics with multi-worker aggregation.
+
+Counters, gauges and histograms live in plain Python attributes, so recording a
+sample is a single attribute update (well under a microsecond) with no locks or
+I/O on the hot path. Define metrics at module import time and instrument code
+with them::
+
+    SALES = metrics.counter("inventory_sales_total", "Recorded sales.")
+    GRN_SECONDS = metrics.histogram("inventory_create_grn_seconds", "create_grn latency.")
+
+    @GRN_SECONDS.time()
+    def create_grn(...): ...
+
+Each worker process periodically writes a snapshot of its values to
+``METRICS_DIR/metrics_<pid>.json`` (at most every ``METRICS_FLUSH_INTERVAL``
+seconds, after a request finishes, and at exit once it has served one).
+:func:`render` folds the snapshots of exited workers into one aggregate file
+and deletes them, then sums counters and histograms over the aggregate and the
+live workers, so totals survive worker restarts without the directory growing,
+and reports gauges per live worker. Without ``METRICS_DIR`` only the
+current process is reported, which is what ``runserver`` and tests need.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import fcntl
+import functools
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry: Dict[str, "_Metric"] = {}
+_last_flush = 0.0
+_flushed = False
+_exit_flush = False
+
+# Counters and histograms of exited processes, summed (see _fold).
+AGGREGATE_FILE = "metrics_aggregate.json"
+
+
+class _Metric:
+    """Base class for a named metric with an optional fixed set of labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.label_names:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def labels(self, *values: str):
+        """Return the child for ``values``; cache it in hot code paths."""
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        for child in self._children.values():
+            child.reset()
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labels": list(self.label_names),
+            "samples": [
+                [list(key), child.snapshot()] for key, child in self._children.items()
+            ],
+        }
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def reset(self) -> None:
+        self.value = 0.0
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Counter(_Metric):
+    """Monotonic count, summed across workers."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """Point-in-time value, reported per live worker with a ``pid`` label."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value: float) -> None:
+        self._default.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.value -= amount
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def snapshot(self) -> dict:
+        return {"counts": list(self.counts), "sum": self.sum}
+
+    def time(self):
+        """Decorator recording the wrapped function's duration, even on error."""
+        return _timed(self.observe)
+
+
+def _timed(observe):
+    clock = time.perf_counter
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(clock() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds by default) in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labels)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        """Decorator recording the wrapped function's duration, even on error."""
+        if self.label_names:
+            raise ValueError(f"{self.name} has labels; time a child instead")
+        return _timed(self._default.observe)
+
+
+def _register(cls, name: str, *args, **kwargs):
+    metric = _registry.get(name)
+    if metric is None:
+        metric = _registry[name] = cls(name, *args, **kwargs)
+    elif not isinstance(metric, cls):
+        raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+    return metric
+
+
+def counter(name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+    """Return the counter ``name``, registering it on first use."""
+    return _register(Counter, name, documentation, labels)
+
+
+def gauge(name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+    """Return the gauge ``name``, registering it on first use."""
+    return _register(Gauge, name, documentation, labels)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labels: Sequence[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    """Return the histogram ``name``, registering it on first use."""
+    return _register(Histogram, name, documentation, labels, buckets=buckets)
+
+
+def reset() -> None:
+    """Zero every metric in this process."""
+    for metric in _registry.values():
+        metric.reset()
+
+
+# Values recorded in a preloading parent (e.g. during warmup) must not be
+# counted again by every forked worker.
+def _after_fork() -> None:
+    global _flushed
+    reset()
+    _flushed = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+# ---------------------------------------------------------------------------
+# Multiprocess snapshots
+# ---------------------------------------------------------------------------
+
+
+def _metrics_dir() -> Optional[str]:
+    return getattr(settings, "METRICS_DIR", None) or None
+
+
+def _snapshot() -> dict:
+    return {
+        "pid": os.getpid(),
+        "metrics": {name: m.snapshot() for name, m in _registry.items()},
+    }
+
+
+def _snapshot_name(pid: int) -> str:
+    return f"metrics_{pid}.json"
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Serialize folding of snapshots between the processes sharing ``directory``."""
+    with open(os.path.join(directory, ".metrics.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _read(path: str) -> Optional[dict]:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(directory: str, name: str, snapshot: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp_metrics_")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(snapshot, fh)
+    os.replace(tmp, os.path.join(directory, name))
+
+
+def _add_samples(target: Dict[str, dict], snapshot: dict) -> None:
+    """Add the counters and histograms of ``snapshot`` to ``target``; drop gauges."""
+    for name, data in snapshot.get("metrics", {}).items():
+        if data["kind"] == "gauge":
+            continue
+        entry = target.setdefault(
+            name,
+            {
+                "kind": data["kind"],
+                "help": data["help"],
+                "labels": data["labels"],
+                "samples": [],
+            },
+        )
+        index = {tuple(key): i for i, (key, _) in enumerate(entry["samples"])}
+        for key, value in data["samples"]:
+            i = index.get(tuple(key))
+            if i is None:
+                index[tuple(key)] = len(entry["samples"])
+                entry["samples"].append([list(key), value])
+            elif data["kind"] == "counter":
+                entry["samples"][i][1] += value
+            else:
+                total = entry["samples"][i][1]
+                if len(total["counts"]) != len(value["counts"]):
+                    continue  # buckets changed between deploys
+                total["counts"] = [
+                    a + b for a, b in zip(total["counts"], value["counts"])
+                ]
+                total["sum"] += value["sum"]
+
+
+def _fold(directory: str, names: Iterable[str]) -> None:
+    """Add the snapshots ``names`` to the aggregate of exited processes and delete them.
+
+    Counters and histograms of processes that are gone live on in
+    ``AGGREGATE_FILE``, so totals never go backwards and the directory holds
+    one file per live process plus the aggregate.
+    """
+    with _directory_lock(directory):
+        aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+        aggregate = _read(aggregate_path) or {"pid": None, "metrics": {}}
+        paths = []
+        for name in names:
+            path = os.path.join(directory, name)
+            snapshot = _read(path)  # None if another process folded it first
+            if snapshot is not None:
+                _add_samples(aggregate["metrics"], snapshot)
+                paths.append(path)
+        if not paths:
+            return
+        _write(directory, AGGREGATE_FILE, aggregate)
+        for path in paths:
+            os.unlink(path)
+
+
+def flush() -> None:
+    """Write this process's snapshot to ``METRICS_DIR`` atomically.
+
+    On the first flush an existing file for this pid belongs to an exited
+    process whose pid was reused; it is folded into the aggregate first.
+    """
+    global _last_flush, _flushed
+    directory = _metrics_dir()
+    if not directory:
+        return
+    _last_flush = time.monotonic()
+    name = _snapshot_name(os.getpid())
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if not _flushed and os.path.exists(os.path.join(directory, name)):
+            _fold(directory, [name])
+        _flushed = True
+        _write(directory, name, _snapshot())
+    except OSError:
+        logger.exception("Failed to write metrics snapshot")
+
+
+def maybe_flush(**kwargs) -> None:
+    """Flush if ``METRICS_FLUSH_INTERVAL`` seconds passed; a signal receiver.
+
+    The first call also flushes at exit, so only processes that serve
+    requests (not every ``manage.py`` run) leave a snapshot behind.
+    """
+    global _exit_flush
+    if not _exit_flush:
+        atexit.register(flush)
+        _exit_flush = True
+    interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0)
+    if time.monotonic() - _last_flush >= interval:
+        flush()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_snapshots() -> List[dict]:
+    """Return this process's snapshot, the live workers' and the aggregate.
+
+    Snapshots of exited workers are folded into the aggregate on the way.
+    """
+    snapshots = [_snapshot()]
+    directory = _metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return snapshots
+    own = _snapshot_name(os.getpid())
+    live, dead = [], []
+    for name in os.listdir(directory):
+        if not name.startswith("metrics_") or name in (own, AGGREGATE_FILE):
+            continue
+        try:
+            pid = int(name.removeprefix("metrics_").removesuffix(".json"))
+        except ValueError:
+            continue
+        (live if _pid_alive(pid) else dead).append(name)
+    if dead:
+        try:
+            _fold(directory, dead)
+        except OSError:
+            logger.exception("Failed to fold metrics snapshots")
+    for name in live + [AGGREGATE_FILE]:
+        snapshot = _read(os.path.join(directory, name))
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render() -> str:
+    """Return all metrics in the Prometheus text exposition format."""
+    merged: Dict[str, dict] = {}
+    for snap in _load_snapshots():
+        pid = snap.get("pid")
+        alive = pid is not None and (pid == os.getpid() or _pid_alive(pid))
+        for name, data in snap.get("metrics", {}).items():
+            entry = merged.setdefault(
+                name,
+                {
+                    "kind": data["kind"],
+                    "help": data["help"],
+                    "labels": data["labels"],
+                    "series": {},
+                },
+            )
+            series = entry["series"]
+            for key, value in data["samples"]:
+                if data["kind"] == "gauge":
+                    if alive:
+                        series[tuple(key) + (str(pid),)] = value
+                    continue
+                key = tuple(key)
+                if data["kind"] == "counter":
+                    series[key] = series.get(key, 0.0) + value
+                    continue
+                total = series.setdefault(
+                    key, {"counts": [0] * len(value["counts"]), "sum": 0.0}
+                )
+                if len(total["counts"]) != len(value["counts"]):
+                    continue  # buckets changed between deploys
+                total["counts"] = [
+                    a + b for a, b in zip(total["counts"], value["counts"])
+                ]
+                total["sum"] += value["sum"]
+
+    lines: List[str] = []
+    for name in sorted(merged):
+        entry = merged[name]
+        kind, label_names = entry["kind"], entry["labels"]
+        lines.append(f"# HELP {name} {_escape(entry['help'])}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, value in sorted(entry["series"].items()):
+            if kind == "gauge":
+                labels = _labels(label_names + ["pid"], key)
+                lines.append(f"{name}{labels} {_number(value)}")
+            elif kind == "counter":
+                lines.append(f"{name}{_labels(label_names, key)} {_number(value)}")
+            else:
+                bounds = list(_registry[name].buckets) if name in _registry else []
+                bounds += [math.inf]
+                cumulative = 0
+                for bound, count in zip(bounds, value["counts"]):
+                    cumulative += count
+                    le = _labels(label_names, key, f'le="{_number(bound)}"')
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                labels = _labels(label_names, key)
+                lines.append(f"{name}_sum{labels} {_number(value['sum'])}")
+                lines.append(f"{name}_count{labels} {cumulative}")
+    return "\n".join(lines) + "\n"
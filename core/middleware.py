@@ -1,21 +1,219 @@
+import logging
+import random
 import re
+import time
+from contextlib import ExitStack
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.auth.views import redirect_to_login
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
 
+from . import profiling, query_budget
 
-class LoginRequiredMiddleware:
-    """Redirect unauthenticated users to the login page."""
+logger = logging.getLogger("core.query_budget")
+
+
+def exempt_pattern(expressions):
+    """Return one regex matching any of ``expressions``, or ``None`` if empty."""
+    if not expressions:
+        return None
+    return re.compile("|".join(f"(?:{expr})" for expr in expressions))
+
+
+class LoginRequiredMiddleware(MiddlewareMixin):
+    """Redirect unauthenticated users to the login page.
+
+    ``LOGIN_EXEMPT_URLS`` are combined into one compiled alternation and
+    checked first, so exempt requests such as ``/healthz`` and ``/static/``
+    never load the session or the user.
+    """
 
     def __init__(self, get_response):
-        self.get_response = get_response
-        self.exempt_urls = [re.compile(expr) for expr in getattr(settings, "LOGIN_EXEMPT_URLS", [])]
+        super().__init__(get_response)
+        self.exempt_urls = exempt_pattern(getattr(settings, "LOGIN_EXEMPT_URLS", []))
 
-    def __call__(self, request):
+    def process_request(self, request):
+        if self.exempt_urls and self.exempt_urls.match(request.path_info.lstrip("/")):
+            return None
         if not request.user.is_authenticated:
-            path = request.path_info.lstrip("/")
-            for pattern in self.exempt_urls:
-                if pattern.match(path):
-                    return self.get_response(request)
             return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
-        return self.get_response(request)
+        return None
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """Count queries and DB time per request and flag N+1 patterns.
+
+    Adds a ``Server-Timing`` header (``db`` and ``total`` durations) when
+    ``QUERY_BUDGET_SERVER_TIMING`` is true, which defaults to ``DEBUG`` since
+    the header shows every client the query counts. Logs a warning when a
+    request runs more queries than the view's declared :func:`~core.query_budget.query_budget`
+    (or ``QUERY_BUDGET_DEFAULT``), or repeats one SQL shape at least
+    ``QUERY_BUDGET_REPEAT_THRESHOLD`` times.
+
+    Under ASGI the hooks run on the request's sync thread, which is also where
+    the async ORM methods execute. Queries sent through
+    :func:`core.async_db.gather` run on pool threads and are not counted.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.default_budget = getattr(settings, "QUERY_BUDGET_DEFAULT", 50)
+        self.repeat_threshold = getattr(settings, "QUERY_BUDGET_REPEAT_THRESHOLD", 10)
+        self.server_timing = getattr(
+            settings, "QUERY_BUDGET_SERVER_TIMING", settings.DEBUG
+        )
+
+    def process_request(self, request):
+        collector = query_budget.QueryCollector()
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(collector))
+        request._query_collector = (collector, stack, time.perf_counter())
+
+    def process_response(self, request, response):
+        state = getattr(request, "_query_collector", None)
+        if state is None:
+            return response
+        collector, stack, start = state
+        stack.close()
+        total = time.perf_counter() - start
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={collector.duration * 1000:.1f};desc="{collector.count} queries", '
+                f"total;dur={total * 1000:.1f}"
+            )
+        budget = getattr(request, "_query_budget", None)
+        self._check(
+            request, collector, budget or self.default_budget, budget is not None
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = query_budget.declared_budget(view_func)
+
+    def _check(self, request, collector, budget, declared):
+        repeated = collector.repeated(self.repeat_threshold)
+        for sql, count in repeated:
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s",
+                request.method,
+                request.path,
+                count,
+                sql,
+            )
+        if collector.count <= budget:
+            return
+        logger.warning(
+            "Query budget exceeded on %s %s: %d queries (budget %d), %.1f ms in DB",
+            request.method,
+            request.path,
+            collector.count,
+            budget,
+            collector.duration * 1000,
+        )
+        if declared and query_budget.recording:
+            query_budget.violations.append(
+                {
+                    "path": request.path,
+                    "method": request.method,
+                    "count": collector.count,
+                    "budget": budget,
+                    "repeated": repeated,
+                }
+            )
+
+
+class ProfilingMiddleware:
+    """Capture cProfile profiles of selected requests into the profile ring.
+
+    Staff users can ask for a profile with an ``X-Profile: 1`` header or a
+    ``?_profile=1`` query parameter. When ``PROFILING_SLOW_MS`` is set, a
+    ``PROFILING_SAMPLE_RATE`` fraction of all requests is profiled and kept
+    only if it took at least that long. The profile id is returned in the
+    ``X-Profile-Id`` response header.
+    """
+
+    TRUE_VALUES = {"1", "true", "yes"}
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "PROFILING_SLOW_MS", 0)
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        forced = self._flagged(request) and self._is_staff(
+            getattr(request, "user", None)
+        )
+        if not forced and not self._sampled():
+            return self.get_response(request)
+        profiler = profiling.start()
+        if profiler is None:
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            profiler.disable()
+            raise
+        return self._finish(request, response, profiler, start, forced)
+
+    async def __acall__(self, request):
+        # cProfile only sees the thread it was enabled on, so under ASGI the
+        # profile covers the event loop (async views, rendering) and not work
+        # handed to sync threads. The user is only loaded for flagged requests.
+        forced = self._flagged(request) and await self._ais_staff(request)
+        if not forced and not self._sampled():
+            return await self.get_response(request)
+        profiler = profiling.start()
+        if profiler is None:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            profiler.disable()
+            raise
+        return await sync_to_async(self._finish)(
+            request, response, profiler, start, forced
+        )
+
+    def _sampled(self):
+        return bool(self.slow_ms) and random.random() < self.sample_rate
+
+    def _finish(self, request, response, profiler, start, forced):
+        duration_ms = (time.perf_counter() - start) * 1000
+        if not forced and duration_ms < self.slow_ms:
+            profiler.disable()
+            return response
+        response["X-Profile-Id"] = profiling.save(
+            profiler,
+            kind="request",
+            label=f"{request.method} {request.get_full_path()}",
+            trigger="requested" if forced else "slow",
+            status=response.status_code,
+            duration_ms=round(duration_ms, 1),
+            user=request.user.get_username() if request.user.is_authenticated else "",
+        )
+        return response
+
+    def _flagged(self, request):
+        flag = request.headers.get("X-Profile") or request.GET.get("_profile")
+        return bool(flag) and flag.lower() in self.TRUE_VALUES
+
+    @staticmethod
+    def _is_staff(user):
+        return bool(user and user.is_active and user.is_staff)
+
+    async def _ais_staff(self, request):
+        if hasattr(request, "auser"):
+            return self._is_staff(await request.auser())
+        return await sync_to_async(self._is_staff)(getattr(request, "user", None))
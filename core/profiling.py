@@ -0,0 +1,192 @@
+"""On-demand cProfile capture for requests and management commands.
+
+Profiles are written to ``PROFILING_DIR`` as a pstats dump (``<id>.prof``)
+plus a small JSON sidecar (``<id>.json``) describing what was profiled. The
+directory is a bounded ring: after each save only the newest
+``PROFILING_KEEP`` profiles are kept.
+
+Requests are profiled by :class:`core.middleware.ProfilingMiddleware`;
+management commands subclassing :class:`ProfiledCommand` accept ``--profile``.
+Saved profiles are listed at ``/admin/profiles/`` and download as pstats or
+speedscope JSON (https://www.speedscope.app).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+_ID = re.compile(r"^[0-9]{14}-[0-9a-f]{8}$")
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, "PROFILING_DIR", None) or "profiles")
+
+
+def valid_id(profile_id: str) -> bool:
+    return bool(_ID.match(profile_id))
+
+
+def start() -> Optional[cProfile.Profile]:
+    """Return an enabled profiler, or ``None`` if one is already running."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler is active on this thread
+        return None
+    return profiler
+
+
+def save(profiler: cProfile.Profile, *, kind: str, label: str, **meta: Any) -> str:
+    """Store ``profiler``'s stats in the ring and return the profile id."""
+    profiler.disable()
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    meta.update(
+        {"id": profile_id, "kind": kind, "label": label, "created": time.time()}
+    )
+    (directory / f"{profile_id}.json").write_text(json.dumps(meta))
+    _prune(directory)
+    return profile_id
+
+
+def _prune(directory: Path) -> None:
+    keep = getattr(settings, "PROFILING_KEEP", 50)
+    sidecars = sorted(directory.glob("*.json"))
+    for sidecar in sidecars[: max(0, len(sidecars) - keep)]:
+        for path in (sidecar, sidecar.with_suffix(".prof")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Return profile metadata, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for sidecar in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            profiles.append(json.loads(sidecar.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def stats_path(profile_id: str) -> Optional[Path]:
+    if not valid_id(profile_id):
+        return None
+    path = profile_dir() / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def to_speedscope(path: Path, name: str = "profile") -> Dict[str, Any]:
+    """Convert a pstats dump into a speedscope "sampled" profile.
+
+    cProfile records a call graph, not stacks, so stacks are rebuilt top-down
+    from the root functions, splitting each callee's time between its callers
+    in proportion to the time spent under each call edge.
+    """
+    stats = pstats.Stats(str(path)).stats
+    callees: Dict[tuple, Dict[tuple, float]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    frames: List[Dict[str, Any]] = []
+    index: Dict[tuple, int] = {}
+
+    def frame(func):
+        if func not in index:
+            filename, line, fname = func
+            index[func] = len(frames)
+            frames.append({"name": fname, "file": filename, "line": line})
+        return index[func]
+
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    roots = [f for f, data in stats.items() if not data[4]]
+    # Paths worth less than this are dropped to keep deep call graphs bounded.
+    cutoff = sum(stats[f][3] for f in roots) * 1e-4
+
+    def expand(func, share, stack, on_stack):
+        stack = stack + [frame(func)]
+        self_time = stats[func][2] * share
+        if self_time > 0:
+            samples.append(stack)
+            weights.append(self_time)
+        for callee, edge_ct in callees.get(func, {}).items():
+            total = stats[callee][3]
+            if callee in on_stack or not total or edge_ct * share < cutoff:
+                continue
+            expand(callee, share * edge_ct / total, stack, on_stack | {callee})
+
+    for root in roots:
+        expand(root, 1.0, [], {root})
+
+    total = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "inventory-app",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+class ProfiledCommand(BaseCommand):
+    """``BaseCommand`` that adds ``--profile`` to record a cProfile run."""
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Profile the command with cProfile and store it in PROFILING_DIR.",
+        )
+        self._name = subcommand
+        return parser
+
+    def execute(self, *args, **options):
+        if not options.pop("profile", False):
+            return super().execute(*args, **options)
+        profiler = start()
+        if profiler is None:
+            return super().execute(*args, **options)
+        started = time.perf_counter()
+        try:
+            return super().execute(*args, **options)
+        finally:
+            profile_id = save(
+                profiler,
+                kind="command",
+                label=getattr(self, "_name", type(self).__module__.rsplit(".", 1)[-1]),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            self.stderr.write(f"Profile saved: {profile_dir() / profile_id}.prof")
@@ -0,0 +1,31 @@
+"""Pytest plugin failing tests whose requests exceed a view's query budget.
+
+Enable with ``-p core.pytest_plugin`` (set in ``pytest.ini``). Budgets are
+declared on views with :func:`core.query_budget.query_budget`; requests made
+through the Django test client are checked by ``QueryBudgetMiddleware``.
+"""
+
+import pytest
+
+from core import query_budget
+
+
+def pytest_configure(config):
+    query_budget.recording = True
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_budgets():
+    query_budget.violations.clear()
+    yield
+    if not query_budget.violations:
+        return
+    lines = []
+    for v in query_budget.violations:
+        lines.append(
+            f"{v['method']} {v['path']} ran {v['count']} queries "
+            f"(budget {v['budget']})"
+        )
+        lines.extend(f"    {count} x {sql}" for sql, count in v["repeated"])
+    query_budget.violations.clear()
+    pytest.fail("Query budget exceeded:\n" + "\n".join(lines), pytrace=False)
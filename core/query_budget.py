@@ -0,0 +1,84 @@
+"""Per-request query accounting used by :class:`core.middleware.QueryBudgetMiddleware`.
+
+Every query run while a :class:`QueryCollector` is installed with
+``connection.execute_wrapper`` is counted, timed and reduced to a fingerprint
+(the SQL with ``IN`` lists and inline numbers collapsed). A fingerprint that
+repeats many times within one request is the signature of an N+1 loop.
+
+Views declare their budget with :func:`query_budget`; the middleware logs
+requests that exceed it and, while :data:`recording` is on (the pytest plugin
+in :mod:`core.pytest_plugin` turns it on), records them in :data:`violations`.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+# Set by the pytest plugin so over-budget requests fail the current test.
+recording = False
+violations: List[Dict[str, Any]] = []
+
+
+def fingerprint(sql: str) -> str:
+    """Return ``sql`` with parameter lists and literals normalised."""
+    sql = _IN_LIST.sub("(%s, ...)", sql)
+    sql = _NUMBER.sub("N", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryCollector:
+    """``execute_wrapper`` callable counting queries and their duration."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def __call__(self, execute: Callable, sql: str, params, many: bool, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Return ``(fingerprint, count)`` for shapes run ``threshold``+ times."""
+        return [(sql, n) for sql, n in self.shapes.most_common() if n >= threshold]
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the maximum number of queries a view may run per request.
+
+    Works on function views and on view classes (including DRF viewsets)::
+
+        @query_budget(8)
+        def dashboard_kpis(request): ...
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def declared_budget(view_func: Callable) -> Optional[int]:
+    """Return the budget declared on a resolved view function, if any."""
+    for target in (
+        view_func,
+        getattr(view_func, "view_class", None),
+        getattr(view_func, "cls", None),
+    ):
+        budget = getattr(target, "query_budget", None)
+        if budget is not None:
+            return budget
+    return None
@@ -1,16 +1,30 @@
+import ipaddress
 import json
 from decimal import Decimal
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
 from django.contrib.auth.forms import AuthenticationForm
-from django.http import HttpResponse, JsonResponse
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+)
 from django.shortcuts import redirect, render
 from django.utils.dateparse import parse_date
 from django.db.models import Sum
 from django.db.models.functions import TruncDate
 
+from core import async_db, metrics, profiling
+from core.cache import cache_stats
+from core.query_budget import query_budget
 from inventory.models import Item, Supplier, StockTransaction, PurchaseOrder
 from inventory.services import counts, dashboard_service, kpis
+from inventory.views.conditional import conditional_on
 
 
 def root_view(request):
@@ -43,6 +57,35 @@ def health_check(request):
     return HttpResponse("ok")
 
 
+def _from_local_network(request) -> bool:
+    """Return True if the client and every proxy hop are in METRICS_ALLOWED_NETWORKS."""
+    hops = [request.META.get("REMOTE_ADDR", "")]
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    hops += [addr.strip() for addr in forwarded.split(",") if addr.strip()]
+    networks = [ipaddress.ip_network(n) for n in settings.METRICS_ALLOWED_NETWORKS]
+    for hop in hops:
+        try:
+            address = ipaddress.ip_address(hop)
+        except ValueError:
+            return False
+        if not any(address in network for network in networks):
+            return False
+    return True
+
+
+def metrics_view(request):
+    """Expose metrics in Prometheus text format.
+
+    Scrapers on the local network need no login; anyone else must be staff.
+    """
+    if not _from_local_network(request):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        if not request.user.is_staff:
+            return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 def dashboard(request):
     """Render dashboard shell; KPI cards are loaded asynchronously."""
     labels, values = kpis.stock_trend_last_7_days()
@@ -54,19 +97,30 @@ def dashboard(request):
     return render(request, "core/dashboard.html", context)
 
 
-def dashboard_kpis(request):
-    """HTMX endpoint returning KPI card values."""
+@query_budget(10)
+@conditional_on("items", "suppliers", "indents")
+async def dashboard_kpis(request):
+    """HTMX endpoint returning KPI card values.
+
+    The independent KPI queries run concurrently (see :mod:`core.async_db`).
+    """
+    items, low_stock, suppliers, pending = await async_db.gather(
+        counts.item_count,
+        kpis.low_stock_count,
+        counts.supplier_count,
+        kpis.pending_indent_counts,
+    )
     data = {
-        "items": counts.item_count(),
-        "low_stock": kpis.low_stock_count(),
-        "suppliers": counts.supplier_count(),
-        "pending_indents": sum(kpis.pending_indent_counts().values()),
+        "items": items,
+        "low_stock": low_stock,
+        "suppliers": suppliers,
+        "pending_indents": sum(pending.values()),
     }
     return render(request, "core/_kpi_cards.html", data)
 
 
-def _stock_trend_data(item_id=None, supplier_id=None, start=None, end=None):
-    """Return stock transaction totals grouped by day."""
+def _stock_trend_rows(item_id=None, supplier_id=None, start=None, end=None):
+    """Return a queryset of stock transaction totals grouped by day."""
     qs = StockTransaction.objects.all()
     if item_id:
         qs = qs.filter(item_id=item_id)
@@ -80,17 +134,25 @@ def _stock_trend_data(item_id=None, supplier_id=None, start=None, end=None):
     if end:
         qs = qs.filter(transaction_date__date__lte=end)
 
-    data = (
+    return (
         qs.annotate(day=TruncDate("transaction_date"))
         .values("day")
         .order_by("day")
         .annotate(total=Sum("quantity_change"))
     )
-    labels = [d["day"].strftime("%Y-%m-%d") for d in data]
-    values = [float(d["total"]) for d in data]
+
+
+def _trend_series(rows):
+    labels = [d["day"].strftime("%Y-%m-%d") for d in rows]
+    values = [float(d["total"]) for d in rows]
     return labels, values
 
 
+def _stock_trend_data(item_id=None, supplier_id=None, start=None, end=None):
+    """Return stock transaction totals grouped by day."""
+    return _trend_series(_stock_trend_rows(item_id, supplier_id, start, end))
+
+
 def interactive_dashboard(request):
     """Render dashboard with filter controls for asynchronous charts."""
     item_id = request.GET.get("item")
@@ -109,12 +171,44 @@ def interactive_dashboard(request):
     return render(request, "core/dashboard.html", context)
 
 
-def ajax_dashboard_data(request):
+@query_budget(8)
+@conditional_on("stock_transactions", "purchase_orders")
+async def ajax_dashboard_data(request):
     """Return JSON data for dashboard charts based on filters."""
     item_id = request.GET.get("item")
     supplier_id = request.GET.get("supplier")
     start = parse_date(request.GET.get("start")) if request.GET.get("start") else None
     end = parse_date(request.GET.get("end")) if request.GET.get("end") else None
 
-    labels, values = _stock_trend_data(item_id, supplier_id, start, end)
+    rows = _stock_trend_rows(item_id, supplier_id, start, end)
+    labels, values = _trend_series([row async for row in rows])
     return JsonResponse({"labels": labels, "values": values})
+
+
+@staff_member_required
+def profiles_list(request):
+    """List stored profiles, newest first."""
+    return render(
+        request, "core/profiles.html", {"profiles": profiling.list_profiles()}
+    )
+
+
+@staff_member_required
+def cache_view(request):
+    """Show the cache backend's configuration and live statistics."""
+    return render(request, "core/cache_stats.html", {"cache": cache_stats()})
+
+
+@staff_member_required
+def profile_download(request, profile_id, fmt):
+    """Download a profile as a pstats dump or speedscope JSON."""
+    path = profiling.stats_path(profile_id)
+    if path is None or fmt not in ("prof", "speedscope"):
+        raise Http404("Profile not found")
+    if fmt == "prof":
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
+    response = JsonResponse(profiling.to_speedscope(path, name=profile_id))
+    response["Content-Disposition"] = (
+        f'attachment; filename="{profile_id}.speedscope.json"'
+    )
+    return response
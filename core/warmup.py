@@ -0,0 +1,109 @@
+"""Load the app's lazily built state before serving the first request.
+
+``gunicorn.conf.py`` calls :func:`warm_up` once in the master process when
+``preload_app`` is on, so the forked workers start with the URL resolver,
+compiled templates, model metadata and the Supabase units/categories snapshot
+already in (copy-on-write shared) memory instead of each building them on its
+first request.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _urlconf() -> int:
+    resolver = get_resolver()
+    # Reading reverse_dict populates the resolver and every included one.
+    resolver.reverse_dict
+    return len(resolver.url_patterns)
+
+
+def _models() -> int:
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+    return len(models)
+
+
+def _templates() -> int:
+    """Compile the project's templates into the cached template loader."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    loaded = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory).resolve()
+            # Skip Django's and third-party packages' templates.
+            if base_dir not in directory.parents or not directory.is_dir():
+                continue
+            for path in sorted(directory.rglob("*.html")):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    logger.warning("Template %s does not compile", name)
+                    continue
+                loaded += 1
+    return loaded
+
+
+def _supabase() -> int:
+    from inventory.services import supabase_client
+    from inventory.services.supabase_categories import get_categories
+    from inventory.services.supabase_units import get_units
+
+    try:
+        return len(get_units()) + len(get_categories())
+    finally:
+        # The HTTP client holds sockets and must not be shared across fork();
+        # workers create their own on first use.
+        supabase_client.reset_supabase_client()
+
+
+STEPS: Dict[str, Callable[[], int]] = {
+    "urlconf": _urlconf,
+    "models": _models,
+    "templates": _templates,
+    "supabase": _supabase,
+}
+
+
+def warm_up() -> Dict[str, int]:
+    """Run every warm-up step and return the number of objects each loaded.
+
+    A failing step is logged and skipped so warm-up never prevents the server
+    from starting. Database connections and connection pools opened along the
+    way are closed so that none are inherited by forked workers.
+    """
+
+    results: Dict[str, int] = {}
+    for name, step in STEPS.items():
+        started = time.perf_counter()
+        try:
+            results[name] = step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+            continue
+        logger.info(
+            "Warm-up %s: %d loaded in %.0f ms",
+            name,
+            results[name],
+            (time.perf_counter() - started) * 1000,
+        )
+    connections.close_all()
+    for connection in connections.all(initialized_only=True):
+        # ``connection.pool`` would create a pool; only close existing ones.
+        if connection.alias in getattr(connection, "_connection_pools", {}):
+            connection.close_pool()
+    return results
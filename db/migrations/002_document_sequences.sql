@@ -0,0 +1,47 @@
+-- Race-free document numbering for purchase orders and goods received notes.
+--
+-- Numbers are allocated from a single counter row per (prefix, year) that the
+-- application locks with SELECT ... FOR UPDATE. year = 0 marks sequences that
+-- never reset. The allocated number is stored on the document row so list
+-- views read it instead of computing MAX(pk) + 1.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.document_sequences (
+    sequence_id serial PRIMARY KEY,
+    prefix varchar(20) NOT NULL,
+    year integer NOT NULL DEFAULT 0,
+    last_value bigint NOT NULL DEFAULT 0,
+    CONSTRAINT document_sequences_prefix_year_key UNIQUE (prefix, year)
+);
+
+ALTER TABLE public.purchase_orders ADD COLUMN IF NOT EXISTS po_number text;
+ALTER TABLE public.goods_received_notes ADD COLUMN IF NOT EXISTS grn_number text;
+
+-- Keep the numbers already printed on legacy documents (f"{id:04d}"; lpad
+-- alone would truncate ids of five or more digits).
+UPDATE public.purchase_orders
+   SET po_number = 'PO-' || CASE WHEN po_id < 10000
+                                 THEN lpad(po_id::text, 4, '0')
+                                 ELSE po_id::text END
+ WHERE po_number IS NULL OR po_number = '';
+UPDATE public.goods_received_notes
+   SET grn_number = 'GRN-' || CASE WHEN grn_id < 10000
+                                   THEN lpad(grn_id::text, 4, '0')
+                                   ELSE grn_id::text END
+ WHERE grn_number IS NULL OR grn_number = '';
+
+CREATE UNIQUE INDEX IF NOT EXISTS purchase_orders_po_number_key
+    ON public.purchase_orders (po_number);
+CREATE UNIQUE INDEX IF NOT EXISTS goods_received_notes_grn_number_key
+    ON public.goods_received_notes (grn_number);
+
+-- Continue the non-yearly sequences after the highest existing id.
+INSERT INTO public.document_sequences (prefix, year, last_value)
+SELECT 'PO', 0, COALESCE(MAX(po_id), 0) FROM public.purchase_orders
+ON CONFLICT (prefix, year) DO NOTHING;
+INSERT INTO public.document_sequences (prefix, year, last_value)
+SELECT 'GRN', 0, COALESCE(MAX(grn_id), 0) FROM public.goods_received_notes
+ON CONFLICT (prefix, year) DO NOTHING;
+
+COMMIT;
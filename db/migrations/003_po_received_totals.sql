@@ -0,0 +1,43 @@
+-- Denormalized receipt counters for purchase orders.
+--
+-- purchase_order_items.received_qty / received_value hold the running sums of
+-- grn_items for each PO line, and purchase_orders.ordered_total /
+-- received_total the per-order quantity totals. The application updates them
+-- in the same transaction as each GRN, so PO progress and status are read
+-- without joining grn_items. `manage.py reconcile_po_totals` verifies them.
+
+BEGIN;
+
+ALTER TABLE public.purchase_order_items
+    ADD COLUMN IF NOT EXISTS received_qty numeric(10, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS received_value numeric(12, 2) NOT NULL DEFAULT 0;
+ALTER TABLE public.purchase_orders
+    ADD COLUMN IF NOT EXISTS ordered_total numeric(12, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS received_total numeric(12, 2) NOT NULL DEFAULT 0;
+
+-- Backfill from the existing GRN lines.
+UPDATE public.purchase_order_items poi
+   SET received_qty = g.qty,
+       received_value = g.value
+  FROM (
+        SELECT po_item_id,
+               SUM(quantity_received) AS qty,
+               SUM(ROUND(quantity_received * unit_price_at_receipt, 2)) AS value
+          FROM public.grn_items
+         GROUP BY po_item_id
+       ) g
+ WHERE g.po_item_id = poi.po_item_id;
+
+UPDATE public.purchase_orders po
+   SET ordered_total = l.ordered,
+       received_total = l.received
+  FROM (
+        SELECT po_id,
+               SUM(quantity_ordered) AS ordered,
+               SUM(received_qty) AS received
+          FROM public.purchase_order_items
+         GROUP BY po_id
+       ) l
+ WHERE l.po_id = po.po_id;
+
+COMMIT;
@@ -0,0 +1,36 @@
+-- Support for the API change feeds (`/api/<resource>/changes/?since=`).
+--
+-- Feeds page through rows with keyset predicates on (updated_at, pk) or on the
+-- primary key, so each resource gets a matching composite index. Deleted rows
+-- leave a tombstone that feeds replay in tombstone_id order.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.change_tombstones (
+    tombstone_id bigserial PRIMARY KEY,
+    resource varchar(50) NOT NULL,
+    object_id bigint NOT NULL,
+    deleted_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_change_tombstones_resource_id
+    ON public.change_tombstones (resource, tombstone_id);
+
+-- Rows without a timestamp would never match a since-token.
+UPDATE public.items SET updated_at = now() WHERE updated_at IS NULL;
+UPDATE public.suppliers SET updated_at = now() WHERE updated_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_items_updated_at_item_id
+    ON public.items (updated_at, item_id);
+CREATE INDEX IF NOT EXISTS idx_suppliers_updated_at_supplier_id
+    ON public.suppliers (updated_at, supplier_id);
+
+-- Bump updated_at on every UPDATE, including set-based stock updates and
+-- writes from outside Django, so no change is missed by the feed.
+DROP TRIGGER IF EXISTS update_items_modtime ON public.items;
+CREATE TRIGGER update_items_modtime BEFORE UPDATE ON public.items
+    FOR EACH ROW EXECUTE FUNCTION public.update_modified_column();
+DROP TRIGGER IF EXISTS update_suppliers_modtime ON public.suppliers;
+CREATE TRIGGER update_suppliers_modtime BEFORE UPDATE ON public.suppliers
+    FOR EACH ROW EXECUTE FUNCTION public.update_modified_column();
+
+COMMIT;
@@ -0,0 +1,31 @@
+-- Per-table change counters used for ETags and cache keys.
+--
+-- The application increments table_versions.version for every table written
+-- by a committed transaction (see inventory/models/versions.py). Writes made
+-- outside Django are not counted; bump the affected rows by hand after such
+-- maintenance, e.g. UPDATE table_versions SET version = version + 1.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.table_versions (
+    table_name varchar(63) PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0
+);
+
+INSERT INTO public.table_versions (table_name, version)
+VALUES
+    ('items', 1),
+    ('stock_transactions', 1),
+    ('suppliers', 1),
+    ('indents', 1),
+    ('indent_items', 1),
+    ('purchase_orders', 1),
+    ('purchase_order_items', 1),
+    ('goods_received_notes', 1),
+    ('grn_items', 1),
+    ('recipes', 1),
+    ('recipe_components', 1),
+    ('sales_transactions', 1)
+ON CONFLICT (table_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,44 @@
+-- Composite and covering indexes for the ledger and dashboard queries.
+--
+-- stock_transactions is read by item in date order (item history, running
+-- stock levels), summed by transaction type over a date range (receipts and
+-- issues KPIs) and filtered and listed by user in the history report. The
+-- single-column item_id indexes are replaced by (item_id, transaction_date
+-- DESC), which serves the same lookups and spares every ledger INSERT the
+-- upkeep of two redundant indexes. `manage.py check_indexes` EXPLAINs these
+-- queries and fails if one of them falls back to a sequential scan.
+--
+-- The indexes are built CONCURRENTLY so writes continue during the build;
+-- run this file outside a transaction (plain `psql -f`). If a build fails it
+-- leaves an INVALID index behind: drop it and run the file again.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_st_item_date
+    ON public.stock_transactions (item_id, transaction_date DESC);
+
+-- Index-only scans for SUM(quantity_change) per type since a date.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_st_type_date
+    ON public.stock_transactions (transaction_type, transaction_date)
+    INCLUDE (quantity_change);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_st_user_date
+    ON public.stock_transactions (user_id, transaction_date);
+
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_st_item_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_stock_transactions_item_id;
+
+-- Items below their reorder point, by name (low-stock KPI and lists). Every
+-- stock movement changes current_stock, but items.updated_at is indexed
+-- already, so these updates were not HOT-eligible before either.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_low_stock
+    ON public.items (name)
+    WHERE reorder_point IS NOT NULL AND current_stock < reorder_point;
+
+-- Present in the Supabase schema dump; created here for databases built
+-- without it.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_grn_received_date
+    ON public.goods_received_notes (received_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_po_status
+    ON public.purchase_orders (status);
+
+ANALYZE public.stock_transactions;
+ANALYZE public.items;
@@ -0,0 +1,166 @@
+-- Monthly range partitioning of the stock_transactions ledger.
+--
+-- The ledger only grows, and the KPI, forecasting and history queries all
+-- filter it by transaction_date. With one partition per (UTC) month those
+-- queries only read the partitions their date range covers, and
+-- `manage.py archive_stock_transactions` retires old months by detaching
+-- whole partitions instead of deleting rows. The same command creates the
+-- partitions of the coming months; schedule it monthly. Rows for a month
+-- without a partition land in stock_transactions_default.
+--
+-- Run in a maintenance window: the ledger is locked while its rows are copied.
+-- The old table is kept as stock_transactions_unpartitioned; drop it once the
+-- row counts match. Rows without a transaction_date (the app always sets one)
+-- are copied with the epoch as their date.
+--
+-- Also creates stock_transactions_archive (partitioned the same way, without
+-- foreign keys) and stock_transaction_archive_totals, the monthly per-item
+-- totals that keep balances exact once rows are archived.
+
+BEGIN;
+
+LOCK TABLE public.stock_transactions IN ACCESS EXCLUSIVE MODE;
+
+ALTER TABLE public.stock_transactions RENAME TO stock_transactions_unpartitioned;
+ALTER TABLE public.stock_transactions_unpartitioned
+    RENAME CONSTRAINT stock_transactions_pkey TO stock_transactions_unpartitioned_pkey;
+-- Index names are per schema; the partitioned table recreates these below.
+DROP INDEX IF EXISTS public.idx_st_item_date;
+DROP INDEX IF EXISTS public.idx_st_type_date;
+DROP INDEX IF EXISTS public.idx_st_user_date;
+DROP INDEX IF EXISTS public.idx_st_related_indent_id;
+DROP INDEX IF EXISTS public.idx_st_related_po_id;
+DROP INDEX IF EXISTS public.idx_stock_transactions_date;
+DROP INDEX IF EXISTS public.idx_st_item_id;
+DROP INDEX IF EXISTS public.idx_stock_transactions_item_id;
+
+-- The partition key must be part of the primary key.
+CREATE TABLE public.stock_transactions (
+    transaction_id integer NOT NULL
+        DEFAULT nextval('public.stock_transactions_transaction_id_seq'::regclass),
+    item_id integer NOT NULL,
+    quantity_change numeric NOT NULL,
+    transaction_type text NOT NULL,
+    transaction_date timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    user_id text,
+    related_po_id integer,
+    notes text,
+    related_indent_id integer,
+    user_id_int integer,
+    CONSTRAINT stock_transactions_pkey PRIMARY KEY (transaction_id, transaction_date),
+    CONSTRAINT stock_transactions_item_id_fkey
+        FOREIGN KEY (item_id) REFERENCES public.items(item_id),
+    CONSTRAINT stock_tx_indent_fk
+        FOREIGN KEY (related_indent_id) REFERENCES public.indents(indent_id) DEFERRABLE,
+    CONSTRAINT stock_tx_po_fk
+        FOREIGN KEY (related_po_id) REFERENCES public.purchase_orders(po_id) DEFERRABLE,
+    CONSTRAINT stock_tx_user_fk
+        FOREIGN KEY (user_id_int) REFERENCES public.auth_user(id)
+) PARTITION BY RANGE (transaction_date);
+
+COMMENT ON TABLE public.stock_transactions IS
+    'Audit trail of all inventory movements (in/out/adjustments), partitioned by month';
+ALTER SEQUENCE public.stock_transactions_transaction_id_seq
+    OWNED BY public.stock_transactions.transaction_id;
+ALTER TABLE public.stock_transactions ENABLE ROW LEVEL SECURITY;
+
+CREATE TABLE public.stock_transactions_archive (
+    transaction_id integer NOT NULL,
+    item_id integer NOT NULL,
+    quantity_change numeric NOT NULL,
+    transaction_type text NOT NULL,
+    transaction_date timestamp with time zone NOT NULL,
+    user_id text,
+    related_po_id integer,
+    notes text,
+    related_indent_id integer,
+    user_id_int integer,
+    CONSTRAINT stock_transactions_archive_pkey
+        PRIMARY KEY (transaction_id, transaction_date)
+) PARTITION BY RANGE (transaction_date);
+ALTER TABLE public.stock_transactions_archive ENABLE ROW LEVEL SECURITY;
+
+CREATE TABLE public.stock_transaction_archive_totals (
+    id bigserial PRIMARY KEY,
+    item_id integer REFERENCES public.items(item_id),
+    transaction_type text,
+    month date NOT NULL,
+    quantity_change numeric NOT NULL,
+    transaction_count integer NOT NULL,
+    CONSTRAINT stock_transaction_archive_totals_key
+        UNIQUE NULLS NOT DISTINCT (item_id, transaction_type, month)
+);
+ALTER TABLE public.stock_transaction_archive_totals ENABLE ROW LEVEL SECURITY;
+
+-- Creates the missing partitions <parent>_yYYYYmMM of parent for every month
+-- from first_month to last_month (inclusive, UTC months). Returns how many
+-- were created.
+CREATE OR REPLACE FUNCTION public.create_monthly_partitions(
+    parent text, first_month date, last_month date
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_month)::date;
+    partition text;
+    created integer := 0;
+BEGIN
+    WHILE month <= last_month LOOP
+        partition := format('%s_y%sm%s', parent, to_char(month, 'YYYY'), to_char(month, 'MM'));
+        IF to_regclass(format('public.%I', partition)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                partition,
+                parent,
+                month::timestamp AT TIME ZONE 'UTC',
+                (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+SELECT public.create_monthly_partitions(
+    'stock_transactions',
+    COALESCE(
+        (SELECT min(transaction_date AT TIME ZONE 'UTC')::date
+         FROM public.stock_transactions_unpartitioned),
+        current_date
+    ),
+    (current_date + interval '3 months')::date
+);
+CREATE TABLE public.stock_transactions_default
+    PARTITION OF public.stock_transactions DEFAULT;
+
+INSERT INTO public.stock_transactions (
+    transaction_id, item_id, quantity_change, transaction_type, transaction_date,
+    user_id, related_po_id, notes, related_indent_id, user_id_int
+)
+SELECT
+    transaction_id, item_id, quantity_change, transaction_type,
+    COALESCE(transaction_date, 'epoch'::timestamptz),
+    user_id, related_po_id, notes, related_indent_id, user_id_int
+FROM public.stock_transactions_unpartitioned;
+
+-- Created on the parent, these cascade to every current and future partition.
+CREATE INDEX idx_st_item_date
+    ON public.stock_transactions (item_id, transaction_date DESC);
+CREATE INDEX idx_st_type_date
+    ON public.stock_transactions (transaction_type, transaction_date)
+    INCLUDE (quantity_change);
+CREATE INDEX idx_st_user_date ON public.stock_transactions (user_id, transaction_date);
+CREATE INDEX idx_st_date ON public.stock_transactions (transaction_date);
+CREATE INDEX idx_st_related_indent_id ON public.stock_transactions (related_indent_id);
+CREATE INDEX idx_st_related_po_id ON public.stock_transactions (related_po_id);
+CREATE INDEX idx_st_archive_item_date
+    ON public.stock_transactions_archive (item_id, transaction_date);
+
+INSERT INTO public.table_versions (table_name, version)
+VALUES ('stock_transaction_archive_totals', 1)
+ON CONFLICT (table_name) DO NOTHING;
+
+COMMIT;
+
+ANALYZE public.stock_transactions;
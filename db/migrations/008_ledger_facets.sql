@@ -0,0 +1,43 @@
+-- Per-day counts of stock_transactions by type, user and item.
+--
+-- The history report's filter dropdowns list the distinct transaction types
+-- and users with their counts for the selected dates. Reading them from this
+-- table replaces two DISTINCT scans of the whole ledger per request. The
+-- application adds the counts of every inserted ledger row once its
+-- transaction commits (inventory/models/facets.py); after writing to the
+-- ledger outside Django, run `manage.py rebuild_ledger_facets`.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.stock_transaction_facets (
+    id bigserial PRIMARY KEY,
+    facet varchar(10) NOT NULL,
+    value varchar(255) NOT NULL,
+    day date NOT NULL,
+    count bigint NOT NULL DEFAULT 0,
+    CONSTRAINT stock_transaction_facets_key UNIQUE (facet, value, day)
+);
+ALTER TABLE public.stock_transaction_facets ENABLE ROW LEVEL SECURITY;
+
+INSERT INTO public.stock_transaction_facets (facet, value, day, count)
+SELECT facet, value, day, count(*)
+FROM (
+    SELECT 'type' AS facet, transaction_type AS value,
+           (transaction_date AT TIME ZONE 'UTC')::date AS day
+    FROM public.stock_transactions
+    UNION ALL
+    SELECT 'user', user_id, (transaction_date AT TIME ZONE 'UTC')::date
+    FROM public.stock_transactions
+    UNION ALL
+    SELECT 'item', item_id::text, (transaction_date AT TIME ZONE 'UTC')::date
+    FROM public.stock_transactions
+) AS ledger
+WHERE value IS NOT NULL AND value <> ''
+GROUP BY facet, value, day
+ON CONFLICT (facet, value, day) DO NOTHING;
+
+INSERT INTO public.table_versions (table_name, version)
+VALUES ('stock_transaction_facets', 1)
+ON CONFLICT (table_name) DO NOTHING;
+
+COMMIT;
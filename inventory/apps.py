@@ -1,6 +1,60 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+# Models exposed through change feeds; deletes leave a tombstone row.
+CHANGE_FEED_MODELS = ("Item", "Supplier", "StockTransaction")
+
+
+def _bump_version(sender, **kwargs) -> None:
+    from .models.versions import bump_table_versions
+
+    bump_table_versions(sender._meta.db_table, using=kwargs.get("using"))
+
+
+def _record_facets(sender, instance, created, **kwargs) -> None:
+    if created:
+        from .models.facets import record_ledger_facets
+
+        record_ledger_facets([instance], using=kwargs.get("using"))
+
+
+def _forget_facets(sender, instance, **kwargs) -> None:
+    from .models.facets import record_ledger_facets
+
+    record_ledger_facets([instance], using=kwargs.get("using"), removed=True)
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "inventory"
+
+    def ready(self):  # pragma: no cover - executed via Django startup
+        """Connect tombstone, table-version and ledger facet signal handlers."""
+
+        from .models.versions import VersionedQuerySet
+        from .services.change_feed import record_tombstone
+
+        for name in CHANGE_FEED_MODELS:
+            post_delete.connect(
+                record_tombstone,
+                sender=self.get_model(name),
+                dispatch_uid=f"inventory.tombstone.{name}",
+            )
+        for model in self.get_models():
+            if issubclass(model._default_manager._queryset_class, VersionedQuerySet):
+                for signal in (post_save, post_delete):
+                    signal.connect(
+                        _bump_version,
+                        sender=model,
+                        dispatch_uid=f"inventory.version.{model.__name__}",
+                    )
+        post_save.connect(
+            _record_facets,
+            sender=self.get_model("StockTransaction"),
+            dispatch_uid="inventory.facets.StockTransaction",
+        )
+        post_delete.connect(
+            _forget_facets,
+            sender=self.get_model("StockTransaction"),
+            dispatch_uid="inventory.facets.forget.StockTransaction",
+        )
@@ -7,10 +7,13 @@ from .base import StyledFormMixin
 
 
 class ReorderPointForm(StyledFormMixin, forms.Form):
-    """Form for updating reorder point on multiple items."""
+    """Form for trying a reorder point and lead time on multiple items."""
 
     items = forms.ModelMultipleChoiceField(
         queryset=Item.objects.filter(is_active=True),
         required=True,
     )
     reorder_point = forms.DecimalField(min_value=0, required=True)
+    lead_time_days = forms.IntegerField(
+        min_value=1, max_value=365, initial=7, required=False, label="Lead time (days)"
+    )
@@ -2,9 +2,6 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
-
 from .models import Indent, IndentItem
 
 
@@ -20,6 +17,10 @@ def generate_indent_pdf(indent: Indent, items: Iterable[IndentItem]) -> bytes:
     -------
     bytes: PDF content
     """
+    # fpdf is imported here so worker boot does not pay for it.
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Helvetica", size=12)
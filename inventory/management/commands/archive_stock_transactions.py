@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from core.profiling import ProfiledCommand
+from inventory.services import ledger_archive
+
+
+class Command(ProfiledCommand):
+    """Archive ledger months older than ``--months`` and pre-create partitions."""
+
+    help = (
+        "Move stock transactions older than N months out of the live ledger "
+        "and create the partitions of the coming months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=24,
+            help="Full months to keep besides the current one (default 24).",
+        )
+        parser.add_argument(
+            "--to",
+            choices=ledger_archive.DESTINATIONS,
+            default="table",
+            dest="destination",
+            help=(
+                "Attach archived months to stock_transactions_archive (PostgreSQL) "
+                "or write them to gzip-compressed CSV files."
+            ),
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=settings.LEDGER_ARCHIVE_DIR,
+            help="Directory for --to file (default LEDGER_ARCHIVE_DIR).",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Future monthly partitions to create on PostgreSQL (default 3).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months must be at least 1.")
+        if not options["dry_run"]:
+            created = ledger_archive.ensure_partitions(options["months_ahead"])
+            if created:
+                self.stdout.write(f"Created {created} ledger partition(s).")
+
+        cutoff = ledger_archive.archive_cutoff(options["months"])
+        if options["dry_run"]:
+            months = ledger_archive.pending_months(cutoff)
+        else:
+            try:
+                months = ledger_archive.archive_before(
+                    cutoff,
+                    destination=options["destination"],
+                    output_dir=Path(options["output_dir"]),
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        if not months:
+            self.stdout.write(f"Nothing to archive before {cutoff:%Y-%m}.")
+            return
+        for month in months:
+            line = (
+                f"{month['month']:%Y-%m}: {month['rows']} rows, net {month['quantity']}"
+            )
+            if month.get("file"):
+                line += f" -> {month['file']}"
+            self.stdout.write(line)
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        total = sum(m["rows"] for m in months)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {total} transactions from {len(months)} month(s) "
+                f"before {cutoff:%Y-%m}."
+            )
+        )
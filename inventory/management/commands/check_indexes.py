@@ -0,0 +1,153 @@
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.profiling import ProfiledCommand
+from inventory.models import GoodsReceivedNote, Item, PurchaseOrder, StockTransaction
+from inventory.services import dashboard_service
+
+
+def _week_ago():
+    return timezone.now() - timedelta(days=7)
+
+
+# (name, table, queryset factory) for the ledger and dashboard queries that
+# db/migrations/006_ledger_indexes.sql is meant to serve.
+HOT_QUERIES = [
+    (
+        "item ledger",
+        "stock_transactions",
+        lambda: StockTransaction.objects.filter(item_id=1).order_by(
+            "-transaction_date"
+        )[:30],
+    ),
+    (
+        "receipts last 7 days",
+        "stock_transactions",
+        lambda: StockTransaction.objects.filter(
+            transaction_type="RECEIVING", transaction_date__gte=_week_ago()
+        )
+        .values("transaction_type")
+        .annotate(total=Sum("quantity_change")),
+    ),
+    (
+        "history by user",
+        "stock_transactions",
+        lambda: StockTransaction.objects.filter(
+            user_id="admin", transaction_date__gte=_week_ago()
+        ).order_by("-transaction_date"),
+    ),
+    (
+        "low stock items",
+        "items",
+        lambda: Item.objects.filter(
+            reorder_point__isnull=False, current_stock__lt=F("reorder_point")
+        ).order_by("name"),
+    ),
+    (
+        "low stock list",
+        "items",
+        dashboard_service.get_low_stock_items,
+    ),
+    (
+        "recent GRNs",
+        "goods_received_notes",
+        lambda: GoodsReceivedNote.objects.filter(received_date__gte=_week_ago().date()),
+    ),
+    (
+        "open purchase orders",
+        "purchase_orders",
+        lambda: PurchaseOrder.objects.filter(
+            status__in=["DRAFT", "ORDERED", "PARTIAL"]
+        ),
+    ),
+]
+
+
+def _relation_pattern(table):
+    """Match ``table`` and its monthly and default partitions.
+
+    db/migrations/007_partition_stock_transactions.sql names partitions
+    ``<table>_yYYYYmMM`` and ``<table>_default``; plans of a partitioned
+    table scan those instead of the parent.
+    """
+    return re.compile(rf"{re.escape(table)}(?:_y\d{{4}}m\d{{2}}|_default)?")
+
+
+def _postgres_seq_scans(plan, relation):
+    """Yield the sequential scans on relations matching ``relation`` in a JSON EXPLAIN plan."""
+    if plan.get("Node Type") == "Seq Scan" and relation.fullmatch(
+        plan.get("Relation Name", "")
+    ):
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from _postgres_seq_scans(child, relation)
+
+
+def _uses_full_scan(explain, table):
+    if connection.vendor == "postgresql":
+        plan = json.loads(explain)[0]["Plan"]
+        return any(_postgres_seq_scans(plan, _relation_pattern(table)))
+    # SQLite: "SCAN items" reads the whole table; "SCAN items USING INDEX ..."
+    # and "SEARCH ..." do not.
+    for line in explain.splitlines():
+        words = line.split()
+        if "SCAN" in words:
+            start = words.index("SCAN") + 1
+            rest = words[start:]
+            if rest and rest[0] == table and "USING" not in rest:
+                return True
+    return False
+
+
+class Command(ProfiledCommand):
+    """EXPLAIN the hot ledger queries and fail if one needs a full table scan."""
+
+    help = "Check that the hot ledger and dashboard queries are served by indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--natural",
+            action="store_true",
+            help=(
+                "Keep the planner's own choice on PostgreSQL. By default sequential "
+                "scans are disabled so small tables still show whether an index exists."
+            ),
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the plan of every query.",
+        )
+
+    def handle(self, *args, **options):
+        regressions = []
+        for name, table, factory in HOT_QUERIES:
+            explain = self._explain(factory(), options["natural"])
+            if options["verbose_plans"]:
+                self.stdout.write(f"-- {name}\n{explain}")
+            if _uses_full_scan(explain, table):
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: full scan of {table}"))
+            else:
+                self.stdout.write(f"{name}: ok")
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} quer{'y' if len(regressions) == 1 else 'ies'} "
+                "scan a whole table; apply db/migrations/006_ledger_indexes.sql."
+            )
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
+
+    def _explain(self, queryset, natural):
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+        with transaction.atomic():
+            if not natural:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain(format="json")
@@ -0,0 +1,46 @@
+from django.core.management.base import CommandError
+from django.utils.dateparse import parse_date
+
+from core.profiling import ProfiledCommand
+from inventory.services import reorder_planner
+
+
+class Command(ProfiledCommand):
+    """Create draft purchase orders for every item that needs reordering."""
+
+    help = "Plan reorders for all active items and draft one PO per supplier."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--order-date",
+            help="Order date for the generated POs (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the suggested quantities without creating purchase orders.",
+        )
+
+    def handle(self, *args, **options):
+        order_date = None
+        if options["order_date"]:
+            order_date = parse_date(options["order_date"])
+            if order_date is None:
+                raise CommandError("Invalid --order-date, expected YYYY-MM-DD.")
+        suggestions = reorder_planner.plan_reorders(order_date)
+        if options["dry_run"]:
+            for s in suggestions:
+                self.stdout.write(
+                    f"{s['name']} [{s['abc_class']}]: order {s['quantity']} "
+                    f"(stock {s['current_stock']:g}, open {s['open_qty']}, "
+                    f"level {s['reorder_level']:g}) "
+                    f"from supplier {s['supplier_id'] or '-'}"
+                )
+            self.stdout.write(f"{len(suggestions)} item(s) to reorder.")
+            return
+        success, msg, _ = reorder_planner.draft_purchase_orders(
+            suggestions, order_date=order_date
+        )
+        if not success:
+            raise CommandError(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,41 @@
+from django.core.management.base import CommandError
+from django.utils.dateparse import parse_date
+
+from core.profiling import ProfiledCommand
+from inventory.models import Indent
+from inventory.services import purchase_order_service
+
+
+class Command(ProfiledCommand):
+    """Create draft purchase orders from approved indents, one per supplier."""
+
+    help = "Generate purchase orders from approved indents."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--indent",
+            action="append",
+            type=int,
+            dest="indent_ids",
+            help="Indent ID to include (repeatable). Defaults to all approved indents.",
+        )
+        parser.add_argument(
+            "--order-date",
+            help="Order date for the generated POs (YYYY-MM-DD). Defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        order_date = None
+        if options["order_date"]:
+            order_date = parse_date(options["order_date"])
+            if order_date is None:
+                raise CommandError("Invalid --order-date, expected YYYY-MM-DD.")
+        indent_ids = options["indent_ids"] or list(
+            Indent.objects.filter(status="APPROVED").values_list("indent_id", flat=True)
+        )
+        success, msg, _ = purchase_order_service.create_pos_from_indents(
+            indent_ids, order_date=order_date
+        )
+        if not success:
+            raise CommandError(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,38 @@
+from django.core.management.base import CommandError
+
+from core.profiling import ProfiledCommand
+from inventory.models import Indent
+from inventory.services import indent_service
+
+
+class Command(ProfiledCommand):
+    """Issue stock against approved and partly issued indents in one batch."""
+
+    help = "Issue outstanding indent quantities from stock."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--indent",
+            action="append",
+            type=int,
+            dest="indent_ids",
+            help="Indent ID to issue (repeatable). Defaults to every approved or processing indent.",
+        )
+        parser.add_argument(
+            "--no-partial",
+            action="store_true",
+            help="Skip indents that cannot be issued in full.",
+        )
+
+    def handle(self, *args, **options):
+        indent_ids = options["indent_ids"] or list(
+            Indent.objects.filter(
+                status__in=indent_service.ISSUABLE_STATUSES
+            ).values_list("indent_id", flat=True)
+        )
+        success, msg, _ = indent_service.issue_indents(
+            indent_ids, partial=not options["no_partial"]
+        )
+        if not success:
+            raise CommandError(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
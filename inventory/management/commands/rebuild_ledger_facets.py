@@ -0,0 +1,12 @@
+from core.profiling import ProfiledCommand
+from inventory.services import ledger_facets
+
+
+class Command(ProfiledCommand):
+    """Recount the history report filter facets from the ledger."""
+
+    help = "Rebuild stock_transaction_facets from stock_transactions."
+
+    def handle(self, *args, **options):
+        rows = ledger_facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} ledger facet rows."))
@@ -0,0 +1,48 @@
+from django.core.management.base import CommandError
+
+from core.profiling import ProfiledCommand
+from inventory.services import purchase_order_service
+
+
+class Command(ProfiledCommand):
+    """Check denormalized PO receipt totals against the GRN items."""
+
+    help = "Verify purchase order received/ordered totals against grn_items."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--po",
+            action="append",
+            type=int,
+            dest="po_ids",
+            help="Purchase order ID to check (repeatable). Defaults to all.",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rewrite mismatched totals and the receipt status from grn_items.",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = purchase_order_service.find_total_mismatches(options["po_ids"])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("All purchase order totals match."))
+            return
+        for m in mismatches:
+            target = f"PO {m['po_id']}"
+            if m["po_item_id"] is not None:
+                target += f" line {m['po_item_id']}"
+            self.stdout.write(
+                f"{target}: {m['field']} is {m['stored']}, expected {m['expected']}"
+            )
+        if not options["fix"]:
+            raise CommandError(
+                f"{len(mismatches)} mismatched total(s); rerun with --fix to repair."
+            )
+        po_ids = {m["po_id"] for m in mismatches}
+        purchase_order_service.recalculate_po_totals(po_ids, update_status=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recalculated totals for {len(po_ids)} purchase order(s)."
+            )
+        )
@@ -0,0 +1,470 @@
+import contextlib
+import datetime
+import math
+import random
+from decimal import Decimal
+from itertools import accumulate
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.profiling import ProfiledCommand
+from inventory.models import (
+    GoodsReceivedNote,
+    GRNItem,
+    Indent,
+    IndentItem,
+    Item,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Recipe,
+    RecipeComponent,
+    SaleTransaction,
+    StockTransaction,
+    Supplier,
+)
+from inventory.services import purchase_order_service, sequence_service
+
+# Row counts at --scale 1: a large multi-outlet restaurant group.
+DEFAULT_COUNTS = {
+    "suppliers": 200,
+    "items": 5_000,
+    "recipes": 500,
+    "stock_transactions": 10_000_000,
+    "grn_lines": 200_000,
+    "sales": 500_000,
+    "indents": 20_000,
+}
+
+CATEGORIES = ["Produce", "Dairy", "Meat", "Seafood", "Dry Goods", "Beverages"]
+UNITS = [("kg", "kg"), ("g", "kg"), ("l", "l"), ("ml", "l"), ("pcs", "box")]
+DEPARTMENTS = ["Kitchen", "Bar", "Bakery", "Banquet", "Housekeeping"]
+LEDGER_MIX = [("ISSUE", 0.55), ("SALE", 0.35), ("WASTAGE", 0.05), ("ADJUSTMENT", 0.05)]
+INDENT_STATUSES = ["COMPLETED"] * 8 + ["PENDING", "APPROVED", "PROCESSING"]
+LINES_PER_PO = 8
+SUB_RECIPE_SHARE = 0.2
+
+
+@contextlib.contextmanager
+def _historical_dates(*fields):
+    """Let bulk inserts keep explicit values for ``auto_now(_add)`` fields."""
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _field(model, name):
+    return model._meta.get_field(name)
+
+
+class Command(ProfiledCommand):
+    """Fill an empty database with deterministic, restaurant-scale data."""
+
+    help = (
+        "Generate synthetic suppliers, items, nested recipes, purchase orders, "
+        "GRNs, indents, sales and a stock ledger for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiply every default row count (e.g. 0.01 for a quick run).",
+        )
+        for name, count in DEFAULT_COUNTS.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                dest=name,
+                help=f"Rows to create (default {count:,} x scale).",
+            )
+        parser.add_argument(
+            "--days", type=int, default=730, help="Length of the history in days."
+        )
+        parser.add_argument(
+            "--end-date",
+            type=datetime.date.fromisoformat,
+            default=datetime.date(2025, 12, 31),
+            help="Last day of the generated history (YYYY-MM-DD).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Add data even if the items table is not empty.",
+        )
+
+    def handle(self, *args, **options):
+        if Item.objects.exists() and not options["force"]:
+            raise CommandError(
+                "The database already has items; use --force to add benchmark "
+                "data anyway."
+            )
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        counts = {
+            name: (
+                options[name]
+                if options[name] is not None
+                else max(1, math.ceil(default * options["scale"]))
+            )
+            for name, default in DEFAULT_COUNTS.items()
+        }
+        end = datetime.datetime.combine(
+            options["end_date"], datetime.time(23, 59), tzinfo=datetime.timezone.utc
+        )
+        self.start = end - datetime.timedelta(days=options["days"])
+        self.span = (end - self.start).total_seconds()
+
+        suppliers = self._suppliers(counts["suppliers"])
+        items = self._items(counts["items"])
+        recipes = self._recipes(counts["recipes"], items)
+        self._purchasing(counts["grn_lines"], suppliers, items)
+        self._indents(counts["indents"], items)
+        self._sales(counts["sales"], recipes)
+        self._ledger(counts["stock_transactions"] - counts["grn_lines"], items)
+        self._settle_stock()
+        self.stdout.write(self.style.SUCCESS("Benchmark data generated."))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _when(self, fraction=None):
+        """Return a timestamp at ``fraction`` (random if omitted) of the span."""
+        if fraction is None:
+            fraction = self.rng.random()
+        return self.start + datetime.timedelta(seconds=fraction * self.span)
+
+    def _popularity(self, n):
+        """Cumulative Zipf-like weights so a few rows get most of the traffic."""
+        return list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(n)))
+
+    def _bulk(self, model, rows):
+        with transaction.atomic():
+            return model.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def _log(self, label, count):
+        self.stdout.write(f"  {label}: {count:,}")
+
+    # ------------------------------------------------------------------
+    # Master data
+    # ------------------------------------------------------------------
+
+    def _suppliers(self, count):
+        suppliers = self._bulk(
+            Supplier,
+            [
+                Supplier(
+                    name=f"Bench Supplier {i:04d}",
+                    contact_person=f"Contact {i}",
+                    phone=f"555-{i:04d}",
+                    is_active=self.rng.random() > 0.05,
+                )
+                for i in range(count)
+            ],
+        )
+        self._log("suppliers", len(suppliers))
+        return suppliers
+
+    def _items(self, count):
+        rng = self.rng
+        rows = []
+        for i in range(count):
+            base, purchase = rng.choice(UNITS)
+            rows.append(
+                Item(
+                    name=f"{rng.choice(CATEGORIES)} Item {i:05d}",
+                    base_unit=base,
+                    purchase_unit=purchase,
+                    category_id=rng.randint(1, 40),
+                    permitted_departments=",".join(
+                        rng.sample(DEPARTMENTS, rng.randint(1, 3))
+                    ),
+                    reorder_point=Decimal(rng.randint(0, 50)),
+                    current_stock=Decimal("0"),
+                    is_active=rng.random() > 0.03,
+                )
+            )
+        items = self._bulk(Item, rows)
+        self._log("items", len(items))
+        return items
+
+    def _recipes(self, count, items):
+        """Create recipes; the first share are sub-recipes used by the rest."""
+        rng = self.rng
+        stamp = _field(Recipe, "created_at"), _field(Recipe, "updated_at")
+        with _historical_dates(*stamp):
+            recipes = self._bulk(
+                Recipe,
+                [
+                    Recipe(
+                        name=f"Bench Recipe {i:04d}",
+                        is_active=True,
+                        type="SUB" if i < count * SUB_RECIPE_SHARE else "MAIN",
+                        default_yield_qty=Decimal(rng.randint(1, 10)),
+                        default_yield_unit="portion",
+                        created_at=self._when(0),
+                        updated_at=self._when(0),
+                    )
+                    for i in range(count)
+                ],
+            )
+        subs = [r for r in recipes if r.type == "SUB"]
+        components = []
+        for recipe in recipes:
+            picked = rng.sample(items, min(len(items), rng.randint(3, 12)))
+            for order, item in enumerate(picked):
+                components.append(
+                    RecipeComponent(
+                        parent_recipe=recipe,
+                        component_kind="ITEM",
+                        component_id=item.pk,
+                        quantity=Decimal(rng.randint(1, 500)) / 100,
+                        unit=item.base_unit,
+                        loss_pct=Decimal(rng.choice([0, 0, 5, 10])),
+                        sort_order=order,
+                    )
+                )
+            if recipe.type == "MAIN" and subs:
+                for sub in rng.sample(subs, min(len(subs), rng.randint(0, 2))):
+                    components.append(
+                        RecipeComponent(
+                            parent_recipe=recipe,
+                            component_kind="RECIPE",
+                            component_id=sub.pk,
+                            quantity=Decimal(rng.randint(1, 3)),
+                            unit=sub.default_yield_unit,
+                            sort_order=len(picked),
+                        )
+                    )
+        self._bulk(RecipeComponent, components)
+        self._log("recipes", len(recipes))
+        self._log("recipe components", len(components))
+        return recipes
+
+    # ------------------------------------------------------------------
+    # Transactions
+    # ------------------------------------------------------------------
+
+    def _purchasing(self, grn_lines, suppliers, items):
+        """Create POs with ``LINES_PER_PO`` lines, each fully or partly received."""
+        rng = self.rng
+        weights = self._popularity(len(items))
+        n_pos = math.ceil(grn_lines / LINES_PER_PO)
+        numbers = sequence_service.reserve_numbers(sequence_service.PO_PREFIX, n_pos)
+        grn_numbers = sequence_service.reserve_numbers(
+            sequence_service.GRN_PREFIX, n_pos
+        )
+        for first in range(0, n_pos, self.batch_size):
+            ids = range(first, min(n_pos, first + self.batch_size))
+            order_dates = [self._when((i + rng.random()) / n_pos) for i in ids]
+            orders = self._bulk(
+                PurchaseOrder,
+                [
+                    PurchaseOrder(
+                        po_number=numbers[i],
+                        supplier=rng.choice(suppliers),
+                        order_date=when.date(),
+                        expected_delivery_date=(
+                            when + datetime.timedelta(days=2)
+                        ).date(),
+                        status="COMPLETE",
+                    )
+                    for i, when in zip(ids, order_dates)
+                ],
+            )
+            lines = []
+            for i, order in zip(ids, orders):
+                n_lines = min(LINES_PER_PO, grn_lines - i * LINES_PER_PO)
+                for item in rng.choices(items, cum_weights=weights, k=n_lines):
+                    lines.append(
+                        PurchaseOrderItem(
+                            purchase_order=order,
+                            item=item,
+                            quantity_ordered=Decimal(rng.randint(1, 100)),
+                            unit_price=Decimal(rng.randint(50, 5000)) / 100,
+                        )
+                    )
+            lines = self._bulk(PurchaseOrderItem, lines)
+            grns = self._bulk(
+                GoodsReceivedNote,
+                [
+                    GoodsReceivedNote(
+                        grn_number=grn_numbers[i],
+                        purchase_order=order,
+                        supplier_id=order.supplier_id,
+                        received_date=(when + datetime.timedelta(days=2)).date(),
+                    )
+                    for i, order, when in zip(ids, orders, order_dates)
+                ],
+            )
+            grn_by_po = {g.purchase_order_id: g for g in grns}
+            when_by_po = {o.pk: w for o, w in zip(orders, order_dates)}
+            grn_items, receipts, partial = [], [], set()
+            for line in lines:
+                received = line.quantity_ordered
+                if rng.random() < 0.1:
+                    received = (received * Decimal(rng.randint(50, 99)) / 100).quantize(
+                        Decimal("0.01")
+                    )
+                    partial.add(line.purchase_order_id)
+                grn_items.append(
+                    GRNItem(
+                        grn=grn_by_po[line.purchase_order_id],
+                        po_item=line,
+                        quantity_ordered_on_po=line.quantity_ordered,
+                        quantity_received=received,
+                        unit_price_at_receipt=line.unit_price,
+                    )
+                )
+                receipts.append(
+                    StockTransaction(
+                        item_id=line.item_id,
+                        quantity_change=received,
+                        transaction_type="RECEIVING",
+                        user_id="bench",
+                        related_po_id=line.purchase_order_id,
+                        transaction_date=when_by_po[line.purchase_order_id]
+                        + datetime.timedelta(days=2),
+                    )
+                )
+            self._bulk(GRNItem, grn_items)
+            with _historical_dates(_field(StockTransaction, "transaction_date")):
+                self._bulk(StockTransaction, receipts)
+            PurchaseOrder.objects.filter(pk__in=partial).update(status="PARTIAL")
+            purchase_order_service.recalculate_po_totals([o.pk for o in orders])
+        self._log("purchase orders", n_pos)
+        self._log("GRN lines", grn_lines)
+
+    def _indents(self, count, items):
+        rng = self.rng
+        weights = self._popularity(len(items))
+        stamps = [
+            _field(Indent, name)
+            for name in ("date_submitted", "date_processed", "created_at", "updated_at")
+        ]
+        n_lines = 0
+        for first in range(0, count, self.batch_size):
+            ids = range(first, min(count, first + self.batch_size))
+            rows = []
+            for i in ids:
+                when = self._when((i + rng.random()) / count)
+                rows.append(
+                    Indent(
+                        mrn=f"BM-{i + 1:06d}",
+                        requested_by=f"user{rng.randint(1, 40)}",
+                        department=rng.choice(DEPARTMENTS),
+                        date_required=(when + datetime.timedelta(days=1)).date(),
+                        status=rng.choice(INDENT_STATUSES),
+                        date_submitted=when,
+                        date_processed=when,
+                        created_at=when,
+                        updated_at=when,
+                    )
+                )
+            with _historical_dates(*stamps):
+                indents = self._bulk(Indent, rows)
+            lines = []
+            for indent in indents:
+                for item in rng.choices(
+                    items, cum_weights=weights, k=rng.randint(1, 6)
+                ):
+                    qty = Decimal(rng.randint(1, 20))
+                    done = indent.status == "COMPLETED"
+                    lines.append(
+                        IndentItem(
+                            indent=indent,
+                            item=item,
+                            requested_qty=qty,
+                            issued_qty=qty if done else Decimal("0"),
+                            item_status="ISSUED" if done else "PENDING",
+                        )
+                    )
+            self._bulk(IndentItem, lines)
+            n_lines += len(lines)
+        self._log("indents", count)
+        self._log("indent lines", n_lines)
+
+    def _sales(self, count, recipes):
+        rng = self.rng
+        mains = [r for r in recipes if r.type == "MAIN"] or recipes
+        weights = self._popularity(len(mains))
+        with _historical_dates(_field(SaleTransaction, "sale_date")):
+            for first in range(0, count, self.batch_size):
+                n = min(self.batch_size, count - first)
+                self._bulk(
+                    SaleTransaction,
+                    [
+                        SaleTransaction(
+                            recipe=recipe,
+                            quantity=Decimal(rng.randint(1, 6)),
+                            user_id="pos",
+                            sale_date=self._when((first + k + rng.random()) / count),
+                        )
+                        for k, recipe in enumerate(
+                            rng.choices(mains, cum_weights=weights, k=n)
+                        )
+                    ],
+                )
+        self._log("sales", count)
+
+    def _ledger(self, count, items):
+        """Write issue/sale/wastage/adjustment movements in date order."""
+        if count <= 0:
+            return
+        rng = self.rng
+        weights = self._popularity(len(items))
+        kinds = [kind for kind, _ in LEDGER_MIX]
+        kind_weights = list(accumulate(share for _, share in LEDGER_MIX))
+        with _historical_dates(_field(StockTransaction, "transaction_date")):
+            for first in range(0, count, self.batch_size):
+                n = min(self.batch_size, count - first)
+                picked = rng.choices(items, cum_weights=weights, k=n)
+                types = rng.choices(kinds, cum_weights=kind_weights, k=n)
+                rows = []
+                for k, (item, kind) in enumerate(zip(picked, types)):
+                    qty = Decimal(rng.randint(1, 400)) / 100
+                    if kind != "ADJUSTMENT" or rng.random() < 0.5:
+                        qty = -qty
+                    rows.append(
+                        StockTransaction(
+                            item=item,
+                            quantity_change=qty,
+                            transaction_type=kind,
+                            user_id="bench",
+                            transaction_date=self._when((first + k) / count),
+                        )
+                    )
+                self._bulk(StockTransaction, rows)
+                if first and first % (self.batch_size * 100) == 0:
+                    self._log("stock transactions so far", first)
+        self._log("stock transactions", count)
+
+    def _settle_stock(self):
+        """Set ``current_stock`` to each item's ledger sum in one UPDATE."""
+        totals = (
+            StockTransaction.objects.filter(item_id=OuterRef("pk"))
+            .order_by()
+            .values("item_id")
+            .annotate(total=Sum("quantity_change"))
+            .values("total")
+        )
+        Item.objects.update(
+            current_stock=Coalesce(
+                Subquery(totals),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            updated_at=timezone.now(),
+        )
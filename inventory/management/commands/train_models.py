@@ -1,9 +1,8 @@
-from django.core.management.base import BaseCommand
-
+from core.profiling import ProfiledCommand
 from inventory.services import ml
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommand):
     """Train forecasting and ABC models from stock transaction data."""
 
     help = "Update forecasting models and classifications."
@@ -1,13 +1,18 @@
-from .items import Item, StockTransaction
+from .items import ArchivedStockTotal, Item, StockTransaction
 from .orders import GoodsReceivedNote, GRNItem, Indent, IndentItem, PurchaseOrder, PurchaseOrderItem
 from .suppliers import Supplier
 from .recipes import Recipe, RecipeComponent, SaleTransaction
+from .sequences import DocumentSequence
+from .changes import ChangeTombstone
+from .versions import TableVersion
+from .facets import LedgerFacet
 from .fields import CoerceFloatField
 
 __all__ = [
     "CoerceFloatField",
     "Item",
     "StockTransaction",
+    "ArchivedStockTotal",
     "Supplier",
     "Indent",
     "IndentItem",
@@ -18,4 +23,8 @@ __all__ = [
     "Recipe",
     "RecipeComponent",
     "SaleTransaction",
+    "DocumentSequence",
+    "ChangeTombstone",
+    "TableVersion",
+    "LedgerFacet",
 ]
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class ChangeTombstone(models.Model):
+    """Marker left behind when a row exposed by a change feed is deleted.
+
+    ``resource`` is the ``db_table`` of the deleted row. Tombstones are read in
+    ``tombstone_id`` order so feed clients can replay deletes after a
+    since-token without the deleted row still existing.
+    """
+
+    tombstone_id = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.resource}:{self.object_id} deleted"
+
+    class Meta:
+        managed = False
+        db_table = "change_tombstones"
@@ -0,0 +1,132 @@
+from collections import Counter
+from typing import Iterable
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+
+from .versions import VersionedQuerySet, bump_table_versions
+
+# facet name -> StockTransaction attribute
+LEDGER_FACETS = {
+    "type": "transaction_type",
+    "user": "user_id",
+    "item": "item_id",
+}
+
+
+# Four parameters per row keeps an upsert within SQLite's variable limit.
+BATCH_SIZE = 200
+
+
+class LedgerFacet(models.Model):
+    """Number of ledger rows per day for one transaction type, user or item.
+
+    Counts are added for every inserted ``StockTransaction`` and subtracted
+    for every deleted one (see :func:`record_ledger_facets`), so filter dropdowns and their counts are read
+    from this small table instead of ``DISTINCT`` scans of the ledger.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    facet = models.CharField(max_length=10)
+    value = models.CharField(max_length=255)
+    day = models.DateField()
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.facet}={self.value} {self.day}: {self.count}"
+
+    class Meta:
+        managed = False
+        db_table = "stock_transaction_facets"
+        unique_together = (("facet", "value", "day"),)
+
+
+class _FacetDelta:
+    """``on_commit`` callback applying the facet counts of a transaction's writes."""
+
+    def __init__(self, using: str):
+        self.using = using
+        self.counts: Counter = Counter()
+        self.done = False
+        self.__qualname__ = "record_ledger_facets"
+
+    def __call__(self) -> None:
+        self.done = True
+        add_facet_counts(self.counts, using=self.using)
+
+
+def add_facet_counts(counts: Counter, using: str = DEFAULT_DB_ALIAS) -> None:
+    """Add ``{(facet, value, day): n}`` to the stored counts in batched upserts.
+
+    ``n`` may be negative; rows whose count drops to zero are deleted.
+    """
+    rows = [(f, v, d, n) for (f, v, d), n in counts.items() if n]
+    if not rows:
+        return
+    connection = connections[using]
+    table = connection.ops.quote_name(LedgerFacet._meta.db_table)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            end = start + BATCH_SIZE
+            batch = rows[start:end]
+            cursor.execute(
+                f"INSERT INTO {table} (facet, value, day, count) VALUES "
+                + ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+                + " ON CONFLICT (facet, value, day) DO UPDATE "
+                f"SET count = {table}.count + excluded.count",
+                [param for row in batch for param in row],
+            )
+        if any(n < 0 for *_, n in rows):
+            cursor.execute(f"DELETE FROM {table} WHERE count <= 0")
+    bump_table_versions(LedgerFacet._meta.db_table, using=using)
+
+
+def record_ledger_facets(
+    rows: Iterable, using: str = DEFAULT_DB_ALIAS, *, removed: bool = False
+) -> None:
+    """Count the inserted (or, with ``removed``, deleted) ledger ``rows``.
+
+    The counts are applied once the current transaction commits.
+    Like table-version bumps, all inserts of one transaction share a single
+    callback, so concurrent writers do not hold locks on the hot facet rows.
+    """
+    step = -1 if removed else 1
+    counts: Counter = Counter()
+    for row in rows:
+        when = row.transaction_date or timezone.now()
+        day = timezone.localdate(when) if timezone.is_aware(when) else when.date()
+        for facet, attr in LEDGER_FACETS.items():
+            value = getattr(row, attr)
+            if value not in (None, ""):
+                counts[(facet, str(value), day)] += step
+    if not counts:
+        return
+    connection = connections[using]
+    if connection.in_atomic_block:
+        for entry in connection.run_on_commit:
+            if isinstance(entry[1], _FacetDelta) and not entry[1].done:
+                entry[1].counts.update(counts)
+                return
+    callback = _FacetDelta(using)
+    callback.counts.update(counts)
+    # robust: losing a count must not fail a write that already committed;
+    # ``ledger_facets.rebuild()`` recounts from the ledger.
+    transaction.on_commit(callback, using=using, robust=True)
+
+
+class LedgerQuerySet(VersionedQuerySet):
+    """``VersionedQuerySet`` whose ``bulk_create`` also counts ledger facets.
+
+    Single ``save()`` inserts are counted by a ``post_save`` receiver connected
+    in ``InventoryConfig.ready``. Deletes, single or through ``delete()`` on a
+    queryset, are subtracted by a ``post_delete`` receiver: the ledger has
+    delete receivers, so Django sends the signal for every deleted row.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        record_ledger_facets(created, using=self.db)
+        return created
+
+
+LedgerManager = models.Manager.from_queryset(LedgerQuerySet)
@@ -3,7 +3,9 @@ from decimal import Decimal
 from django.conf import settings
 from django.db import models
 
+from .facets import LedgerManager
 from .fields import CoerceFloatField
+from .versions import VersionedManager
 
 
 class Item(models.Model):
@@ -23,6 +25,8 @@ class Item(models.Model):
     is_active = models.BooleanField(default=True, null=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.name or f"Item {self.pk}"
 
@@ -61,9 +65,36 @@ class StockTransaction(models.Model):
     notes = models.TextField(blank=True, null=True)
     transaction_date = models.DateTimeField(auto_now_add=True)
 
+    objects = LedgerManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"Transaction {self.pk} for {self.item}"
 
     class Meta:
         managed = False
         db_table = "stock_transactions"
+
+
+class ArchivedStockTotal(models.Model):
+    """Monthly ledger totals of an item kept after its transactions are archived.
+
+    ``archive_stock_transactions`` writes one row per item, transaction type and
+    month before it moves that month out of ``stock_transactions``, so balances
+    and historical totals still add up without the archived rows.
+    """
+
+    item = models.ForeignKey(
+        Item, models.DO_NOTHING, db_column="item_id", blank=True, null=True
+    )
+    transaction_type = models.CharField(max_length=50, blank=True, null=True)
+    month = models.DateField()
+    quantity_change = models.DecimalField(max_digits=14, decimal_places=2)
+    transaction_count = models.IntegerField()
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.item_id} {self.transaction_type} {self.month:%Y-%m}"
+
+    class Meta:
+        managed = False
+        db_table = "stock_transaction_archive_totals"
+        unique_together = (("item", "transaction_type", "month"),)
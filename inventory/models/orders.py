@@ -1,11 +1,11 @@
 from decimal import Decimal
 
 from django.db import models
-from django.db.models import Sum
 
 from .items import Item
 from .suppliers import Supplier
 from .fields import CoerceFloatField
+from .versions import VersionedManager
 
 class Indent(models.Model):
     """Represents a material requisition from a department."""
@@ -23,6 +23,8 @@ class Indent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.mrn or f"Indent {self.pk}"
 
@@ -50,6 +52,8 @@ class IndentItem(models.Model):
     item_status = models.CharField(max_length=50, blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"{self.indent} - {self.item}"
 
@@ -62,6 +66,7 @@ class PurchaseOrder(models.Model):
     """Orders items from a supplier based on approved indents."""
 
     po_id = models.AutoField(primary_key=True)
+    po_number = models.CharField(max_length=50, unique=True, blank=True, null=True)
     supplier = models.ForeignKey(Supplier, models.CASCADE, db_column="supplier_id")
     order_date = models.DateField()
     expected_delivery_date = models.DateField(blank=True, null=True)
@@ -77,6 +82,22 @@ class PurchaseOrder(models.Model):
         default="DRAFT",
     )
     notes = models.TextField(blank=True, null=True)
+    # Denormalized quantity totals maintained by the PO and GRN services so
+    # list views can show progress without joining lines and GRN items.
+    ordered_total = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0")
+    )
+    received_total = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0")
+    )
+
+    objects = VersionedManager()
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.ordered_total:
+            return 0
+        return int(self.received_total / self.ordered_total * 100)
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"PO {self.pk} to {self.supplier}"
@@ -94,16 +115,20 @@ class PurchaseOrderItem(models.Model):
     item = models.ForeignKey(Item, models.DO_NOTHING, db_column="item_id")
     quantity_ordered = models.DecimalField(max_digits=10, decimal_places=2)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Running totals of GRN lines against this PO line, kept in step by
+    # goods_receiving_service and checked by ``reconcile_po_totals``.
+    received_qty = models.DecimalField(
+        max_digits=10, decimal_places=2, default=Decimal("0")
+    )
+    received_value = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0")
+    )
+
+    objects = VersionedManager()
 
     @property
     def received_total(self) -> Decimal:
-        value = self.__dict__.get("_received_total")
-        if value is not None:
-            return value or Decimal("0")
-        total = self.grnitem_set.aggregate(total=Sum("quantity_received"))[
-            "total"
-        ] or Decimal("0")
-        return total
+        return self.received_qty or Decimal("0")
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"{self.purchase_order} - {self.item}"
@@ -117,11 +142,14 @@ class GoodsReceivedNote(models.Model):
     """Acknowledges receipt of goods for a purchase order."""
 
     grn_id = models.AutoField(primary_key=True)
+    grn_number = models.CharField(max_length=50, unique=True, blank=True, null=True)
     purchase_order = models.ForeignKey(PurchaseOrder, models.CASCADE, db_column="po_id")
     supplier = models.ForeignKey(Supplier, models.CASCADE, db_column="supplier_id")
     received_date = models.DateField()
     notes = models.TextField(blank=True, null=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"GRN {self.pk} for PO {self.purchase_order_id}"
 
@@ -143,6 +171,8 @@ class GRNItem(models.Model):
     unit_price_at_receipt = models.DecimalField(max_digits=10, decimal_places=2)
     item_notes = models.TextField(blank=True, null=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"{self.grn} item {self.po_item}"
 
@@ -3,6 +3,7 @@ from decimal import Decimal
 from django.db import models
 
 from .fields import CoerceFloatField
+from .versions import VersionedManager
 
 
 class Recipe(models.Model):
@@ -21,6 +22,8 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VersionedManager()
+
     def __str__(self):
         return self.name or f"Recipe {self.pk}"
 
@@ -47,6 +50,8 @@ class RecipeComponent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VersionedManager()
+
     def __str__(self):
         return f"{self.parent_recipe} component #{self.pk}"
 
@@ -66,6 +71,8 @@ class SaleTransaction(models.Model):
     notes = models.TextField(blank=True, null=True)
     sale_date = models.DateTimeField(auto_now_add=True)
 
+    objects = VersionedManager()
+
     def __str__(self):
         return f"Sale {self.pk} of {self.recipe}"
 
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class DocumentSequence(models.Model):
+    """Counter row used to allocate printed document numbers.
+
+    One row exists per ``(prefix, year)`` pair. ``year`` is ``0`` for
+    sequences that never reset. Rows are locked with ``SELECT ... FOR UPDATE``
+    while numbers are allocated so concurrent requests cannot hand out the
+    same number twice.
+    """
+
+    sequence_id = models.AutoField(primary_key=True)
+    prefix = models.CharField(max_length=20)
+    year = models.IntegerField(default=0)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.prefix}/{self.year}: {self.last_value}"
+
+    class Meta:
+        managed = False
+        db_table = "document_sequences"
+        unique_together = ("prefix", "year")
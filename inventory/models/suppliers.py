@@ -1,5 +1,7 @@
 from django.db import models
 
+from .versions import VersionedManager
+
 
 class Supplier(models.Model):
     """Stores vendor contact and activity information."""
@@ -14,6 +16,8 @@ class Supplier(models.Model):
     is_active = models.BooleanField(default=True, null=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VersionedManager()
+
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.name or f"Supplier {self.pk}"
 
@@ -0,0 +1,168 @@
+import logging
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_PREFIX = "table-version:"
+
+
+class TableVersion(models.Model):
+    """Per-table change counter used to validate cached responses.
+
+    The counter of a table is incremented after every committed transaction
+    that wrote to it, so ``(table, version)`` pairs make cheap ETags and cache
+    keys: one indexed read replaces re-running the query behind a page.
+    """
+
+    table_name = models.CharField(max_length=63, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.table_name}@{self.version}"
+
+    class Meta:
+        managed = False
+        db_table = "table_versions"
+
+
+class _VersionBump:
+    """``on_commit`` callback collecting the tables written in a transaction."""
+
+    def __init__(self, using: str):
+        self.using = using
+        self.tables: set = set()
+        self.done = False
+        # Named in Django's log message if a robust callback fails.
+        self.__qualname__ = "bump_table_versions"
+
+    def __call__(self) -> None:
+        self.done = True
+        tables = sorted(self.tables)
+        connection = connections[self.using]
+        table = connection.ops.quote_name(TableVersion._meta.db_table)
+        # The upsert returns the new versions and holds the rows locked until
+        # they are published, so concurrent bumps of a table publish in the
+        # order they incremented it and the cache never goes backwards. set()
+        # also wins over a reader's add() of the value it replaces.
+        with transaction.atomic(using=self.using), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (table_name, version) VALUES "
+                + ", ".join(["(%s, 1)"] * len(tables))
+                + " ON CONFLICT (table_name) DO UPDATE "
+                f"SET version = {table}.version + 1 RETURNING table_name, version",
+                tables,
+            )
+            versions = {VERSION_CACHE_PREFIX + name: v for name, v in cursor}
+            try:
+                cache.set_many(versions, settings.TABLE_VERSION_CACHE_TTL)
+            except Exception:  # keep the bump for readers that miss the cache
+                logger.exception("Could not publish table versions %s", tables)
+
+
+def bump_table_versions(*tables: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    """Increment the version of ``tables`` once the current transaction commits.
+
+    All bumps inside one transaction share a single callback, so a request that
+    writes many rows issues one upsert at commit time. Bumping after commit
+    keeps the counter rows out of the writers' locks; readers may briefly see
+    new data under the old version, which only costs them one extra refresh.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block:
+        for entry in connection.run_on_commit:
+            if isinstance(entry[1], _VersionBump) and not entry[1].done:
+                entry[1].tables.update(tables)
+                return
+    callback = _VersionBump(using)
+    callback.tables.update(tables)
+    # robust: a failed bump must not surface as an error for a write that
+    # has already committed (callers could otherwise retry and apply it twice).
+    transaction.on_commit(callback, using=using, robust=True)
+
+
+def has_pending_bumps(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """Return whether the current transaction wrote tables not yet bumped.
+
+    Until it commits, such a transaction sees its own writes under the old
+    versions, so it must not read or fill version-keyed caches.
+    """
+    connection = connections[using]
+    return connection.in_atomic_block and any(
+        isinstance(entry[1], _VersionBump) and not entry[1].done
+        for entry in connection.run_on_commit
+    )
+
+
+def get_table_versions(tables: Iterable[str]) -> Dict[str, int]:
+    """Return the current version of each table; unseen tables are ``0``."""
+    tables = list(tables)
+    versions = dict(
+        TableVersion.objects.filter(table_name__in=tables).values_list(
+            "table_name", "version"
+        )
+    )
+    return {t: versions.get(t, 0) for t in tables}
+
+
+def cached_table_versions(tables: Iterable[str]) -> Dict[str, int]:
+    """Like :func:`get_table_versions`, but read through the shared cache.
+
+    Versions are published to the cache by every bump, so a hit costs no
+    query. Misses are read from the database and stored with ``add()``, which
+    never overwrites a newer value published by a concurrent bump. Writes
+    made outside the ORM (raw SQL, other apps) show after
+    ``TABLE_VERSION_CACHE_TTL`` seconds.
+    """
+    keys = {t: VERSION_CACHE_PREFIX + t for t in tables}
+    found = cache.get_many(list(keys.values()))
+    versions = {t: found[key] for t, key in keys.items() if key in found}
+    missing = [t for t in keys if t not in versions]
+    if missing:
+        fresh = get_table_versions(missing)
+        for table, version in fresh.items():
+            cache.add(keys[table], version, settings.TABLE_VERSION_CACHE_TTL)
+        versions.update(fresh)
+    return versions
+
+
+class VersionedQuerySet(models.QuerySet):
+    """QuerySet whose set-based writes bump the model's table version.
+
+    ``save()`` and ``delete()`` of single instances are covered by the
+    ``post_save``/``post_delete`` receivers connected in
+    ``InventoryConfig.ready``.
+    """
+
+    def _bump(self) -> None:
+        bump_table_versions(self.model._meta.db_table, using=self.db)
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            self._bump()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            self._bump()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            self._bump()
+        return rows
+
+    def delete(self):
+        deleted = super().delete()
+        if deleted[0]:
+            self._bump()
+        return deleted
+
+
+VersionedManager = models.Manager.from_queryset(VersionedQuerySet)
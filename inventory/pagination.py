@@ -0,0 +1,22 @@
+"""Pagination classes for the DRF API."""
+
+from rest_framework.pagination import CursorPagination
+
+
+class LedgerCursorPagination(CursorPagination):
+    """Keyset pagination for append-only ledger resources.
+
+    Pages are fetched with ``WHERE pk < <cursor> ORDER BY pk DESC LIMIT n``
+    instead of ``COUNT(*)`` plus ``OFFSET``, so the cost of a page does not
+    grow with the size of the table or the page number. Views may override the
+    ordering with a ``cursor_ordering`` attribute naming a unique column.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "-pk"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
@@ -117,12 +117,16 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         model = PurchaseOrder
         fields = [
             "po_id",
+            "po_number",
             "supplier",
             "order_date",
             "expected_delivery_date",
             "status",
             "notes",
+            "ordered_total",
+            "received_total",
         ]
+        read_only_fields = ["po_number", "ordered_total", "received_total"]
 
 
 class PurchaseOrderItemSerializer(serializers.ModelSerializer):
@@ -136,7 +140,10 @@ class PurchaseOrderItemSerializer(serializers.ModelSerializer):
             "item",
             "quantity_ordered",
             "unit_price",
+            "received_qty",
+            "received_value",
         ]
+        read_only_fields = ["received_qty", "received_value"]
 
 
 class GoodsReceivedNoteSerializer(serializers.ModelSerializer):
@@ -146,11 +153,13 @@ class GoodsReceivedNoteSerializer(serializers.ModelSerializer):
         model = GoodsReceivedNote
         fields = [
             "grn_id",
+            "grn_number",
             "purchase_order",
             "supplier",
             "received_date",
             "notes",
         ]
+        read_only_fields = ["grn_number"]
 
 
 class GRNItemSerializer(serializers.ModelSerializer):
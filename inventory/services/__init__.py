@@ -1,6 +1,7 @@
 """Service layer for the inventory app."""
 
 from . import (
+    change_feed,
     counts,
     dashboard_service,
     goods_receiving_service,
@@ -11,6 +12,7 @@ from . import (
     purchase_order_service,
     recipe_service,
     sale_service,
+    sequence_service,
     stock_service,
     supabase_client,
     supabase_categories,
@@ -31,8 +33,10 @@ __all__ = [
     "ui_service",
     "list_utils",
     "sale_service",
+    "sequence_service",
     "kpis",
     "counts",
+    "change_feed",
     "supabase_client",
     "supabase_units",
     "supabase_categories",
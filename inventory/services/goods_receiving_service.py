@@ -1,10 +1,12 @@
 import logging
+from collections import defaultdict
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
 from django.db import transaction
-from django.db.models import Max
+from django.db.models import Case, F, Q, When
 
+from core import metrics
 from inventory.models import (
     GoodsReceivedNote,
     GRNItem,
@@ -14,14 +16,14 @@ from inventory.models import (
     Supplier,
 )
 
-from . import stock_service
+from . import purchase_order_service, sequence_service, stock_service
+from .query_utils import case_by_pk
 
 logger = logging.getLogger(__name__)
 
-
-def generate_grn_number() -> str:
-    next_id = (GoodsReceivedNote.objects.aggregate(m=Max("grn_id"))["m"] or 0) + 1
-    return f"GRN-{next_id:04d}"
+CREATE_GRN_SECONDS = metrics.histogram(
+    "inventory_create_grn_seconds", "Duration of create_grn calls."
+)
 
 
 def _validate_inputs(
@@ -46,6 +48,9 @@ def _create_grn_header(
         else None
     )
     grn = GoodsReceivedNote.objects.create(
+        grn_number=sequence_service.next_number(
+            sequence_service.GRN_PREFIX, on_date=grn_data["received_date"]
+        ),
         purchase_order=po,
         supplier=supplier,
         received_date=grn_data["received_date"],
@@ -60,16 +65,24 @@ def _process_items(
     user_id: str,
     po: Optional[PurchaseOrder],
 ) -> None:
-    grn_number = generate_grn_number()
+    """Create GRN lines, ledger rows and stock updates in set-based queries.
+
+    The query count is constant in the number of lines: one lookup each for
+    items and PO lines, one bulk insert of GRN lines, one grouped stock
+    update, one bulk ledger insert and one update each for the PO line
+    counters and the PO header.
+    """
     item_ids = {d["item_id"] for d in items_received_data}
     po_item_ids = {d["po_item_id"] for d in items_received_data}
-    items = Item.objects.in_bulk(item_ids)
+    known_item_ids = set(
+        Item.objects.filter(pk__in=item_ids).values_list("pk", flat=True)
+    )
     po_items = PurchaseOrderItem.objects.in_bulk(po_item_ids)
 
     grn_items: List[GRNItem] = []
+    movements: List[Dict[str, Any]] = []
     for item_d in items_received_data:
-        item = items.get(item_d["item_id"])
-        if item is None:
+        if item_d["item_id"] not in known_item_ids:
             raise Item.DoesNotExist(f"Item {item_d['item_id']} not found")
         po_item = po_items.get(item_d["po_item_id"])
         if po_item is None:
@@ -89,33 +102,59 @@ def _process_items(
                 item_notes=item_d.get("item_notes"),
             )
         )
-        stock_service.record_stock_transaction(
-            item_id=item.item_id,
-            quantity_change=qty,
-            transaction_type="RECEIVING",
-            user_id=user_id,
-            related_po_id=po.po_id if po else None,
-            notes=f"GRN {grn_number}",
+        movements.append(
+            {
+                "item_id": item_d["item_id"],
+                "quantity_change": qty,
+                "transaction_type": "RECEIVING",
+                "user_id": user_id,
+                "related_po_id": po.po_id if po else None,
+                "notes": f"GRN {grn.grn_number}",
+            }
         )
 
     GRNItem.objects.bulk_create(grn_items)
-    if po:
-        _update_po_status(po)
+    stock_service.apply_stock_movements(movements)
+    _apply_received_totals(grn_items, po)
 
 
-def _update_po_status(po: PurchaseOrder) -> None:
-    from django.db.models import Sum
-
-    fully_received = all(
-        i.received_total >= i.quantity_ordered
-        for i in po.purchaseorderitem_set.annotate(
-            _received_total=Sum("grnitem__quantity_received")
+def _apply_received_totals(
+    grn_items: List[GRNItem], po: Optional[PurchaseOrder]
+) -> None:
+    """Add the received quantities to the PO line and header counters.
+
+    Line counters are bumped with one grouped UPDATE and the header totals
+    with a second. When the GRN is against ``po`` the same header UPDATE sets
+    its :func:`~purchase_order_service.receipt_status` from the (already
+    updated) lines without touching GRN items.
+    """
+    line_qty: Dict[int, Decimal] = defaultdict(Decimal)
+    line_value: Dict[int, Decimal] = defaultdict(Decimal)
+    order_qty: Dict[int, Decimal] = defaultdict(Decimal)
+    for gi in grn_items:
+        line_qty[gi.po_item_id] += gi.quantity_received
+        line_value[gi.po_item_id] += purchase_order_service.line_value(
+            gi.quantity_received, gi.unit_price_at_receipt
         )
+        order_qty[gi.po_item.purchase_order_id] += gi.quantity_received
+
+    PurchaseOrderItem.objects.filter(pk__in=list(line_qty)).update(
+        received_qty=F("received_qty") + case_by_pk(line_qty, max_digits=10),
+        received_value=F("received_value") + case_by_pk(line_value),
     )
-    po.status = "COMPLETE" if fully_received else "PARTIAL"
-    po.save()
+    header_updates: Dict[str, Any] = {
+        "received_total": F("received_total") + case_by_pk(order_qty)
+    }
+    if po:
+        header_updates["status"] = Case(
+            When(~Q(pk=po.pk), then=F("status")),
+            default=purchase_order_service.receipt_status(),
+        )
+    po_ids = set(order_qty) | ({po.pk} if po else set())
+    PurchaseOrder.objects.filter(pk__in=po_ids).update(**header_updates)
 
 
+@CREATE_GRN_SECONDS.time()
 def create_grn(
     grn_data: Dict[str, Any], items_received_data: List[Dict[str, Any]]
 ) -> Tuple[bool, str, Optional[int]]:
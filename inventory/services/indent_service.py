@@ -0,0 +1,156 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from inventory.models import Indent, IndentItem, Item
+
+from . import stock_service
+from .query_utils import case_by_pk
+
+logger = logging.getLogger(__name__)
+
+ISSUABLE_STATUSES = ("APPROVED", "PROCESSING")
+
+
+def issue_indents(
+    indent_ids: Iterable[int],
+    *,
+    user_id: str = "System",
+    partial: bool = True,
+) -> Tuple[bool, str, Dict[int, str]]:
+    """Issue stock against many approved indents in one transaction.
+
+    Indents are served in order of ``date_required`` (then id), each line
+    getting what is outstanding (requested minus issued) as far as stock
+    allows. With ``partial=False`` an indent that cannot be issued in full is
+    left untouched and its shortfall is not reported. Fully issued indents
+    become ``COMPLETED`` and the rest ``PROCESSING``; an indent without any
+    stocked lines is left alone.
+
+    The query count is constant in the number of indents and lines: one
+    locked read each of the indents, their lines and the items' stock, then
+    one grouped update each of the lines (``issued_qty`` and ``item_status``)
+    and the indents, and one grouped stock update plus one bulk insert of
+    ISSUE ledger rows linked through ``related_indent``. Items are locked in primary-key order, so
+    concurrent batches do not deadlock and cannot issue the same stock twice.
+
+    Returns:
+        ``(success, message, statuses)`` where ``statuses`` maps each indent
+        that had stock issued to its new status.
+    """
+    indent_ids = list(indent_ids)
+    if not indent_ids:
+        return False, "No indents provided.", {}
+    with transaction.atomic():
+        indents = list(
+            Indent.objects.select_for_update()
+            .filter(pk__in=indent_ids, status__in=ISSUABLE_STATUSES)
+            .order_by(F("date_required").asc(nulls_last=True), "indent_id")
+            .values_list("indent_id", "mrn")
+        )
+        if not indents:
+            return False, "No approved indents to issue.", {}
+        lines: Dict[int, List[Tuple[int, int, Decimal]]] = defaultdict(list)
+        already_issued: Set[int] = set()
+        for line_id, indent_id, item_id, requested, issued in (
+            IndentItem.objects.select_for_update()
+            .filter(indent_id__in=[pk for pk, _ in indents], item__isnull=False)
+            .order_by("indent_item_id")
+            .values_list(
+                "indent_item_id", "indent_id", "item_id", "requested_qty", "issued_qty"
+            )
+        ):
+            outstanding = (requested or Decimal("0")) - (issued or Decimal("0"))
+            if outstanding > 0:
+                lines[indent_id].append((line_id, item_id, outstanding))
+            else:
+                already_issued.add(indent_id)
+        available = {
+            pk: Decimal(str(stock or 0))
+            for pk, stock in Item.objects.select_for_update()
+            .filter(pk__in={item_id for ls in lines.values() for _, item_id, _ in ls})
+            .order_by("pk")
+            .values_list("pk", "current_stock")
+        }
+
+        issued: Dict[int, Decimal] = {}
+        filled: List[int] = []
+        complete: List[int] = []
+        short: List[int] = []
+        shortages: Dict[int, Decimal] = defaultdict(Decimal)
+        movements: List[Dict[str, Any]] = []
+        held = 0
+        for indent_id, mrn in indents:
+            if indent_id not in lines:
+                # Nothing outstanding: complete it only if it has issued lines.
+                if indent_id in already_issued:
+                    complete.append(indent_id)
+                continue
+            allocation = []
+            for line_id, item_id, outstanding in lines[indent_id]:
+                qty = min(outstanding, max(available.get(item_id, 0), Decimal("0")))
+                allocation.append((line_id, item_id, qty, outstanding))
+            full = all(qty == need for _, _, qty, need in allocation)
+            if not full and not partial:
+                held += 1
+                continue
+            for line_id, item_id, qty, need in allocation:
+                if qty < need:
+                    shortages[item_id] += need - qty
+                if qty <= 0:
+                    continue
+                available[item_id] -= qty
+                issued[line_id] = qty
+                if qty == need:
+                    filled.append(line_id)
+                movements.append(
+                    {
+                        "item_id": item_id,
+                        "quantity_change": -qty,
+                        "transaction_type": "ISSUE",
+                        "user_id": user_id,
+                        "related_indent_id": indent_id,
+                        "notes": f"Indent {mrn}",
+                    }
+                )
+            if full:
+                complete.append(indent_id)
+            elif any(qty > 0 for _, _, qty, _ in allocation):
+                short.append(indent_id)
+
+        if issued:
+            IndentItem.objects.filter(pk__in=list(issued)).update(
+                issued_qty=Coalesce(F("issued_qty"), Decimal("0")) + case_by_pk(issued),
+                item_status=Case(
+                    When(pk__in=filled, then=Value("ISSUED")), default=Value("PARTIAL")
+                ),
+            )
+            stock_service.apply_stock_movements(movements)
+        statuses = {pk: "COMPLETED" for pk in complete}
+        statuses.update({pk: "PROCESSING" for pk in short})
+        if statuses:
+            Indent.objects.filter(pk__in=list(statuses)).update(
+                status=Case(
+                    When(pk__in=complete, then=Value("COMPLETED")),
+                    default=Value("PROCESSING"),
+                ),
+                processed_by_user_id=user_id,
+                date_processed=Now(),
+                updated_at=Now(),
+            )
+
+    msg = (
+        f"Issued {len(issued)} line(s): {len(complete)} indent(s) completed, "
+        f"{len(short)} partially issued."
+    )
+    if held:
+        msg += f" {held} indent(s) could not be issued in full and were left as is."
+    if shortages:
+        msg += f" Short of stock: {sorted(shortages)}"
+    logger.info(msg)
+    return bool(statuses), msg, statuses
@@ -19,6 +19,7 @@ from django.db.models import Sum
 from django.db.models.functions import Coalesce
 
 from inventory.models import Item
+from inventory.services.ledger_archive import archived_quantity
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,7 @@ def get_all_items_with_stock(include_inactive: bool = False) -> List[Dict[str, A
         qs = qs.filter(is_active=True)
     qs = qs.annotate(
         _stock=Coalesce(Sum("stocktransaction__quantity_change"), Decimal("0"))
+        + archived_quantity()
     )
     data = list(
         qs.values(
@@ -314,6 +316,7 @@ def get_item_details(item_id: int) -> Optional[Dict[str, Any]]:
         Item.objects.filter(pk=item_id)
         .annotate(
             _stock=Coalesce(Sum("stocktransaction__quantity_change"), Decimal("0"))
+            + archived_quantity()
         )
         .values(
             "item_id",
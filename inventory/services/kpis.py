@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 from typing import List, Tuple
 
@@ -108,8 +108,11 @@ def stock_trend_last_7_days() -> Tuple[List[str], List[float]]:
     """Return labels and net stock change for the past 7 days."""
     today = timezone.now().date()
     start = today - timedelta(days=6)
+    # A range on the column itself (not ``__date``) lets PostgreSQL skip the
+    # ledger partitions outside the window.
+    since = timezone.make_aware(datetime.combine(start, time.min))
     qs = (
-        StockTransaction.objects.filter(transaction_date__date__gte=start)
+        StockTransaction.objects.filter(transaction_date__gte=since)
         .annotate(day=TruncDate("transaction_date"))
         .values("day")
         .annotate(total=Sum("quantity_change"))
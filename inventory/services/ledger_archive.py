@@ -0,0 +1,314 @@
+"""Move old months of ``stock_transactions`` out of the live ledger.
+
+On PostgreSQL the ledger is range-partitioned by month
+(``db/migrations/007_partition_stock_transactions.sql``). Archiving a month
+detaches its partition and either attaches it to ``stock_transactions_archive``
+or writes its rows to a gzip-compressed CSV file and drops it, so neither
+copies rows inside the database. Rows outside a monthly partition (and every
+row on other databases) are moved with ``INSERT``/``DELETE``.
+
+Before a month leaves the ledger its per-item, per-type totals are added to
+``stock_transaction_archive_totals``; :func:`archived_quantity` adds them back
+wherever balances are summed from the ledger, so they stay exact. Archived rows
+do not leave change-feed tombstones: they were moved, not deleted.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import gzip
+import re
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from inventory.models import ArchivedStockTotal, StockTransaction
+from inventory.models.versions import bump_table_versions
+from inventory.services import ledger_facets
+
+LEDGER_TABLE = StockTransaction._meta.db_table
+ARCHIVE_TABLE = "stock_transactions_archive"
+DESTINATIONS = ("table", "file")
+
+_PARTITION_RE = re.compile(rf"^{LEDGER_TABLE}_y(\d{{4}})m(\d{{2}})$")
+_UTC = datetime.timezone.utc
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    """Return the first day of the month ``count`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def archive_cutoff(months: int, today: Optional[datetime.date] = None) -> datetime.date:
+    """Return the first month to keep when keeping ``months`` full months."""
+    today = today or datetime.datetime.now(_UTC).date()
+    return add_months(today.replace(day=1), -months)
+
+
+def _month_start(month: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(month, datetime.time.min, tzinfo=_UTC)
+
+
+def _as_date(value: Any) -> datetime.date:
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def archived_quantity(item_ref: str = "pk") -> Coalesce:
+    """Return an expression summing the archived quantity of ``OuterRef(item_ref)``."""
+    totals = (
+        ArchivedStockTotal.objects.filter(item=OuterRef(item_ref))
+        .values("item")
+        .annotate(total=Sum("quantity_change"))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(totals),
+        Value(Decimal("0")),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def archived_monthly_totals(
+    *,
+    item_id: Any = None,
+    transaction_type: Optional[str] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> Tuple[Dict[datetime.date, Decimal], bool]:
+    """Return the archived net quantity per month for a ledger report filter.
+
+    Only months lying wholly within ``start``..``end`` (both days included)
+    are returned. The flag is true when the range cuts through an archived
+    month, whose share cannot be recovered from its monthly total.
+    """
+    rows = ArchivedStockTotal.objects.all()
+    if item_id:
+        rows = rows.filter(item_id=item_id)
+    if transaction_type:
+        rows = rows.filter(transaction_type=transaction_type)
+    cut: List[datetime.date] = []
+    matching = rows
+    if start:
+        first = start.replace(day=1)
+        if start.day != 1:
+            cut.append(first)
+            first = add_months(first, 1)
+        rows = rows.filter(month__gte=first)
+    if end:
+        last = end.replace(day=1)
+        if end + datetime.timedelta(days=1) == add_months(last, 1):
+            last = add_months(last, 1)
+        else:
+            cut.append(last)
+        rows = rows.filter(month__lt=last)
+    totals = {
+        row["month"]: row["total"]
+        for row in rows.values("month").annotate(total=Sum("quantity_change"))
+    }
+    return totals, bool(cut) and matching.filter(month__in=cut).exists()
+
+
+def ensure_partitions(months_ahead: int = 3) -> int:
+    """Create the ledger partitions up to ``months_ahead`` months from now.
+
+    Returns the number of partitions created; always ``0`` on databases
+    without partitioning.
+    """
+    if connection.vendor != "postgresql":
+        return 0
+    first = datetime.datetime.now(_UTC).date().replace(day=1)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT public.create_monthly_partitions(%s, %s, %s)",
+            [LEDGER_TABLE, first, add_months(first, months_ahead)],
+        )
+        return cursor.fetchone()[0]
+
+
+def pending_months(cutoff: datetime.date) -> List[Dict[str, Any]]:
+    """Return ``month``, ``rows`` and ``quantity`` for each month before ``cutoff``."""
+    rows = (
+        StockTransaction.objects.filter(transaction_date__lt=_month_start(cutoff))
+        .annotate(month=TruncMonth("transaction_date", tzinfo=_UTC))
+        .values("month")
+        .annotate(rows=Count("pk"), quantity=Sum("quantity_change"))
+        .order_by("month")
+    )
+    return [
+        {
+            "month": _as_date(row["month"]),
+            "rows": row["rows"],
+            "quantity": row["quantity"] or Decimal("0"),
+        }
+        for row in rows
+    ]
+
+
+def archive_before(
+    cutoff: datetime.date,
+    destination: str = "table",
+    output_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Archive every ledger row dated before ``cutoff`` (a first of the month).
+
+    ``destination`` is ``"table"`` (PostgreSQL only) or ``"file"``, which
+    appends each month to ``<output_dir>/stock_transactions_YYYY_MM.csv.gz``.
+    Everything happens in one transaction. Returns :func:`pending_months`.
+
+    Raises:
+        ValueError: for an unknown destination, or ``"table"`` on a database
+            without the archive table.
+    """
+    if destination not in DESTINATIONS:
+        raise ValueError(f"Unknown archive destination {destination!r}")
+    if destination == "table" and connection.vendor != "postgresql":
+        raise ValueError("Archiving to a table requires PostgreSQL; use a file.")
+    if destination == "file" and output_dir is None:
+        raise ValueError("An output directory is required to archive to files.")
+
+    with transaction.atomic():
+        months = pending_months(cutoff)
+        if not months:
+            return months
+        _add_totals(cutoff)
+        if destination == "file":
+            for month in months:
+                month["file"] = _export_month(month["month"], Path(output_dir))
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                _move_partitions(cursor, cutoff, destination)
+            if destination == "table":
+                _copy_rows_to_archive(cursor, cutoff)
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(LEDGER_TABLE)} "
+                "WHERE transaction_date < %s",
+                [_month_start(cutoff)],
+            )
+        ledger_facets.forget_before(cutoff)
+        bump_table_versions(LEDGER_TABLE, ArchivedStockTotal._meta.db_table)
+    return months
+
+
+def _add_totals(cutoff: datetime.date) -> None:
+    rows = (
+        StockTransaction.objects.filter(transaction_date__lt=_month_start(cutoff))
+        .annotate(month=TruncMonth("transaction_date", tzinfo=_UTC))
+        .values("item_id", "transaction_type", "month")
+        .annotate(quantity=Sum("quantity_change"), count=Count("pk"))
+    )
+    existing = {
+        (t.item_id, t.transaction_type, t.month): t
+        for t in ArchivedStockTotal.objects.select_for_update().filter(month__lt=cutoff)
+    }
+    created, updated = [], []
+    for row in rows:
+        key = (row["item_id"], row["transaction_type"], _as_date(row["month"]))
+        quantity = row["quantity"] or Decimal("0")
+        total = existing.get(key)
+        if total is None:
+            created.append(
+                ArchivedStockTotal(
+                    item_id=key[0],
+                    transaction_type=key[1],
+                    month=key[2],
+                    quantity_change=quantity,
+                    transaction_count=row["count"],
+                )
+            )
+        else:
+            # Rows back-dated into a month that was archived before.
+            total.quantity_change += quantity
+            total.transaction_count += row["count"]
+            updated.append(total)
+    ArchivedStockTotal.objects.bulk_create(created, batch_size=1000)
+    ArchivedStockTotal.objects.bulk_update(
+        updated, ["quantity_change", "transaction_count"], batch_size=1000
+    )
+
+
+def _export_month(month: datetime.date, output_dir: Path) -> Path:
+    fields = StockTransaction._meta.concrete_fields
+    path = output_dir / f"{LEDGER_TABLE}_{month:%Y_%m}.csv.gz"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_header = not path.exists()
+    rows = (
+        StockTransaction.objects.filter(
+            transaction_date__gte=_month_start(month),
+            transaction_date__lt=_month_start(add_months(month, 1)),
+        )
+        .order_by("pk")
+        .values_list(*(f.attname for f in fields))
+    )
+    # Appending adds a gzip member; readers see one continuous CSV file.
+    with gzip.open(path, "at", newline="") as fh:
+        writer = csv.writer(fh)
+        if write_header:
+            writer.writerow([f.column for f in fields])
+        for row in rows.iterator(chunk_size=2000):
+            writer.writerow(
+                [v.isoformat() if isinstance(v, datetime.datetime) else v for v in row]
+            )
+    return path
+
+
+def _ledger_partitions(cursor) -> Dict[str, datetime.date]:
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s)",
+        [f"public.{LEDGER_TABLE}"],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions[name] = datetime.date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+def _move_partitions(cursor, cutoff: datetime.date, destination: str) -> None:
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(f.column) for f in StockTransaction._meta.concrete_fields)
+    for name, month in sorted(_ledger_partitions(cursor).items()):
+        if month >= cutoff:
+            continue
+        cursor.execute(f"ALTER TABLE {qn(LEDGER_TABLE)} DETACH PARTITION {qn(name)}")
+        if destination == "file":
+            cursor.execute(f"DROP TABLE {qn(name)}")
+            continue
+        target = f"{ARCHIVE_TABLE}_y{month:%Y}m{month:%m}"
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f"public.{target}"])
+        if cursor.fetchone()[0]:
+            cursor.execute(
+                f"INSERT INTO {qn(target)} ({columns}) SELECT {columns} FROM {qn(name)}"
+            )
+            cursor.execute(f"DROP TABLE {qn(name)}")
+            continue
+        # Bounds are generated here, not user input; DDL takes no parameters.
+        cursor.execute(f"ALTER TABLE {qn(name)} RENAME TO {qn(target)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(ARCHIVE_TABLE)} ATTACH PARTITION {qn(target)} "
+            f"FOR VALUES FROM ('{_month_start(month).isoformat()}') "
+            f"TO ('{_month_start(add_months(month, 1)).isoformat()}')"
+        )
+
+
+def _copy_rows_to_archive(cursor, cutoff: datetime.date) -> None:
+    """Copy the rows left outside monthly partitions (the default partition)."""
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(f.column) for f in StockTransaction._meta.concrete_fields)
+    for month in pending_months(cutoff):
+        cursor.execute(
+            "SELECT public.create_monthly_partitions(%s, %s, %s)",
+            [ARCHIVE_TABLE, month["month"], month["month"]],
+        )
+    cursor.execute(
+        f"INSERT INTO {qn(ARCHIVE_TABLE)} ({columns}) SELECT {columns} "
+        f"FROM {qn(LEDGER_TABLE)} WHERE transaction_date < %s",
+        [_month_start(cutoff)],
+    )
@@ -0,0 +1,90 @@
+"""Filter facets for the stock ledger: distinct types, users and items with counts.
+
+Counts come from ``stock_transaction_facets`` (one row per facet value and
+day, maintained on insert and delete by :func:`inventory.models.facets.record_ledger_facets`)
+in one grouped query over the selected date range. Results are cached under
+the facet table's (cached) version, so a ledger write invalidates them on
+commit and a repeat lookup costs no query.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from inventory.models import LedgerFacet, StockTransaction
+from inventory.models.facets import LEDGER_FACETS, add_facet_counts
+from inventory.models.versions import bump_table_versions, cached_table_versions
+
+FACET_TABLE = LedgerFacet._meta.db_table
+CACHE_TTL = 60 * 60
+
+Facets = Dict[str, List[Tuple[str, int]]]
+
+
+def facet_counts(
+    start: Optional[datetime.date] = None, end: Optional[datetime.date] = None
+) -> Facets:
+    """Return ``{facet: [(value, count), ...]}`` for ledger rows in ``[start, end]``.
+
+    Values are sorted; every facet in ``LEDGER_FACETS`` is present.
+    """
+    version = cached_table_versions([FACET_TABLE])[FACET_TABLE]
+    key = f"ledger-facets:{version}:{start or ''}:{end or ''}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = _query(start, end)
+        cache.set(key, facets, CACHE_TTL)
+    return facets
+
+
+def _query(start: Optional[datetime.date], end: Optional[datetime.date]) -> Facets:
+    qs = LedgerFacet.objects.all()
+    if start:
+        qs = qs.filter(day__gte=start)
+    if end:
+        qs = qs.filter(day__lte=end)
+    rows = (
+        qs.values("facet", "value")
+        .annotate(total=Sum("count"))
+        .filter(total__gt=0)
+        .order_by("facet", "value")
+    )
+    facets: Facets = {facet: [] for facet in LEDGER_FACETS}
+    for row in rows:
+        if row["facet"] in facets:
+            facets[row["facet"]].append((row["value"], row["total"]))
+    return facets
+
+
+def rebuild() -> int:
+    """Recount every facet from the ledger; returns the number of facet rows."""
+    counts: Counter = Counter()
+    with transaction.atomic():
+        for facet, attr in LEDGER_FACETS.items():
+            rows = (
+                StockTransaction.objects.exclude(**{f"{attr}__isnull": True})
+                .annotate(day=TruncDate("transaction_date"))
+                .values(attr, "day")
+                .annotate(n=Count("pk"))
+                .order_by()
+            )
+            for row in rows:
+                if row[attr] != "":
+                    counts[(facet, str(row[attr]), row["day"])] = row["n"]
+        LedgerFacet.objects.all().delete()
+        add_facet_counts(counts)
+        bump_table_versions(FACET_TABLE)
+    return len(counts)
+
+
+def forget_before(day: datetime.date) -> None:
+    """Drop the counts of days before ``day``, e.g. after archiving them."""
+    if LedgerFacet.objects.filter(day__lt=day).delete()[0]:
+        bump_table_versions(FACET_TABLE)
@@ -97,16 +97,29 @@ def paginate(
 ):
     """Paginate ``qs`` based on ``request`` parameters."""
 
-    try:
-        per_page = int(request.GET.get(page_size_param, default_page_size))
-    except (TypeError, ValueError):
-        per_page = default_page_size
+    per_page = page_size(
+        request, default_page_size=default_page_size, page_size_param=page_size_param
+    )
     paginator = Paginator(qs, per_page)
     page_number = request.GET.get(page_param)
     page_obj = paginator.get_page(page_number)
     return page_obj, per_page
 
 
+def page_size(
+    request: HttpRequest,
+    *,
+    default_page_size: int = 25,
+    page_size_param: str = "page_size",
+) -> int:
+    """Return the page size requested by ``request`` as :func:`paginate` uses it."""
+
+    try:
+        return int(request.GET.get(page_size_param, default_page_size))
+    except (TypeError, ValueError):
+        return default_page_size
+
+
 def export_as_csv(
     qs: Iterable[Any],
     headers: Sequence[str],
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
 import logging
 
 from django.db.models import Sum
-from django.db.models.functions import Abs, TruncDate
-from statsmodels.tsa.holtwinters import SimpleExpSmoothing
+from django.db.models.functions import Abs, Coalesce, TruncDate
 
 from ..models import Item, StockTransaction
+from .ledger_archive import archived_quantity
 
 logger = logging.getLogger(__name__)
 
 
+def __getattr__(name: str):
+    # statsmodels pulls in scipy and pandas, so it is only imported when a
+    # forecast is made (or ``ml.SimpleExpSmoothing`` is first accessed).
+    if name == "SimpleExpSmoothing":
+        from statsmodels.tsa.holtwinters import SimpleExpSmoothing
+
+        return SimpleExpSmoothing
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def forecast_item_demand(item: Item, periods: int = 7) -> List[float]:
     """Forecast future demand for an item using exponential smoothing.
 
@@ -33,6 +44,8 @@ def forecast_item_demand(item: Item, periods: int = 7) -> List[float]:
     series = [float(row["total"]) for row in qs]
     if len(series) < 2:
         return [0.0 for _ in range(periods)]
+    from statsmodels.tsa.holtwinters import SimpleExpSmoothing
+
     try:
         model = SimpleExpSmoothing(series).fit()
         forecast = model.forecast(periods)
@@ -52,15 +65,22 @@ def train_models(periods: int = 7) -> Dict[int, List[float]]:
 
 def abc_classification() -> Dict[int, str]:
     """Classify items into A/B/C categories based on usage quantity."""
-    items = Item.objects.annotate(
-        total=Abs(Sum("stocktransaction__quantity_change"))
-    )
-    totals = [(item, float(item.total or 0)) for item in items]
-    totals.sort(key=lambda x: x[1], reverse=True)
-    overall = sum(v for _, v in totals)
+    totals = Item.objects.annotate(
+        total=Abs(
+            Coalesce(Sum("stocktransaction__quantity_change"), Decimal("0"))
+            + archived_quantity()
+        )
+    ).values_list("pk", "total")
+    return classify_abc((pk, float(total or 0)) for pk, total in totals)
+
+
+def classify_abc(totals: Iterable[Tuple[int, float]]) -> Dict[int, str]:
+    """Classify ``(item_id, usage)`` pairs: A up to 80% of cumulative usage, B to 95%."""
+    ranked = sorted(totals, key=lambda x: x[1], reverse=True)
+    overall = sum(v for _, v in ranked)
     cumulative = 0.0
     classifications: Dict[int, str] = {}
-    for item, value in totals:
+    for item_id, value in ranked:
         cumulative += value
         pct = cumulative / overall if overall else 0
         if pct <= 0.8:
@@ -69,5 +89,5 @@ def abc_classification() -> Dict[int, str]:
             cls = "B"
         else:
             cls = "C"
-        classifications[item.pk] = cls
+        classifications[item_id] = cls
     return classifications
@@ -1,56 +1,360 @@
 import logging
-from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 from django.db import IntegrityError, transaction
-from django.db.models import Max, Sum
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Now, Round
+from django.utils import timezone
 
-from inventory.models import Item, PurchaseOrder, PurchaseOrderItem, Supplier
+from core import metrics
+from inventory.models import (
+    GRNItem,
+    Indent,
+    IndentItem,
+    Item,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Supplier,
+)
+
+from . import sequence_service
 
 logger = logging.getLogger(__name__)
 
+CENTS = Decimal("0.01")
 
-def generate_po_number() -> str:
-    next_id = (PurchaseOrder.objects.aggregate(m=Max("po_id"))["m"] or 0) + 1
-    return f"PO-{next_id:04d}"
+CREATE_PO_SECONDS = metrics.histogram(
+    "inventory_create_po_seconds", "Duration of create_po calls."
+)
 
 
-def create_po(
+def format_po_number(po: PurchaseOrder) -> str:
+    """Return the stored PO number, falling back to the legacy id format."""
+    return po.po_number or f"PO-{po.po_id:04d}"
+
+
+def _validate_order(
     po_data: Dict[str, Any], items_data: List[Dict[str, Any]]
-) -> Tuple[bool, str, Optional[int]]:
+) -> Optional[str]:
     required = ["supplier_id", "order_date"]
     missing = [f for f in required if not po_data.get(f)]
     if missing:
-        return False, f"Missing required fields: {', '.join(missing)}", None
+        return f"Missing required fields: {', '.join(missing)}"
     if not items_data:
-        return False, "Purchase Order must contain at least one item.", None
+        return "Purchase Order must contain at least one item."
+    return None
+
+
+def _reserve_po_numbers(order_dates: List[Any]) -> List[str]:
+    """Reserve one PO number per order, one allocation per sequence year."""
+    by_year: Dict[int, List[int]] = defaultdict(list)
+    for idx, order_date in enumerate(order_dates):
+        by_year[sequence_service.sequence_year(order_date)].append(idx)
+    numbers: List[str] = [""] * len(order_dates)
+    for indexes in by_year.values():
+        reserved = sequence_service.reserve_numbers(
+            sequence_service.PO_PREFIX,
+            len(indexes),
+            on_date=order_dates[indexes[0]],
+        )
+        for idx, number in zip(indexes, reserved):
+            numbers[idx] = number
+    return numbers
+
+
+def create_pos_bulk(
+    orders: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+) -> Tuple[bool, str, List[int]]:
+    """Create many purchase orders and their lines with bulk inserts.
+
+    ``orders`` is a list of ``(po_data, items_data)`` pairs in the format
+    accepted by :func:`create_po`. Suppliers and items are validated with one
+    query each, PO numbers are reserved as a block and headers and lines are
+    written with ``bulk_create``, so the query count does not depend on the
+    number of orders or lines. Either every order is created or none is.
+
+    Returns:
+        ``(success, message, po_ids)`` with ids in the order of ``orders``.
+    """
+    if not orders:
+        return False, "No purchase orders provided.", []
+    for idx, (po_data, items_data) in enumerate(orders):
+        error = _validate_order(po_data, items_data)
+        if error:
+            prefix = f"Order {idx + 1}: " if len(orders) > 1 else ""
+            return False, prefix + error, []
     try:
+        supplier_ids = {int(po_data["supplier_id"]) for po_data, _ in orders}
+        item_ids = {int(d["item_id"]) for _, items in orders for d in items}
         with transaction.atomic():
-            supplier = Supplier.objects.get(pk=po_data["supplier_id"])
-            po = PurchaseOrder.objects.create(
-                supplier=supplier,
-                order_date=po_data["order_date"],
-                expected_delivery_date=po_data.get("expected_delivery_date"),
-                status=po_data.get("status", "DRAFT"),
-                notes=po_data.get("notes"),
+            known_suppliers = Supplier.objects.only("supplier_id").in_bulk(supplier_ids)
+            missing = supplier_ids - set(known_suppliers)
+            if missing:
+                raise Supplier.DoesNotExist(f"Supplier {min(missing)} not found")
+            known_items = Item.objects.only("item_id").in_bulk(item_ids)
+            missing = item_ids - set(known_items)
+            if missing:
+                raise Item.DoesNotExist(f"Item {min(missing)} not found")
+
+            numbers = _reserve_po_numbers(
+                [po_data["order_date"] for po_data, _ in orders]
             )
-            for item_d in items_data:
-                item = Item.objects.get(pk=item_d["item_id"])
-                PurchaseOrderItem.objects.create(
-                    purchase_order=po,
-                    item=item,
-                    quantity_ordered=Decimal(str(item_d["quantity_ordered"])),
-                    unit_price=Decimal(str(item_d["unit_price"])),
-                )
-            return True, "Purchase Order created", po.po_id
+            pos = PurchaseOrder.objects.bulk_create(
+                [
+                    PurchaseOrder(
+                        po_number=number,
+                        supplier_id=int(po_data["supplier_id"]),
+                        order_date=po_data["order_date"],
+                        expected_delivery_date=po_data.get("expected_delivery_date"),
+                        status=po_data.get("status") or "DRAFT",
+                        notes=po_data.get("notes"),
+                        ordered_total=sum(
+                            (Decimal(str(d["quantity_ordered"])) for d in items_data),
+                            Decimal("0"),
+                        ),
+                    )
+                    for number, (po_data, items_data) in zip(numbers, orders)
+                ]
+            )
+            PurchaseOrderItem.objects.bulk_create(
+                [
+                    PurchaseOrderItem(
+                        purchase_order=po,
+                        item_id=int(item_d["item_id"]),
+                        quantity_ordered=Decimal(str(item_d["quantity_ordered"])),
+                        unit_price=Decimal(str(item_d["unit_price"])),
+                    )
+                    for po, (_, items_data) in zip(pos, orders)
+                    for item_d in items_data
+                ]
+            )
+        po_ids = [po.po_id for po in pos]
+        if len(po_ids) == 1:
+            return True, "Purchase Order created", po_ids
+        return True, f"{len(po_ids)} purchase orders created", po_ids
     except (Supplier.DoesNotExist, Item.DoesNotExist) as exc:
-        return False, f"Invalid reference: {exc}", None
+        return False, f"Invalid reference: {exc}", []
+    except (TypeError, ValueError) as exc:
+        return False, f"Invalid value: {exc}", []
     except IntegrityError as exc:
-        logger.error("Integrity error creating PO: %s", exc)
-        return False, f"Database error: {exc}", None
+        logger.error("Integrity error creating POs: %s", exc)
+        return False, f"Database error: {exc}", []
     except Exception as exc:  # pragma: no cover - defensive
-        logger.error("Error creating PO: %s", exc)
-        return False, f"Database error: {exc}", None
+        logger.error("Error creating POs: %s", exc)
+        return False, f"Database error: {exc}", []
+
+
+@CREATE_PO_SECONDS.time()
+def create_po(
+    po_data: Dict[str, Any], items_data: List[Dict[str, Any]]
+) -> Tuple[bool, str, Optional[int]]:
+    success, msg, po_ids = create_pos_bulk([(po_data, items_data)])
+    return success, msg, po_ids[0] if po_ids else None
+
+
+def last_supplier_prices(item_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Return the most recent supplier and unit price ordered for each item.
+
+    Uses one query with correlated subqueries, so only one row per item is
+    read regardless of order history. Items never ordered are omitted.
+    """
+    latest = PurchaseOrderItem.objects.filter(item=OuterRef("pk")).order_by(
+        "-purchase_order__order_date", "-po_item_id"
+    )
+    rows = (
+        Item.objects.filter(pk__in=list(item_ids))
+        .annotate(
+            last_supplier_id=Subquery(latest.values("purchase_order__supplier_id")[:1]),
+            last_unit_price=Subquery(latest.values("unit_price")[:1]),
+        )
+        .filter(last_supplier_id__isnull=False)
+        .values("item_id", "last_supplier_id", "last_unit_price")
+    )
+    return {
+        r["item_id"]: {
+            "supplier_id": r["last_supplier_id"],
+            "unit_price": r["last_unit_price"] or Decimal("0"),
+        }
+        for r in rows
+    }
+
+
+def last_prices_from_suppliers(suppliers: Mapping[int, int]) -> Dict[int, Decimal]:
+    """Return the last unit price of each item from a given supplier.
+
+    ``suppliers`` maps item ids to supplier ids. Like
+    :func:`last_supplier_prices` this is one query; items never ordered from
+    their supplier are omitted.
+    """
+    if not suppliers:
+        return {}
+    latest = PurchaseOrderItem.objects.filter(
+        item=OuterRef("pk"), purchase_order__supplier_id=OuterRef("chosen_supplier")
+    ).order_by("-purchase_order__order_date", "-po_item_id")
+    rows = (
+        Item.objects.filter(pk__in=list(suppliers))
+        .annotate(
+            chosen_supplier=Case(
+                *[When(pk=item_id, then=Value(s)) for item_id, s in suppliers.items()],
+                output_field=IntegerField(),
+            ),
+            last_unit_price=Subquery(latest.values("unit_price")[:1]),
+        )
+        .filter(last_unit_price__isnull=False)
+        .values_list("item_id", "last_unit_price")
+    )
+    return dict(rows)
+
+
+def create_pos_from_indents(
+    indent_ids: Iterable[int],
+    *,
+    order_date: Optional[date] = None,
+    supplier_overrides: Optional[Dict[int, int]] = None,
+    status: str = "DRAFT",
+) -> Tuple[bool, str, List[int]]:
+    """Turn approved indents into purchase orders grouped by supplier.
+
+    Outstanding quantities (requested minus issued) are summed per item and
+    each item is ordered from its preferred supplier: the entry in
+    ``supplier_overrides`` if given, otherwise the supplier it was last
+    ordered from. The unit price is the last one paid to that supplier; an
+    overriding supplier the item was never ordered from gets a price of 0
+    and the item is reported. One PO is created per supplier
+    through :func:`create_pos_bulk`. Ordered indents are moved to
+    ``PROCESSING`` so a second run does not order them again.
+
+    An indent is ordered in full or not at all: if any of its outstanding
+    items has no known supplier, the whole indent stays ``APPROVED`` for a
+    later run (e.g. with ``supplier_overrides``) and the items are reported
+    in the message. The indents are locked for the duration, so concurrent
+    runs cannot order the same lines twice.
+
+    The number of queries is bounded regardless of how many indents or lines
+    are processed.
+    """
+    supplier_overrides = supplier_overrides or {}
+    with transaction.atomic():
+        approved = list(
+            Indent.objects.select_for_update()
+            .filter(pk__in=list(indent_ids), status="APPROVED")
+            .order_by("pk")
+            .values_list("indent_id", flat=True)
+        )
+        lines = IndentItem.objects.filter(
+            indent_id__in=approved, item__isnull=False
+        ).values_list("indent_id", "item_id", "requested_qty", "issued_qty")
+
+        needs: Dict[int, Dict[int, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+        for indent_id, item_id, requested, issued in lines:
+            qty = (requested or Decimal("0")) - (issued or Decimal("0"))
+            if qty > 0:
+                needs[indent_id][item_id] += qty
+        if not needs:
+            return False, "No outstanding lines on approved indents.", []
+
+        last_used = last_supplier_prices(
+            {item_id for items in needs.values() for item_id in items}
+        )
+
+        def supplier_for(item_id: int) -> Optional[int]:
+            return supplier_overrides.get(item_id) or last_used.get(item_id, {}).get(
+                "supplier_id"
+            )
+
+        outstanding: Dict[int, Decimal] = defaultdict(Decimal)
+        processed_indents: List[int] = []
+        unassigned: Set[int] = set()
+        held = 0
+        for indent_id, items in needs.items():
+            missing = {item_id for item_id in items if not supplier_for(item_id)}
+            if missing:
+                unassigned |= missing
+                held += 1
+                continue
+            processed_indents.append(indent_id)
+            for item_id, qty in items.items():
+                outstanding[item_id] += qty
+        if not processed_indents:
+            return (
+                False,
+                f"No supplier found for {len(unassigned)} item(s): {sorted(unassigned)}",
+                [],
+            )
+
+        # Last prices belong to the last supplier; look up the overriding one's.
+        switched = {
+            item_id: supplier_id
+            for item_id, supplier_id in supplier_overrides.items()
+            if item_id in outstanding
+            and supplier_id != last_used.get(item_id, {}).get("supplier_id")
+        }
+        prices = {
+            item_id: last["unit_price"]
+            for item_id, last in last_used.items()
+            if item_id not in switched
+        }
+        prices.update(last_prices_from_suppliers(switched))
+        unpriced = sorted(set(switched) - set(prices))
+
+        by_supplier: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for item_id, qty in outstanding.items():
+            by_supplier[supplier_for(item_id)].append(
+                {
+                    "item_id": item_id,
+                    "quantity_ordered": qty,
+                    "unit_price": prices.get(item_id, Decimal("0")),
+                }
+            )
+
+        order_date = order_date or timezone.now().date()
+        orders = [
+            (
+                {
+                    "supplier_id": supplier_id,
+                    "order_date": order_date,
+                    "status": status,
+                    "notes": f"Generated from {len(processed_indents)} indent(s)",
+                },
+                items_data,
+            )
+            for supplier_id, items_data in by_supplier.items()
+        ]
+        success, msg, po_ids = create_pos_bulk(orders)
+        if not success:
+            return False, msg, []
+        Indent.objects.filter(pk__in=processed_indents).update(
+            status="PROCESSING", date_processed=Now(), updated_at=Now()
+        )
+    msg = (
+        f"{len(po_ids)} purchase orders created from {len(processed_indents)} indents."
+    )
+    if unassigned:
+        msg += (
+            f" {len(unassigned)} item(s) have no supplier: {sorted(unassigned)};"
+            f" {held} indent(s) left APPROVED."
+        )
+    if unpriced:
+        msg += (
+            f" {len(unpriced)} item(s) have no previous price from their supplier"
+            f" and were ordered at 0: {unpriced}."
+        )
+    return True, msg, po_ids
 
 
 def get_po_by_id(po_id: int) -> Optional[Dict[str, Any]]:
@@ -60,7 +364,7 @@ def get_po_by_id(po_id: int) -> Optional[Dict[str, Any]]:
         return None
     header = {
         "po_id": po.po_id,
-        "po_number": generate_po_number() if po.po_id is None else f"PO-{po.po_id:04d}",
+        "po_number": format_po_number(po),
         "supplier_id": po.supplier_id,
         "supplier_name": po.supplier.name,
         "order_date": po.order_date,
@@ -69,15 +373,12 @@ def get_po_by_id(po_id: int) -> Optional[Dict[str, Any]]:
         "notes": po.notes,
     }
     items = list(
-        PurchaseOrderItem.objects.filter(purchase_order=po)
-        .select_related("item")
-        .annotate(_received_total=Sum("grnitem__quantity_received"))
-        .values(
+        PurchaseOrderItem.objects.filter(purchase_order=po).values(
             "po_item_id",
             "item_id",
             "item__name",
             "quantity_ordered",
-            "_received_total",
+            "received_qty",
             "unit_price",
         )
     )
@@ -87,7 +388,7 @@ def get_po_by_id(po_id: int) -> Optional[Dict[str, Any]]:
             "item_id": i["item_id"],
             "item_name": i["item__name"],
             "quantity_ordered": i["quantity_ordered"],
-            "received_total": i["_received_total"] or Decimal("0"),
+            "received_total": i["received_qty"] or Decimal("0"),
             "unit_price": i["unit_price"],
         }
         for i in items
@@ -98,6 +399,8 @@ def get_po_by_id(po_id: int) -> Optional[Dict[str, Any]]:
 def get_orders_progress(po_ids: List[int]) -> Dict[int, Dict[str, Any]]:
     """Return totals and progress percentage for the given purchase orders.
 
+    Reads the denormalized header totals, so no lines or GRN items are joined.
+
     Args:
         po_ids: list of purchase order primary keys.
 
@@ -107,22 +410,197 @@ def get_orders_progress(po_ids: List[int]) -> Dict[int, Dict[str, Any]]:
     """
     if not po_ids:
         return {}
-    rows = (
-        PurchaseOrderItem.objects.filter(purchase_order_id__in=po_ids)
-        .values("purchase_order_id")
+    orders = PurchaseOrder.objects.filter(pk__in=po_ids).only(
+        "po_id", "ordered_total", "received_total"
+    )
+    return {
+        po.po_id: {
+            "ordered_total": po.ordered_total,
+            "received_total": po.received_total,
+            "percent": po.progress_percent,
+        }
+        for po in orders
+    }
+
+
+def line_value(quantity: Decimal, unit_price: Decimal) -> Decimal:
+    """Return the value of one GRN line rounded to cents.
+
+    ``received_value`` adds up these rounded amounts, matching the
+    ``SUM(ROUND(qty * price, 2))`` that reconciliation expects.
+    """
+    return (quantity * unit_price).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def _decimal_or_zero(expr: Any, max_digits: int = 12) -> Coalesce:
+    output_field = DecimalField(max_digits=max_digits, decimal_places=2)
+    return Coalesce(expr, Value(Decimal("0")), output_field=output_field)
+
+
+def _expected_line_totals() -> Tuple[Coalesce, Coalesce]:
+    """Return ``(qty, value)`` expressions summing GRN items per PO line."""
+    sums = (
+        GRNItem.objects.filter(po_item=OuterRef("pk"))
+        .values("po_item")
         .annotate(
-            ordered_total=Sum("quantity_ordered"),
-            received_total=Sum("grnitem__quantity_received"),
+            qty=Sum("quantity_received"),
+            value=Sum(Round(F("quantity_received") * F("unit_price_at_receipt"), 2)),
         )
     )
-    progress: Dict[int, Dict[str, Any]] = {}
-    for r in rows:
-        ordered = r["ordered_total"] or Decimal("0")
-        received = r["received_total"] or Decimal("0")
-        percent = int(received / ordered * 100) if ordered else 0
-        progress[r["purchase_order_id"]] = {
-            "ordered_total": ordered,
-            "received_total": received,
-            "percent": percent,
-        }
-    return progress
+    return (
+        _decimal_or_zero(Subquery(sums.values("qty")), max_digits=10),
+        _decimal_or_zero(Subquery(sums.values("value"))),
+    )
+
+
+def _expected_order_totals() -> Tuple[Coalesce, Coalesce]:
+    """Return ``(ordered, received)`` expressions for PO headers.
+
+    The received total is summed from GRN items rather than from the line
+    counters so reconciliation also catches drift on the lines themselves.
+    """
+    ordered = (
+        PurchaseOrderItem.objects.filter(purchase_order=OuterRef("pk"))
+        .values("purchase_order")
+        .annotate(total=Sum("quantity_ordered"))
+        .values("total")
+    )
+    received = (
+        GRNItem.objects.filter(po_item__purchase_order=OuterRef("pk"))
+        .values("po_item__purchase_order")
+        .annotate(total=Sum("quantity_received"))
+        .values("total")
+    )
+    return _decimal_or_zero(Subquery(ordered)), _decimal_or_zero(Subquery(received))
+
+
+def receipt_status() -> Case:
+    """Return a PO header's receipt status from its (already updated) lines.
+
+    ``PARTIAL`` while any line's ``received_qty`` is below
+    ``quantity_ordered``, otherwise ``COMPLETE``; the database checks this
+    with a correlated ``EXISTS`` on the lines.
+    """
+    outstanding = PurchaseOrderItem.objects.filter(
+        purchase_order=OuterRef("pk"), received_qty__lt=F("quantity_ordered")
+    )
+    return Case(
+        When(Exists(outstanding), then=Value("PARTIAL")), default=Value("COMPLETE")
+    )
+
+
+def recalculate_po_totals(
+    po_ids: Iterable[int], *, update_status: bool = False
+) -> None:
+    """Rebuild received counters and header totals for ``po_ids`` from GRNs.
+
+    Used after line-level edits that bypass the GRN service and to repair
+    drift found by :func:`find_total_mismatches`. Runs two UPDATE statements
+    regardless of the number of orders. With ``update_status`` the header
+    UPDATE also sets the :func:`receipt_status` of orders with receipts and
+    moves ``PARTIAL``/``COMPLETE`` orders whose receipts are all gone back to
+    ``ORDERED``.
+    """
+    po_ids = list(po_ids)
+    if not po_ids:
+        return
+    line_qty, line_value = _expected_line_totals()
+    ordered, received = _expected_order_totals()
+    header_updates: Dict[str, Any] = {
+        "ordered_total": ordered,
+        "received_total": received,
+    }
+    if update_status:
+        any_received = PurchaseOrderItem.objects.filter(
+            purchase_order=OuterRef("pk"), received_qty__gt=0
+        )
+        header_updates["status"] = Case(
+            When(Exists(any_received), then=receipt_status()),
+            When(status__in=("PARTIAL", "COMPLETE"), then=Value("ORDERED")),
+            default=F("status"),
+        )
+    with transaction.atomic():
+        PurchaseOrderItem.objects.filter(purchase_order_id__in=po_ids).update(
+            received_qty=line_qty, received_value=line_value
+        )
+        PurchaseOrder.objects.filter(pk__in=po_ids).update(**header_updates)
+
+
+def find_total_mismatches(
+    po_ids: Optional[Iterable[int]] = None,
+) -> List[Dict[str, Any]]:
+    """Compare stored PO and line totals with the sums of their GRN items.
+
+    Returns one dict per differing value with ``po_id``, ``po_item_id``
+    (``None`` for header totals), ``field``, ``stored`` and ``expected``.
+    """
+    lines = PurchaseOrderItem.objects.all()
+    orders = PurchaseOrder.objects.all()
+    if po_ids is not None:
+        po_ids = list(po_ids)
+        lines = lines.filter(purchase_order_id__in=po_ids)
+        orders = orders.filter(pk__in=po_ids)
+
+    line_qty, line_value = _expected_line_totals()
+    line_rows = (
+        lines.annotate(expected_qty=line_qty, expected_value=line_value)
+        .filter(
+            ~Q(received_qty=F("expected_qty")) | ~Q(received_value=F("expected_value"))
+        )
+        .values(
+            "po_item_id",
+            "purchase_order_id",
+            "received_qty",
+            "received_value",
+            "expected_qty",
+            "expected_value",
+        )
+    )
+    ordered, received = _expected_order_totals()
+    order_rows = (
+        orders.annotate(expected_ordered=ordered, expected_received=received)
+        .filter(
+            ~Q(ordered_total=F("expected_ordered"))
+            | ~Q(received_total=F("expected_received"))
+        )
+        .values(
+            "po_id",
+            "ordered_total",
+            "received_total",
+            "expected_ordered",
+            "expected_received",
+        )
+    )
+
+    mismatches: List[Dict[str, Any]] = []
+    for r in line_rows:
+        for field, expected in (
+            ("received_qty", "expected_qty"),
+            ("received_value", "expected_value"),
+        ):
+            if r[field] != r[expected]:
+                mismatches.append(
+                    {
+                        "po_id": r["purchase_order_id"],
+                        "po_item_id": r["po_item_id"],
+                        "field": field,
+                        "stored": r[field],
+                        "expected": r[expected],
+                    }
+                )
+    for r in order_rows:
+        for field, expected in (
+            ("ordered_total", "expected_ordered"),
+            ("received_total", "expected_received"),
+        ):
+            if r[field] != r[expected]:
+                mismatches.append(
+                    {
+                        "po_id": r["po_id"],
+                        "po_item_id": None,
+                        "field": field,
+                        "stored": r[field],
+                        "expected": r[expected],
+                    }
+                )
+    return mismatches
@@ -0,0 +1,30 @@
+"""Small ORM expression helpers shared by the set-based write services."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Mapping
+
+from django.db.models import Case, DecimalField, Value, When
+
+
+def case_by_pk(
+    values: Mapping[int, Decimal],
+    *,
+    max_digits: int = 12,
+    decimal_places: int = 2,
+) -> Case:
+    """Return ``CASE WHEN pk = ... THEN value ... ELSE 0 END`` for ``values``.
+
+    Combined with ``F()`` this applies a different delta to every row in a
+    single ``UPDATE``, e.g. ``qs.update(stock=F("stock") + case_by_pk(deltas))``.
+    """
+    output_field = DecimalField(max_digits=max_digits, decimal_places=decimal_places)
+    return Case(
+        *[
+            When(pk=pk, then=Value(value, output_field=output_field))
+            for pk, value in values.items()
+        ],
+        default=Value(Decimal("0"), output_field=output_field),
+        output_field=output_field,
+    )
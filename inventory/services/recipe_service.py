@@ -7,10 +7,16 @@ from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from django.db import IntegrityError, transaction
 
+from core import metrics
+
 from ..models import Item, Recipe, RecipeComponent, SaleTransaction, StockTransaction
 
 logger = logging.getLogger(__name__)
 
+RECORD_SALE_SECONDS = metrics.histogram(
+    "inventory_record_sale_seconds", "Duration of record_sale calls."
+)
+
 TX_SALE = "SALE"
 
 
@@ -342,6 +348,7 @@ def _resolve_item_requirements(recipe_id: int, quantity: float) -> Dict[int, flo
     return totals
 
 
+@RECORD_SALE_SECONDS.time()
 def record_sale(
     recipe_id: int,
     quantity: Decimal,
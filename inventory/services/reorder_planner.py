@@ -0,0 +1,218 @@
+"""Reorder suggestions for all active items and the draft POs that fill them.
+
+:func:`plan_reorders` reads everything it needs in a fixed number of grouped
+queries, whatever the number of items:
+
+* stock and reorder point of every active item;
+* daily outgoing quantities over the last ``DEMAND_DAYS`` days, giving each
+  item's mean daily demand (the forecast), its day-to-day variation and its
+  ABC class by usage;
+* quantities still open on DRAFT, ORDERED and PARTIAL purchase orders;
+* the supplier and price each item was last ordered at;
+* each supplier's observed lead time (order date to goods receipt).
+
+An item is reordered when its stock plus open orders is at or below the
+larger of its reorder point and the demand expected over the lead time plus
+safety stock. The safety stock depends on the ABC class. The order brings it
+to that level plus ``REVIEW_DAYS`` of demand. Open DRAFT orders count, so
+running the planner again does not order the same shortfall twice.
+"""
+
+from __future__ import annotations
+
+import datetime
+import math
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import GoodsReceivedNote, Item, PurchaseOrderItem, StockTransaction
+from . import purchase_order_service
+from .ml import classify_abc
+
+DEMAND_DAYS = 90
+REVIEW_DAYS = 7
+DEFAULT_LEAD_TIME_DAYS = 7
+LEAD_TIME_HISTORY_DAYS = 365
+OPEN_PO_STATUSES = ("DRAFT", "ORDERED", "PARTIAL")
+# Safety factors for roughly 95%, 90% and 80% cycle service levels.
+SERVICE_Z = {"A": 1.65, "B": 1.28, "C": 0.84}
+
+
+def _demand_stats(today: datetime.date) -> Dict[int, Tuple[float, float]]:
+    """Return ``{item_id: (mean, standard deviation)}`` of active items' daily demand."""
+    start = today - datetime.timedelta(days=DEMAND_DAYS - 1)
+    tz = timezone.get_current_timezone()
+    rows = (
+        StockTransaction.objects.filter(
+            item__is_active=True,
+            quantity_change__lt=0,
+            transaction_date__gte=datetime.datetime.combine(
+                start, datetime.time.min, tzinfo=tz
+            ),
+        )
+        .annotate(day=TruncDate("transaction_date"))
+        .values_list("item_id", "day")
+        .annotate(total=Sum("quantity_change"))
+        .order_by()
+    )
+    sums: Dict[int, float] = defaultdict(float)
+    squares: Dict[int, float] = defaultdict(float)
+    for item_id, _, total in rows:
+        sums[item_id] -= float(total)
+        squares[item_id] += float(total) ** 2
+    stats = {}
+    for item_id, total in sums.items():
+        mean = total / DEMAND_DAYS
+        variance = max(squares[item_id] / DEMAND_DAYS - mean * mean, 0.0)
+        stats[item_id] = (mean, math.sqrt(variance))
+    return stats
+
+
+def _open_quantities() -> Dict[int, Decimal]:
+    rows = (
+        PurchaseOrderItem.objects.filter(
+            item__is_active=True, purchase_order__status__in=OPEN_PO_STATUSES
+        )
+        .values("item_id")
+        .annotate(open=Sum(F("quantity_ordered") - F("received_qty")))
+        .order_by()
+    )
+    return {r["item_id"]: max(r["open"] or Decimal("0"), Decimal("0")) for r in rows}
+
+
+def supplier_lead_times(today: Optional[datetime.date] = None) -> Dict[int, float]:
+    """Return each supplier's mean days from order to receipt over the last year."""
+    today = today or timezone.localdate()
+    since = today - datetime.timedelta(days=LEAD_TIME_HISTORY_DAYS)
+    days: Dict[int, List[int]] = defaultdict(list)
+    rows = GoodsReceivedNote.objects.filter(received_date__gte=since).values_list(
+        "supplier_id", "received_date", "purchase_order__order_date"
+    )
+    for supplier_id, received, ordered in rows:
+        if received and ordered and received >= ordered:
+            days[supplier_id].append((received - ordered).days)
+    return {sid: sum(values) / len(values) for sid, values in days.items()}
+
+
+def plan_reorders(today: Optional[datetime.date] = None) -> List[Dict[str, Any]]:
+    """Return order suggestions for active items, sorted by supplier and item.
+
+    Each suggestion has ``item_id``, ``name``, ``abc_class``,
+    ``current_stock``, ``open_qty``, ``daily_demand``, ``lead_time_days``,
+    ``reorder_level``, ``quantity`` (whole units), ``supplier_id`` (``None``
+    if the item was never ordered) and ``unit_price``.
+    """
+    today = today or timezone.localdate()
+    items = list(
+        Item.objects.filter(is_active=True).values_list(
+            "item_id", "name", "current_stock", "reorder_point"
+        )
+    )
+    item_ids = [row[0] for row in items]
+    demand = _demand_stats(today)
+    classes = classify_abc((pk, mean) for pk, (mean, _) in demand.items())
+    open_qty = _open_quantities()
+    suppliers = purchase_order_service.last_supplier_prices(item_ids)
+    lead_times = supplier_lead_times(today)
+
+    suggestions = []
+    for item_id, name, stock, reorder_point in items:
+        mean, sd = demand.get(item_id, (0.0, 0.0))
+        last = suppliers.get(item_id, {})
+        supplier_id = last.get("supplier_id")
+        lead = lead_times.get(supplier_id, DEFAULT_LEAD_TIME_DAYS)
+        abc = classes.get(item_id, "C")
+        safety = SERVICE_Z[abc] * sd * math.sqrt(lead)
+        level = max(float(reorder_point or 0), mean * lead + safety)
+        on_hand = float(stock or 0)
+        ordered = open_qty.get(item_id, Decimal("0"))
+        position = on_hand + float(ordered)
+        if level <= 0 or position > level:
+            continue
+        quantity = math.ceil(level + mean * REVIEW_DAYS - position)
+        if quantity <= 0:
+            continue
+        suggestions.append(
+            {
+                "item_id": item_id,
+                "name": name,
+                "abc_class": abc,
+                "current_stock": on_hand,
+                "open_qty": ordered,
+                "daily_demand": round(mean, 3),
+                "lead_time_days": round(lead, 1),
+                "reorder_level": round(level, 2),
+                "quantity": Decimal(quantity),
+                "supplier_id": supplier_id,
+                "unit_price": last.get("unit_price", Decimal("0")),
+            }
+        )
+    suggestions.sort(
+        key=lambda s: (s["supplier_id"] is None, s["supplier_id"] or 0, s["item_id"])
+    )
+    return suggestions
+
+
+def draft_purchase_orders(
+    suggestions: Optional[List[Dict[str, Any]]] = None,
+    *,
+    order_date: Optional[datetime.date] = None,
+) -> Tuple[bool, str, List[int]]:
+    """Create one DRAFT purchase order per supplier for ``suggestions``.
+
+    Defaults to a fresh :func:`plan_reorders`. Orders are written in bulk by
+    :func:`purchase_order_service.create_pos_bulk`; the expected delivery date
+    is the order date plus the supplier's lead time. Suggestions without a
+    known supplier are skipped and reported in the message.
+    """
+    order_date = order_date or timezone.localdate()
+    if suggestions is None:
+        suggestions = plan_reorders(order_date)
+    by_supplier: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    unassigned: List[int] = []
+    for s in suggestions:
+        if s["supplier_id"] is None:
+            unassigned.append(s["item_id"])
+        else:
+            by_supplier[s["supplier_id"]].append(s)
+    if not by_supplier:
+        msg = "No items need reordering."
+        if unassigned:
+            msg = f"No supplier found for any of the {len(unassigned)} item(s) to reorder."
+        return False, msg, []
+
+    orders = []
+    for supplier_id, lines in by_supplier.items():
+        lead = max(line["lead_time_days"] for line in lines)
+        orders.append(
+            (
+                {
+                    "supplier_id": supplier_id,
+                    "order_date": order_date,
+                    "expected_delivery_date": order_date
+                    + datetime.timedelta(days=math.ceil(lead)),
+                    "status": "DRAFT",
+                    "notes": f"Reorder plan for {len(lines)} item(s)",
+                },
+                [
+                    {
+                        "item_id": line["item_id"],
+                        "quantity_ordered": line["quantity"],
+                        "unit_price": line["unit_price"],
+                    }
+                    for line in lines
+                ],
+            )
+        )
+    success, msg, po_ids = purchase_order_service.create_pos_bulk(orders)
+    if not success:
+        return False, msg, []
+    msg = f"{len(po_ids)} draft purchase orders created for {len(suggestions) - len(unassigned)} items."
+    if unassigned:
+        msg += f" {len(unassigned)} item(s) have no supplier: {sorted(unassigned)}"
+    return True, msg, po_ids
@@ -0,0 +1,200 @@
+"""Monte Carlo what-if simulation of reorder points and lead times.
+
+Nothing here writes to the database. :func:`demand_history` loads the daily
+demand of all selected items in one query; :func:`simulate` then plays every
+scenario against the same bootstrapped demand draws, vectorized over
+scenarios x draws x items with NumPy, so only the day loop runs in Python.
+
+Policy: each day, deliveries due that day arrive first, then demand is served
+from stock on hand (unmet demand is lost). When nothing is on order and stock
+on hand is at or below the reorder point, an order is placed to bring stock to
+``order_days`` of average demand above the reorder point. It arrives
+``lead_time`` days later.
+
+NumPy is imported with this module, so views import it on first use to keep
+worker start-up light.
+"""
+
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import StockTransaction
+from .purchase_order_service import last_supplier_prices
+
+HISTORY_DAYS = 90
+HORIZON_DAYS = 30
+DRAWS = 200
+ORDER_DAYS = 14
+# Yearly cost of holding one unit, as a fraction of its price.
+HOLDING_RATE = 0.25
+
+
+@dataclass
+class SimulationResult:
+    """Per scenario (rows) and item (columns) outcomes of :func:`simulate`."""
+
+    reorder_points: np.ndarray  # (scenarios, items)
+    lead_times: np.ndarray  # (scenarios,)
+    stockout_probability: np.ndarray  # (scenarios, items)
+    holding_cost: np.ndarray  # (scenarios, items)
+    mean_stock: np.ndarray  # (scenarios, items, horizon + 1)
+
+
+def demand_history(
+    item_ids: Sequence[int],
+    days: int = HISTORY_DAYS,
+    end: Optional[datetime.date] = None,
+) -> np.ndarray:
+    """Return daily demand, shape ``(len(item_ids), days)``, ending on ``end``.
+
+    Demand is the total of a day's outgoing (negative) ledger movements,
+    counted as a positive quantity; days without movements are zero.
+    """
+    end = end or timezone.localdate()
+    start = end - datetime.timedelta(days=days - 1)
+    tz = timezone.get_current_timezone()
+    rows = (
+        StockTransaction.objects.filter(
+            item_id__in=list(item_ids),
+            quantity_change__lt=0,
+            transaction_date__gte=datetime.datetime.combine(
+                start, datetime.time.min, tzinfo=tz
+            ),
+            transaction_date__lt=datetime.datetime.combine(
+                end + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz
+            ),
+        )
+        .annotate(day=TruncDate("transaction_date"))
+        .values("item_id", "day")
+        .annotate(total=Sum("quantity_change"))
+        .order_by()
+    )
+    column = {item_id: i for i, item_id in enumerate(item_ids)}
+    demand = np.zeros((len(item_ids), days))
+    for row in rows:
+        demand[column[row["item_id"]], (row["day"] - start).days] = -float(row["total"])
+    return demand
+
+
+def scenario_grid(reorder_points: Sequence[float], lead_times: Sequence[int]):
+    """Return every combination as ``(reorder_points, lead_times)`` arrays."""
+    points, leads = np.meshgrid(
+        np.asarray(reorder_points, dtype=float), np.asarray(lead_times, dtype=int)
+    )
+    return points.ravel(), leads.ravel()
+
+
+def simulate(
+    stock: Sequence[float],
+    demand: np.ndarray,
+    reorder_points,
+    lead_times,
+    *,
+    unit_costs: Optional[Sequence[float]] = None,
+    horizon: int = HORIZON_DAYS,
+    draws: int = DRAWS,
+    order_days: int = ORDER_DAYS,
+    holding_rate: float = HOLDING_RATE,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """Simulate stock levels of every item under every scenario.
+
+    Args:
+        stock: Current stock per item, shape ``(items,)``.
+        demand: Daily demand history per item, shape ``(items, days)``, e.g.
+            from :func:`demand_history`. Future days are drawn from it.
+        reorder_points: One reorder point per scenario, shape ``(scenarios,)``,
+            or per scenario and item, shape ``(scenarios, items)``.
+        lead_times: Lead time in days (at least 1) per scenario.
+        unit_costs: Price per unit of each item; holding cost is in
+            unit-days when omitted.
+        horizon: Number of days simulated.
+        draws: Number of Monte Carlo demand paths.
+        order_days: Days of average demand ordered above the reorder point.
+        holding_rate: Yearly holding cost as a fraction of the unit cost.
+        seed: Seed for reproducible demand draws.
+
+    Each simulated day resamples one historical day for all items at once,
+    which keeps demand correlated across items. All scenarios share the same
+    draws, so differences between them are not sampling noise.
+    """
+    stock = np.asarray(stock, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    n_items = stock.shape[0]
+    lead_times = np.atleast_1d(np.asarray(lead_times, dtype=int))
+    points = np.asarray(reorder_points, dtype=float)
+    if points.ndim < 2:
+        points = np.broadcast_to(points.reshape(-1, 1), (points.size, n_items))
+    n_scenarios = points.shape[0]
+    lead_times = np.broadcast_to(lead_times, (n_scenarios,))
+    if (lead_times < 1).any():
+        raise ValueError("Lead times must be at least one day.")
+    if demand.shape[0] != n_items or demand.shape[1] == 0:
+        raise ValueError("Demand history must have one non-empty row per item.")
+
+    rng = np.random.default_rng(seed)
+    # (horizon, draws, items): day t of path r replays a random history day.
+    history = demand.T.astype(np.float32)
+    paths = history[rng.integers(0, demand.shape[1], size=(horizon, draws))]
+
+    # Scenario state has shape (scenarios, draws, items) and is updated in
+    # place. Deliveries and new orders are rare, so they are applied to the
+    # flat indices of the affected cells rather than through full-size masks.
+    shape = (n_scenarios, draws, n_items)
+    on_hand = np.empty(shape, dtype=np.float32)
+    on_hand[...] = np.maximum(stock, 0)
+    on_order = np.zeros(on_hand.size, dtype=np.float32)
+    arrival = np.full(shape, -1, dtype=np.int32)
+    stocked_out = np.zeros(shape, dtype=bool)
+    unit_days = np.zeros(shape, dtype=np.float32)
+    mean_stock = np.empty((n_scenarios, n_items, horizon + 1))
+    mean_stock[:, :, 0] = on_hand.mean(axis=1)
+
+    reorder_at = points[:, np.newaxis, :].astype(np.float32)
+    order_up_to = np.broadcast_to(
+        reorder_at + (demand.mean(axis=1) * order_days).astype(np.float32), shape
+    ).ravel()
+    delay = np.broadcast_to(lead_times[:, np.newaxis, np.newaxis], shape).ravel()
+    flat_stock, flat_arrival = on_hand.reshape(-1), arrival.reshape(-1)
+    short = np.empty(shape, dtype=bool)
+    for day in range(horizon):
+        due = np.flatnonzero(arrival == day)
+        flat_stock[due] += on_order[due]
+
+        wanted = paths[day]
+        np.greater(wanted, on_hand, out=short)
+        stocked_out |= short
+        np.subtract(on_hand, wanted, out=on_hand)
+        np.maximum(on_hand, 0.0, out=on_hand)
+        unit_days += on_hand
+
+        # Cells whose last delivery has arrived (or never ordered) may reorder.
+        low = np.flatnonzero((on_hand <= reorder_at) & (arrival <= day))
+        on_order[low] = order_up_to[low] - flat_stock[low]
+        flat_arrival[low] = day + delay[low]
+        mean_stock[:, :, day + 1] = on_hand.mean(axis=1)
+
+    holding = unit_days.mean(axis=1)
+    if unit_costs is not None:
+        holding = holding * np.asarray(unit_costs, dtype=float) * holding_rate / 365
+    return SimulationResult(
+        reorder_points=np.array(points),
+        lead_times=np.array(lead_times),
+        stockout_probability=stocked_out.mean(axis=1),
+        holding_cost=holding,
+        mean_stock=mean_stock,
+    )
+
+
+def unit_costs(item_ids: Sequence[int]) -> np.ndarray:
+    """Return the last purchase price of each item (0 if never ordered)."""
+    prices = last_supplier_prices(item_ids)
+    return np.array([float(prices.get(pk, {}).get("unit_price", 0)) for pk in item_ids])
@@ -1,16 +1,27 @@
 import logging
 import time
+from collections import defaultdict
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from django.db import OperationalError, transaction
 from django.db.models import F
+from django.db.models.functions import Now
 
+from core import metrics
 from inventory.models import Item, StockTransaction
 
+from .query_utils import case_by_pk
+
 logger = logging.getLogger(__name__)
 
+RECORD_SECONDS = metrics.histogram(
+    "inventory_record_stock_transaction_seconds",
+    "Duration of record_stock_transaction calls.",
+)
+
 
+@RECORD_SECONDS.time()
 def record_stock_transaction(
     item_id: int,
     quantity_change: Decimal,
@@ -26,7 +37,8 @@ def record_stock_transaction(
         try:
             with transaction.atomic():
                 updated = Item.objects.filter(pk=item_id).update(
-                    current_stock=F("current_stock") + quantity_change
+                    current_stock=F("current_stock") + quantity_change,
+                    updated_at=Now(),
                 )
                 if not updated:
                     logger.warning("Item %s not found", item_id)
@@ -52,28 +64,56 @@ def record_stock_transaction(
     return False
 
 
+def apply_stock_movements(
+    transactions: Iterable[Dict[str, Any]],
+) -> List[StockTransaction]:
+    """Apply many stock movements with one grouped UPDATE and one INSERT.
+
+    Quantity changes are summed per item and written with a single
+    ``UPDATE ... SET current_stock = current_stock + CASE ...`` statement, then
+    the ledger rows are inserted with ``bulk_create``. The query count does not
+    grow with the number of movements.
+
+    Raises:
+        ValueError: if any referenced item does not exist. Callers are
+            expected to run inside ``transaction.atomic`` so nothing is kept.
+    """
+
+    deltas: Dict[int, Decimal] = defaultdict(Decimal)
+    rows: List[StockTransaction] = []
+    for tx in transactions:
+        quantity_change = Decimal(str(tx["quantity_change"]))
+        deltas[tx["item_id"]] += quantity_change
+        rows.append(
+            StockTransaction(
+                item_id=tx["item_id"],
+                quantity_change=quantity_change,
+                transaction_type=tx["transaction_type"],
+                user_id=tx.get("user_id"),
+                user_int_id=tx.get("user_int"),
+                related_indent_id=tx.get("related_indent_id"),
+                related_po_id=tx.get("related_po_id"),
+                notes=tx.get("notes"),
+            )
+        )
+    if not rows:
+        return []
+
+    with transaction.atomic():
+        updated = Item.objects.filter(pk__in=list(deltas)).update(
+            current_stock=F("current_stock") + case_by_pk(deltas),
+            updated_at=Now(),
+        )
+        if updated != len(deltas):
+            logger.warning("One or more items not found in %s", sorted(deltas))
+            raise ValueError("Stock transaction failed")
+        return StockTransaction.objects.bulk_create(rows)
+
+
 def record_stock_transactions_bulk(transactions: List[Dict[str, Any]]) -> bool:
     try:
         with transaction.atomic():
-            for tx in transactions:
-                item_id = tx["item_id"]
-                quantity_change = Decimal(str(tx["quantity_change"]))
-                updated = Item.objects.filter(pk=item_id).update(
-                    current_stock=F("current_stock") + quantity_change
-                )
-                if not updated:
-                    logger.warning("Item %s not found", item_id)
-                    raise ValueError("Stock transaction failed")
-                StockTransaction.objects.create(
-                    item_id=item_id,
-                    quantity_change=quantity_change,
-                    transaction_type=tx["transaction_type"],
-                    user_id=tx.get("user_id"),
-                    user_int=tx.get("user_int"),
-                    related_indent_id=tx.get("related_indent_id"),
-                    related_po_id=tx.get("related_po_id"),
-                    notes=tx.get("notes"),
-                )
+            apply_stock_movements(transactions)
         return True
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("Bulk stock transaction failed: %s", exc)
@@ -14,8 +14,16 @@ import time
 from dataclasses import dataclass
 from typing import Callable, Generic, TypeVar
 
+from core import metrics
+
 logger = logging.getLogger(__name__)
 
+CACHE_REQUESTS = metrics.counter(
+    "inventory_cache_requests_total",
+    "Cached lookups by cache name and result (hit or miss).",
+    labels=("cache", "result"),
+)
+
 
 T = TypeVar("T")
 
@@ -28,17 +36,23 @@ class _CacheState(Generic[T]):
     time: float | None = None
 
 
-def get_cached(fetch_func: Callable[[], T], ttl: int) -> Callable[[bool], T]:
+def get_cached(
+    fetch_func: Callable[[], T], ttl: int, name: str = ""
+) -> Callable[[bool], T]:
     """Return a callable that caches ``fetch_func`` results for ``ttl`` seconds.
 
     The returned function accepts a ``force`` boolean parameter. When ``force``
     is ``True`` the cache is bypassed and refreshed immediately. Cache state and
     the internal lock are exposed via ``_state`` and ``_lock`` attributes to aid
-    testing.
+    testing. Hits and misses are counted in ``inventory_cache_requests_total``
+    under ``name`` (the fetch function's name by default).
     """
 
     lock = threading.Lock()
     state: _CacheState[T] = _CacheState()
+    name = name or getattr(fetch_func, "__name__", "")
+    hits = CACHE_REQUESTS.labels(name, "hit")
+    misses = CACHE_REQUESTS.labels(name, "miss")
 
     def wrapper(force: bool = False) -> T:
         with lock:
@@ -49,8 +63,10 @@ def get_cached(fetch_func: Callable[[], T], ttl: int) -> Callable[[bool], T]:
                 and state.time is not None
                 and now - state.time < ttl
             ):
+                hits.inc()
                 return state.value
 
+            misses.inc()
             try:
                 state.value = fetch_func()
             except Exception:
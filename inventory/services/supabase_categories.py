@@ -1,7 +1,8 @@
 import logging
 from typing import Dict, List, Optional
 
-from .supabase_client import SupabaseException, get_supabase_client
+from . import supabase_client
+from .supabase_client import FETCH_SECONDS, get_supabase_client
 from .supabase_cache import get_cached
 
 
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 _CACHE_TTL = 300  # seconds
 
 
+@FETCH_SECONDS.labels("category").time()
 def _load_categories_from_supabase() -> Dict[Optional[str], List[dict]]:
     """Fetch categories mapping from the Supabase ``category`` table.
 
@@ -29,7 +31,7 @@ def _load_categories_from_supabase() -> Dict[Optional[str], List[dict]]:
             .select("category_id,category,sub_category")
             .execute()
         )
-    except SupabaseException:  # pragma: no cover - network interaction
+    except supabase_client.SupabaseException:  # pragma: no cover - network interaction
         logger.exception("Failed to fetch categories from Supabase")
         return {}
 
@@ -60,7 +62,9 @@ def _load_categories_from_supabase() -> Dict[Optional[str], List[dict]]:
     return cats
 
 
-get_categories = get_cached(lambda: _load_categories_from_supabase(), _CACHE_TTL)
+get_categories = get_cached(
+    lambda: _load_categories_from_supabase(), _CACHE_TTL, name="categories"
+)
 get_categories.__doc__ = (
     "Return cached categories mapping, refreshing from Supabase if expired."
 )
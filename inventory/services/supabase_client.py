@@ -1,19 +1,49 @@
+from __future__ import annotations
+
 import logging
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional, Type
 
-try:
-    from supabase import Client, SupabaseException, create_client
-except ModuleNotFoundError:  # pragma: no cover - supabase optional
-    Client = None  # type: ignore
-    create_client = None  # type: ignore
+from core import metrics
 
-    class SupabaseException(Exception):
-        pass
+if TYPE_CHECKING:  # pragma: no cover
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
-_client: Client | None = None
+FETCH_SECONDS = metrics.histogram(
+    "inventory_supabase_fetch_seconds",
+    "Duration of Supabase table fetches.",
+    labels=("table",),
+)
+
+_client: Optional[Client] = None
+
+# The Supabase SDK (httpx, postgrest, realtime, ...) is slow to import, so
+# these placeholders are replaced by the SDK's ``create_client`` and
+# ``SupabaseException`` on first use rather than at import time.
+create_client: Optional[Callable[[str, str], Client]] = None
+
+
+class _SupabaseUnavailable(Exception):
+    """Stands in for ``SupabaseException`` until the SDK is loaded."""
+
+
+SupabaseException: Type[Exception] = _SupabaseUnavailable
+
+
+def _load_sdk() -> None:
+    global create_client, SupabaseException
+    try:
+        from supabase import SupabaseException as sdk_exception
+        from supabase import create_client as sdk_create_client
+    except ModuleNotFoundError:  # pragma: no cover - supabase optional
+        return
+    # Keep any replacement installed before the first load.
+    if create_client is None:
+        create_client = sdk_create_client
+    if SupabaseException is _SupabaseUnavailable:
+        SupabaseException = sdk_exception
 
 
 def get_supabase_client() -> Optional[Client]:
@@ -32,6 +62,8 @@ def get_supabase_client() -> Optional[Client]:
 
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
+    if url and key:
+        _load_sdk()
     if not url or not key or create_client is None:
         logger.warning("Supabase is not configured")
         return None
@@ -41,3 +73,10 @@ def get_supabase_client() -> Optional[Client]:
         logger.exception("Failed to initialise Supabase client")
         return None
     return _client
+
+
+def reset_supabase_client() -> None:
+    """Drop the cached client so the next call creates a new one."""
+
+    global _client
+    _client = None
@@ -1,7 +1,8 @@
 import logging
 from typing import Dict, List
 
-from .supabase_client import SupabaseException, get_supabase_client
+from . import supabase_client
+from .supabase_client import FETCH_SECONDS, get_supabase_client
 from .supabase_cache import get_cached
 
 
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 _CACHE_TTL = 300  # seconds
 
 
+@FETCH_SECONDS.labels("units").time()
 def _load_units_from_supabase() -> Dict[str, List[str]]:
     """Fetch units mapping from the Supabase ``units`` table.
 
@@ -24,7 +26,7 @@ def _load_units_from_supabase() -> Dict[str, List[str]]:
         return {}
     try:  # pragma: no cover - network interaction
         resp = client.table("units").select("base_unit,purchase_unit").execute()
-    except SupabaseException:  # pragma: no cover - network interaction
+    except supabase_client.SupabaseException:  # pragma: no cover - network interaction
         logger.exception("Failed to fetch units from Supabase")
         return {}
 
@@ -46,7 +48,5 @@ def _load_units_from_supabase() -> Dict[str, List[str]]:
     }
 
 
-get_units = get_cached(lambda: _load_units_from_supabase(), _CACHE_TTL)
-get_units.__doc__ = (
-    "Return cached units mapping, refreshing from Supabase if expired."
-)
+get_units = get_cached(lambda: _load_units_from_supabase(), _CACHE_TTL, name="units")
+get_units.__doc__ = "Return cached units mapping, refreshing from Supabase if expired."
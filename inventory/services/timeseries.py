@@ -0,0 +1,152 @@
+"""Bounded-size time series for charts.
+
+Chart views used to load every matching row and plot one point per row, so
+the payload grew with the ledger. :func:`bucketed_series` sums the values in
+SQL per day, week or month, picking the finest bucket that keeps the series
+within a few times the point budget, and then thins it to the budget with
+Largest-Triangle-Three-Buckets (LTTB), which keeps peaks and dips that plain
+sampling would drop.
+"""
+
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from django.db.models import F, Max, Min, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+DEFAULT_MAX_POINTS = 1000
+# Bucketed series up to this many times the budget are thinned with LTTB;
+# longer ranges use coarser buckets first.
+OVERSAMPLING = 4
+
+BUCKETS: Dict[str, Tuple[int, type]] = {
+    # name: (approximate length in days, truncation function)
+    "day": (1, TruncDay),
+    "week": (7, TruncWeek),
+    "month": (31, TruncMonth),
+}
+
+
+@dataclass
+class Series:
+    """Chart-ready series: ISO date ``labels`` and matching ``values``."""
+
+    bucket: str
+    labels: List[str] = field(default_factory=list)
+    values: List[float] = field(default_factory=list)
+
+
+def _as_date(value) -> Optional[datetime.date]:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def choose_bucket(
+    start: Optional[datetime.date],
+    end: Optional[datetime.date],
+    max_points: int = DEFAULT_MAX_POINTS,
+) -> str:
+    """Return the finest bucket giving at most ``OVERSAMPLING * max_points`` points."""
+    if start is None or end is None:
+        return "day"
+    days = (end - start).days + 1
+    for name, (length, _) in BUCKETS.items():
+        if days / length <= OVERSAMPLING * max_points:
+            return name
+    return "month"
+
+
+def date_range(
+    qs: QuerySet, date_field: str
+) -> Tuple[Optional[datetime.date], Optional[datetime.date]]:
+    """Return the first and last date of ``date_field`` in ``qs``."""
+    bounds = qs.order_by().aggregate(first=Min(date_field), last=Max(date_field))
+    return _as_date(bounds["first"]), _as_date(bounds["last"])
+
+
+def aggregate(
+    qs: QuerySet, date_field: str, value_field: str, bucket: str
+) -> Dict[datetime.date, float]:
+    """Return ``{bucket start: sum of value_field}`` computed in one grouped query."""
+    trunc = BUCKETS[bucket][1]
+    rows = (
+        qs.order_by()
+        .annotate(bucket_start=trunc(date_field))
+        .values("bucket_start")
+        .annotate(total=Sum(F(value_field)))
+        .order_by("bucket_start")
+    )
+    return {_as_date(row["bucket_start"]): float(row["total"] or 0) for row in rows}
+
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[int]:
+    """Return the indices of ``points`` kept by LTTB downsampling to ``threshold``.
+
+    ``points`` are ``(x, y)`` pairs sorted by ``x``. The first and last points
+    are always kept.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+    kept = [0]
+    every = (count - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex.
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        span = points[next_start:next_end]
+        avg_x = sum(p[0] for p in span) / len(span)
+        avg_y = sum(p[1] for p in span) / len(span)
+
+        ax, ay = points[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, next_start):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(count - 1)
+    return kept
+
+
+def bucketed_series(
+    qs: QuerySet,
+    date_field: str,
+    value_field: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+    monthly: Optional[Mapping[datetime.date, float]] = None,
+) -> Series:
+    """Return the sum of ``value_field`` over time, at most ``max_points`` long.
+
+    ``start``/``end`` describe the filtered range and default to the data's
+    own first and last date. ``monthly`` adds totals kept per month (such as
+    archived ledger months) and forces monthly buckets so they line up.
+    """
+    if start is None or end is None:
+        first, last = date_range(qs, date_field)
+        start, end = start or first, end or last
+    bucket = "month" if monthly else choose_bucket(start, end, max_points)
+    totals = aggregate(qs, date_field, value_field, bucket)
+    if monthly:
+        for month, value in monthly.items():
+            totals[month] = totals.get(month, 0.0) + float(value)
+        totals = dict(sorted(totals.items()))
+    days = list(totals)
+    if len(days) > max_points:
+        origin = days[0]
+        indices = lttb([((d - origin).days, totals[d]) for d in days], max_points)
+        days = [days[i] for i in indices]
+    return Series(
+        bucket=bucket,
+        labels=[d.isoformat() for d in days],
+        values=[totals[d] for d in days],
+    )
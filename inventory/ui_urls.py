@@ -6,8 +6,10 @@ from .views.indents import (
     IndentsListView,
     IndentsTableView,
     indent_detail,
+    indent_issue,
     indent_pdf,
     indent_update_status,
+    indents_issue,
 )
 from .views.items import (
     ItemCreateView,
@@ -89,12 +91,14 @@ urlpatterns = [
     path("indents/", IndentsListView.as_view(), name="indents_list"),
     path("indents/table/", IndentsTableView.as_view(), name="indents_table"),
     path("indents/create/", IndentCreateView.as_view(), name="indent_create"),
+    path("indents/issue/", indents_issue, name="indents_issue"),
     path("indents/<int:pk>/", indent_detail, name="indent_detail"),
     path(
         "indents/<int:pk>/status/<str:status>/",
         indent_update_status,
         name="indent_update_status",
     ),
+    path("indents/<int:pk>/issue/", indent_issue, name="indent_issue"),
     path("indents/<int:pk>/pdf/", indent_pdf, name="indent_pdf"),
     path("purchase-orders/", purchase_orders_list, name="purchase_orders_list"),
     path(
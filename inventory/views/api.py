@@ -1,4 +1,14 @@
-from rest_framework import permissions, viewsets
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+
+from core.query_budget import query_budget
 
 from ..models import (
     GoodsReceivedNote,
@@ -14,6 +24,7 @@ from ..models import (
     StockTransaction,
     Supplier,
 )
+from ..pagination import LedgerCursorPagination
 from ..serializers import (
     GoodsReceivedNoteSerializer,
     GRNItemSerializer,
@@ -28,9 +39,164 @@ from ..serializers import (
     StockTransactionSerializer,
     SupplierSerializer,
 )
+from ..services import (
+    change_feed,
+    purchase_order_service,
+    sequence_service,
+    stock_service,
+)
+from .conditional import ConditionalListMixin
+
+# Largest list accepted by the bulk create endpoints in one request.
+BULK_CREATE_MAX = 1000
+
+
+class SparseFieldsetMixin:
+    """Honour ``?fields=a,b`` on reads by trimming the SELECT and the output.
+
+    Requested names must be serializer fields. Concrete model columns among
+    them are passed to ``QuerySet.only()`` so unrequested columns are never
+    read, and the remaining serializer fields are dropped from the response.
+    """
+
+    def get_sparse_fields(self) -> Optional[List[str]]:
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            return None
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(self.get_serializer_class().Meta.fields))
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown field(s): {', '.join(unknown)}"]}
+            )
+        return requested
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields:
+            columns = {}
+            for field in queryset.model._meta.concrete_fields:
+                columns[field.name] = columns[field.attname] = field.name
+            queryset = queryset.select_related(None).only(
+                *{columns[name] for name in fields if name in columns}
+            )
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields:
+            target = (
+                serializer.child
+                if isinstance(serializer, ListSerializer)
+                else serializer
+            )
+            for name in set(target.fields) - set(fields):
+                target.fields.pop(name)
+        return serializer
+
+
+class ChangeFeedMixin:
+    """Expose ``GET <resource>/changes/?since=<token>`` for incremental sync.
+
+    Views set ``change_feed_fields`` to the high-water mark columns, e.g.
+    ``("updated_at", "item_id")``, and id-only feeds set
+    ``change_feed_written_at`` to their write-time column. See
+    :mod:`inventory.services.change_feed`.
+
+    Query params:
+        since: token from the previous response; omit for a full sync.
+        limit: maximum upserts and deletes per response (default 500).
+    """
+
+    change_feed_fields: tuple = ()
+    change_feed_written_at: Optional[str] = None
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        try:
+            limit = int(request.query_params.get("limit", change_feed.DEFAULT_LIMIT))
+            page = change_feed.read_changes(
+                self.filter_queryset(self.get_queryset()),
+                fields=self.change_feed_fields,
+                since=request.query_params.get("since"),
+                limit=limit,
+                written_at=self.change_feed_written_at,
+            )
+        except ValueError as exc:
+            raise ValidationError({"since": [str(exc)]})
+        page["upserts"] = self.get_serializer(page["upserts"], many=True).data
+        return Response(page)
+
+
+class _PrefetchedRows:
+    """Stand-in related queryset answering ``get(pk=...)`` from ``in_bulk``.
+
+    DRF looks up each primary key of a related field with its own query;
+    swapping this in before validating a list resolves all of them with one
+    query per field.
+    """
+
+    def __init__(self, queryset, pks):
+        self.model = queryset.model
+        self._rows = queryset.in_bulk(pks)
+
+    def get(self, pk):
+        row = self._rows.get(int(pk))
+        if row is None:
+            raise self.model.DoesNotExist
+        return row
 
 
-class ItemViewSet(viewsets.ModelViewSet):
+class BulkCreateMixin:
+    """Accept a JSON list on ``POST`` and insert it with one bulk write.
+
+    A single object is still created through the normal ``perform_create``
+    path. Lists are validated in one pass and handed to
+    :meth:`perform_bulk_create`; the whole batch is written or none of it is.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if not request.data:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list."]})
+        if len(request.data) > BULK_CREATE_MAX:
+            raise ValidationError(
+                {"non_field_errors": [f"At most {BULK_CREATE_MAX} rows per request."]}
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        self._prefetch_related_fields(serializer.child, request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            instances = self.perform_bulk_create(serializer.validated_data)
+        data = self.get_serializer(instances, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def _prefetch_related_fields(serializer, data: List[Any]) -> None:
+        for name, field in serializer.fields.items():
+            if field.read_only or not isinstance(field, PrimaryKeyRelatedField):
+                continue
+            pks = {
+                int(row[name])
+                for row in data
+                if isinstance(row, dict) and str(row.get(name, "")).isdigit()
+            }
+            field.queryset = _PrefetchedRows(field.get_queryset(), pks)
+
+    def perform_bulk_create(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        model = self.get_queryset().model
+        return model.objects.bulk_create([model(**row) for row in rows])
+
+
+@query_budget(10)
+class ItemViewSet(
+    ChangeFeedMixin, ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """API endpoint for CRUD operations on items.
 
     Query params:
@@ -40,6 +206,7 @@ class ItemViewSet(viewsets.ModelViewSet):
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
     permission_classes = [permissions.IsAuthenticated]
+    change_feed_fields = ("updated_at", "item_id")
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -49,23 +216,68 @@ class ItemViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+@query_budget(10)
+class SupplierViewSet(
+    ChangeFeedMixin, ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """Standard CRUD API for suppliers."""
 
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
     permission_classes = [permissions.IsAuthenticated]
+    change_feed_fields = ("updated_at", "supplier_id")
+
+
+@query_budget(15)
+class StockTransactionViewSet(
+    ChangeFeedMixin,
+    BulkCreateMixin,
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
+    """Manage stock transactions.
+
+    Lists are cursor paginated. Creating a transaction (one object or a list)
+    also moves the item's ``current_stock``; lists are applied with one
+    grouped stock UPDATE and one ledger INSERT.
+    """
 
-
-class StockTransactionViewSet(viewsets.ModelViewSet):
-    """Manage stock transactions with related item details."""
-
-    queryset = StockTransaction.objects.all().select_related("item")
+    queryset = StockTransaction.objects.all()
     serializer_class = StockTransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
-
-
-class IndentViewSet(viewsets.ModelViewSet):
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = "-transaction_id"
+    change_feed_fields = ("transaction_id",)
+    change_feed_written_at = "transaction_date"
+
+    def perform_create(self, serializer):
+        serializer.instance = self.perform_bulk_create([serializer.validated_data])[0]
+
+    def perform_bulk_create(self, rows):
+        movements = [
+            {
+                "item_id": row["item"].pk if row.get("item") else None,
+                "quantity_change": row.get("quantity_change") or 0,
+                "transaction_type": row.get("transaction_type"),
+                "user_id": row.get("user_id"),
+                "user_int": row["user_int"].pk if row.get("user_int") else None,
+                "related_indent_id": (
+                    row["related_indent"].pk if row.get("related_indent") else None
+                ),
+                "related_po_id": row.get("related_po_id"),
+                "notes": row.get("notes"),
+            }
+            for row in rows
+        ]
+        try:
+            with transaction.atomic():
+                return stock_service.apply_stock_movements(movements)
+        except ValueError as exc:
+            raise ValidationError({"item": [str(exc)]})
+
+
+class IndentViewSet(ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """CRUD API for indents with MRN and status filtering.
 
     Query params:
@@ -88,7 +300,9 @@ class IndentViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class IndentItemViewSet(viewsets.ModelViewSet):
+class IndentItemViewSet(
+    ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """Manage individual items within an indent."""
 
     queryset = IndentItem.objects.all().select_related("indent", "item")
@@ -96,23 +310,77 @@ class IndentItemViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(
+    ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """CRUD interface for purchase orders."""
 
     queryset = PurchaseOrder.objects.all().select_related("supplier")
     serializer_class = PurchaseOrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def perform_create(self, serializer):
+        serializer.save(
+            po_number=sequence_service.next_number(
+                sequence_service.PO_PREFIX,
+                on_date=serializer.validated_data.get("order_date"),
+            )
+        )
+
+
+class PurchaseOrderTotalsMixin:
+    """Rebuild denormalized PO totals after line-level writes via the API.
+
+    Set ``update_po_status`` to also recompute the orders' receipt status.
+    """
 
-class PurchaseOrderItemViewSet(viewsets.ModelViewSet):
+    update_po_status = False
+
+    def _recalculate(self, po_ids) -> None:
+        purchase_order_service.recalculate_po_totals(
+            po_ids, update_status=self.update_po_status
+        )
+
+    def get_po_ids(self, instance) -> set[int]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save()
+            self._recalculate(self.get_po_ids(instance))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            po_ids = self.get_po_ids(serializer.instance)
+            instance = serializer.save()
+            self._recalculate(po_ids | self.get_po_ids(instance))
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            po_ids = self.get_po_ids(instance)
+            instance.delete()
+            self._recalculate(po_ids)
+
+
+class PurchaseOrderItemViewSet(
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    PurchaseOrderTotalsMixin,
+    viewsets.ModelViewSet,
+):
     """CRUD operations for items belonging to purchase orders."""
 
     queryset = PurchaseOrderItem.objects.all().select_related("purchase_order", "item")
     serializer_class = PurchaseOrderItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_po_ids(self, instance) -> set[int]:
+        return {instance.purchase_order_id}
+
 
-class GoodsReceivedNoteViewSet(viewsets.ModelViewSet):
+class GoodsReceivedNoteViewSet(
+    ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """API for managing goods received notes."""
 
     queryset = GoodsReceivedNote.objects.all().select_related(
@@ -121,24 +389,63 @@ class GoodsReceivedNoteViewSet(viewsets.ModelViewSet):
     serializer_class = GoodsReceivedNoteSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-
-class GRNItemViewSet(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        serializer.save(
+            grn_number=sequence_service.next_number(
+                sequence_service.GRN_PREFIX,
+                on_date=serializer.validated_data.get("received_date"),
+            )
+        )
+
+    def perform_destroy(self, instance):
+        """Delete the GRN and its items, then rebuild the affected PO totals."""
+        with transaction.atomic():
+            po_ids = set(
+                GRNItem.objects.filter(grn=instance).values_list(
+                    "po_item__purchase_order_id", flat=True
+                )
+            )
+            instance.delete()
+            purchase_order_service.recalculate_po_totals(po_ids, update_status=True)
+
+
+class GRNItemViewSet(
+    BulkCreateMixin,
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    PurchaseOrderTotalsMixin,
+    viewsets.ModelViewSet,
+):
     """CRUD interface for items on a goods received note."""
 
-    queryset = GRNItem.objects.all().select_related("grn", "po_item")
+    queryset = GRNItem.objects.all()
     serializer_class = GRNItemSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = "-grn_item_id"
+    update_po_status = True
+
+    def get_po_ids(self, instance) -> set[int]:
+        return {instance.po_item.purchase_order_id}
+
+    def perform_bulk_create(self, rows):
+        instances = super().perform_bulk_create(rows)
+        self._recalculate({row["po_item"].purchase_order_id for row in rows})
+        return instances
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """Manage recipe records via the API."""
 
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_tables = ("recipes", "recipe_components")
 
 
-class RecipeComponentViewSet(viewsets.ModelViewSet):
+class RecipeComponentViewSet(
+    ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """CRUD API for components that make up a recipe."""
 
     queryset = RecipeComponent.objects.all().select_related("parent_recipe")
@@ -146,9 +453,13 @@ class RecipeComponentViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class SaleTransactionViewSet(viewsets.ModelViewSet):
-    """Record and retrieve sale transactions."""
+class SaleTransactionViewSet(
+    BulkCreateMixin, ConditionalListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
+    """Record and retrieve sale transactions (cursor paginated)."""
 
-    queryset = SaleTransaction.objects.all().select_related("recipe")
+    queryset = SaleTransaction.objects.all()
     serializer_class = SaleTransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = "-sale_id"
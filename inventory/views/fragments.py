@@ -0,0 +1,71 @@
+"""Server-side cache of rendered HTML fragments such as list tables.
+
+A fragment is cached under its template, its normalized parameters and the
+versions of the tables it reads (see :func:`cached_table_versions`). Every
+write through the services bumps those versions on commit, so a changed table
+simply stops matching its old entries, which then age out of the cache. A
+repeat view of an unchanged page costs one cache read: no query and no
+template rendering.
+
+Fragments are shared between users, so they are rendered with a placeholder
+CSRF token that is replaced with the requesting user's token on the way out.
+Inside a transaction with uncommitted writes the cache is bypassed, since
+those writes are not yet reflected in the table versions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from ..models.versions import cached_table_versions, has_pending_bumps
+
+CSRF_PLACEHOLDER = "__fragment_csrf_token__"
+
+
+def fragment_key(
+    template_name: str, params: Mapping[str, Any], tables: Iterable[str]
+) -> str:
+    """Return the cache key of ``template_name`` for ``params`` and ``tables``."""
+    versions = cached_table_versions(tables)
+    parts = [getattr(settings, "ETAG_SALT", ""), template_name]
+    parts += [f"{k}={params[k]}" for k in sorted(params)]
+    parts += [f"{table}:{versions[table]}" for table in sorted(versions)]
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+    return f"fragment:{digest}"
+
+
+def render_fragment(
+    request,
+    template_name: str,
+    *,
+    tables: Iterable[str],
+    params: Mapping[str, Any],
+    context: Callable[[], Dict[str, Any]],
+) -> str:
+    """Return ``template_name`` rendered for ``request``, from cache if possible.
+
+    Args:
+        tables: Database tables the fragment's data comes from.
+        params: Everything besides those tables that the output depends on,
+            normalized so equivalent requests share an entry.
+        context: Builds the template context; only called on a miss.
+    """
+    if has_pending_bumps():
+        return render_to_string(template_name, context(), request=request)
+    key = fragment_key(template_name, params, tables)
+    html = cache.get(key)
+    if html is None:
+        ctx = context()
+        ctx["csrf_token"] = CSRF_PLACEHOLDER
+        html = render_to_string(template_name, ctx, request=request)
+        if len(html.encode()) <= settings.FRAGMENT_CACHE_MAX_BYTES:
+            cache.set(key, html, settings.FRAGMENT_CACHE_TTL)
+    if CSRF_PLACEHOLDER in html:
+        html = html.replace(CSRF_PLACEHOLDER, get_token(request))
+    return html
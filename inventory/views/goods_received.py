@@ -6,8 +6,6 @@ from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.html import format_html
 from django.views.generic import TemplateView
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
 
 from ..models import GoodsReceivedNote, Supplier
 from ..services import list_utils
@@ -108,10 +106,19 @@ def grn_export(request, pk: int):
             )
         return response
 
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Helvetica", size=12)
-    pdf.cell(0, 10, f"GRN {grn.pk}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(
+        0,
+        10,
+        grn.grn_number or f"GRN {grn.pk}",
+        new_x=XPos.LMARGIN,
+        new_y=YPos.NEXT,
+    )
     pdf.cell(
         0,
         10,
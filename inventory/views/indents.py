@@ -8,15 +8,20 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.utils.html import format_html
 from django.views import View
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
 
+from core.query_budget import query_budget
+
 from ..forms.indent_forms import IndentForm, IndentItemFormSet
 from ..indent_pdf import generate_indent_pdf
 from ..models import Indent
+from ..services import indent_service
+from .conditional import conditional_on
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +76,8 @@ class IndentsListView(TemplateView):
         return ctx
 
 
+@query_budget(8)
+@method_decorator(conditional_on("indents", per_day=True), name="get")
 class IndentsTableView(TemplateView):
     """Render the paginated table of indents.
 
@@ -188,6 +195,36 @@ def indent_update_status(request, pk: int, status: str):
     return redirect("indent_detail", pk=pk)
 
 
+@require_POST
+@csrf_protect
+def indent_issue(request, pk: int):
+    """Issue the outstanding quantities of one indent from stock."""
+    get_object_or_404(Indent, pk=pk)
+    success, msg, _ = indent_service.issue_indents(
+        [pk], user_id=request.user.get_username()
+    )
+    (messages.success if success else messages.error)(request, msg)
+    return redirect("indent_detail", pk=pk)
+
+
+@require_POST
+@csrf_protect
+def indents_issue(request):
+    """Issue the selected indents, or every issuable one, in one batch."""
+    indent_ids = [int(pk) for pk in request.POST.getlist("indent_ids") if pk.isdigit()]
+    if not indent_ids:
+        indent_ids = list(
+            Indent.objects.filter(
+                status__in=indent_service.ISSUABLE_STATUSES
+            ).values_list("indent_id", flat=True)
+        )
+    success, msg, _ = indent_service.issue_indents(
+        indent_ids, user_id=request.user.get_username()
+    )
+    (messages.success if success else messages.error)(request, msg)
+    return redirect("indents_list")
+
+
 def indent_pdf(request, pk: int):
     indent = get_object_or_404(Indent, pk=pk)
     items = indent.indentitem_set.select_related("item").all()
@@ -16,10 +16,14 @@ from django.views import View
 from django.views.decorators.csrf import csrf_protect
 from django.views.generic import TemplateView
 
+from core.query_budget import query_budget
+
 from ..forms.bulk_forms import BulkUploadForm
 from ..forms.item_forms import ItemForm
 from ..models import Item, StockTransaction
 from ..services import category_filters, item_service, list_utils, stock_service
+from .conditional import conditional_on
+from .fragments import render_fragment
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +61,29 @@ def _filter_and_sort_items(request, qs=None):
     )
 
 
+def _render_items_table(request):
+    """Return the items table HTML (cached per parameters and data version)."""
+    qs, params = _filter_and_sort_items(request)
+    per_page = list_utils.page_size(request)
+
+    def context():
+        page_obj, _ = list_utils.paginate(request, qs)
+        return {**params, "page_obj": page_obj, "page_size": per_page}
+
+    html = render_fragment(
+        request,
+        "inventory/_items_table.html",
+        tables=[Item._meta.db_table],
+        params={
+            **params,
+            "page": request.GET.get("page") or "1",
+            "page_size": per_page,
+        },
+        context=context,
+    )
+    return html, params, per_page
+
+
 class ItemsListView(TemplateView):
     """Show item filters and options for the list view.
 
@@ -73,12 +100,7 @@ class ItemsListView(TemplateView):
         request = self.request
 
         category_ctx = category_filters.resolve_category_filters(request)
-        qs, params = _filter_and_sort_items(request)
-        page_obj, per_page = list_utils.paginate(request, qs)
-        table_ctx = {**params, "page_obj": page_obj, "page_size": per_page}
-        items_table = render_to_string(
-            "inventory/_items_table.html", table_ctx, request=request
-        )
+        items_table, params, per_page = _render_items_table(request)
 
         form = ItemForm()
 
@@ -99,27 +121,18 @@ class ItemsListView(TemplateView):
         return ctx
 
 
-class ItemsTableView(TemplateView):
+@query_budget(8)
+@method_decorator(conditional_on("items"), name="get")
+class ItemsTableView(View):
     """Render the paginated table of items.
 
     Accepts the same GET filters as ItemsListView plus a page number.
-    Template: inventory/_items_table.html.
+    Template: inventory/_items_table.html, served from the fragment cache.
     """
 
-    template_name = "inventory/_items_table.html"
-
-    def _get_queryset(self):
-        qs, params = _filter_and_sort_items(self.request)
-        self._filter_params = params
-        return qs
-
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        qs = self._get_queryset()
-        page_obj, per_page = list_utils.paginate(self.request, qs)
-        ctx.update(self._filter_params)
-        ctx.update({"page_obj": page_obj, "page_size": per_page})
-        return ctx
+    def get(self, request, *args, **kwargs):
+        html, _, _ = _render_items_table(request)
+        return HttpResponse(html)
 
 
 class ItemsExportView(View):
@@ -373,17 +386,16 @@ class ItemSearchView(TemplateView):
 
     template_name = "inventory/_item_options.html"
 
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        query = (self.request.GET.get("q") or "").strip()
+    async def get(self, request, *args, **kwargs):
+        query = (request.GET.get("q") or "").strip()
         if not query:
-            for key, val in self.request.GET.items():
+            for key, val in request.GET.items():
                 if key.endswith("item"):
                     query = val
                     break
-        items = Item.objects.filter(name__icontains=query)[:20]
-        ctx["items"] = items
-        return ctx
+        qs = Item.objects.filter(name__icontains=query).only("item_id", "name")
+        items = [item async for item in qs[:20]]
+        return self.render_to_response(self.get_context_data(items=items, **kwargs))
 
 
 class ItemsBulkUploadView(View):
@@ -3,7 +3,7 @@ from decimal import Decimal
 from typing import Any
 
 from django.contrib import messages
-from django.db.models import Sum
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.html import format_html
@@ -41,18 +41,8 @@ def purchase_orders_list(request):
         default_direction="desc",
     )
     page_obj, _ = list_utils.paginate(request, orders, default_page_size=20)
-    progress_map = purchase_order_service.get_orders_progress([o.pk for o in page_obj])
     for o in page_obj:
         o.badge_class = PO_STATUS_BADGES.get(o.status, "")
-        prog = progress_map.get(o.pk)
-        if prog:
-            o.ordered_total = prog["ordered_total"]
-            o.received_total = prog["received_total"]
-            o.progress_percent = prog["percent"]
-        else:
-            o.ordered_total = Decimal("0")
-            o.received_total = Decimal("0")
-            o.progress_percent = 0
     statuses = PurchaseOrder._meta.get_field("status").choices
     suppliers = Supplier.objects.all()
     querystring = list_utils.build_querystring(request)
@@ -129,8 +119,10 @@ def purchase_order_edit(request, pk: int):
             form_kwargs={"item_suggest_url": item_url},
         )
         if form.is_valid() and formset.is_valid():
-            form.save()
-            formset.save()
+            with transaction.atomic():
+                form.save()
+                formset.save()
+                purchase_order_service.recalculate_po_totals([po.pk])
             return redirect("purchase_order_detail", pk=pk)
     else:
         form = PurchaseOrderForm(instance=po, supplier_suggest_url=supplier_url)
@@ -146,11 +138,7 @@ def purchase_order_edit(request, pk: int):
 
 def purchase_order_detail(request, pk: int):
     po = get_object_or_404(PurchaseOrder, pk=pk)
-    items = (
-        po.purchaseorderitem_set.select_related("item")
-        .annotate(_received_total=Sum("grnitem__quantity_received"))
-        .all()
-    )
+    items = po.purchaseorderitem_set.select_related("item")
     badge_class = PO_STATUS_BADGES.get(po.status, "")
     rows = [
         ("Supplier", po.supplier.name),
@@ -170,11 +158,7 @@ def purchase_order_detail(request, pk: int):
 
 def purchase_order_receive(request, pk: int):
     po = get_object_or_404(PurchaseOrder, pk=pk)
-    items = (
-        po.purchaseorderitem_set.select_related("item")
-        .annotate(_received_total=Sum("grnitem__quantity_received"))
-        .all()
-    )
+    items = po.purchaseorderitem_set.select_related("item")
     if request.method == "POST":
         form = GRNForm(request.POST)
         if form.is_valid():
@@ -1,11 +1,12 @@
 from django.contrib import messages
 from django.db.models import Count
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
 from django.views.generic import TemplateView
 
 from ..forms.recipe_forms import RecipeComponentFormSet, RecipeForm
-from ..models import Recipe
+from ..models import Recipe, RecipeComponent
+from .fragments import render_fragment
 
 
 class RecipesListView(TemplateView):
@@ -17,9 +18,8 @@ class RecipesListView(TemplateView):
     template_name = "inventory/recipes/list.html"
     grid_template = "inventory/recipes/_recipes_cards.html"
 
-    def _get_recipes(self):
+    def _get_recipes(self, q):
         """Return recipes annotated with component counts and optional images."""
-        q = (self.request.GET.get("q") or "").strip()
         qs = (
             Recipe.objects.all()
             .annotate(component_count=Count("components"))
@@ -43,16 +43,20 @@ class RecipesListView(TemplateView):
                     "component_count": r.component_count,
                 }
             )
-        return recipes, q
+        return recipes
 
     def get(self, request, *args, **kwargs):
-        recipes, q = self._get_recipes()
+        q = (request.GET.get("q") or "").strip()
+        grid_html = render_fragment(
+            request,
+            self.grid_template,
+            tables=[Recipe._meta.db_table, RecipeComponent._meta.db_table],
+            params={"q": q},
+            context=lambda: {"recipes": self._get_recipes(q)},
+        )
         if request.headers.get("HX-Request"):
-            return render(request, self.grid_template, {"recipes": recipes})
+            return HttpResponse(grid_html)
 
-        grid_html = render_to_string(
-            self.grid_template, {"recipes": recipes}, request=request
-        )
         ctx = {"recipes_grid": grid_html, "q": q}
         return render(request, self.template_name, ctx)
 
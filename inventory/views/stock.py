@@ -8,6 +8,7 @@ from django.db.models import Sum
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.dateparse import parse_date
 
 from ..forms.stock_forms import (
     StockAdjustmentForm,
@@ -16,7 +17,7 @@ from ..forms.stock_forms import (
     StockWastageForm,
 )
 from ..models import StockTransaction
-from ..services import stock_service
+from ..services import ledger_archive, ledger_facets, stock_service, timeseries
 
 
 def stock_movements(request):
@@ -222,6 +223,13 @@ def stock_movements(request):
     return render(request, "inventory/stock_movements.html", ctx)
 
 
+def _parse_day(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
 def history_reports(request):
     item = (request.GET.get("item") or request.GET.get("q") or "").strip()
     tx_type = (request.GET.get("type") or "").strip()
@@ -258,6 +266,18 @@ def history_reports(request):
     qs = qs.order_by(ordering)
 
     total_quantity = qs.aggregate(total=Sum("quantity_change"))["total"] or Decimal("0")
+    # Archived months only keep per-item, per-type totals: add them when the
+    # filter can be answered from those, and flag the report when it cannot.
+    archived, archive_cut = ledger_archive.archived_monthly_totals(
+        item_id=item,
+        transaction_type=tx_type,
+        start=_parse_day(start_date),
+        end=_parse_day(end_date),
+    )
+    if user:
+        archive_cut = archive_cut or bool(archived)
+        archived = {}
+    total_quantity += sum(archived.values(), Decimal("0"))
 
     if request.GET.get("export") == "csv":
         response = HttpResponse(content_type="text/csv")
@@ -335,18 +355,9 @@ def history_reports(request):
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    transaction_types = (
-        StockTransaction.objects.values_list("transaction_type", flat=True)
-        .order_by("transaction_type")
-        .distinct()
-    )
-    users = (
-        StockTransaction.objects.exclude(user_id__isnull=True)
-        .exclude(user_id="")
-        .order_by("user_id")
-        .values_list("user_id", flat=True)
-        .distinct()
-    )
+    facets = ledger_facets.facet_counts(_parse_day(start_date), _parse_day(end_date))
+    transaction_types = [value for value, _ in facets["type"]]
+    users = [value for value, _ in facets["user"]]
 
     params = request.GET.copy()
     pagination_params = params.copy()
@@ -365,20 +376,25 @@ def history_reports(request):
             "value": tx_type,
             "list_id": "history-types",
             "options": [{"value": "", "label": "All Types"}]
-            + [{"value": t} for t in transaction_types],
+            + [{"value": t, "label": f"{t} ({n})"} for t, n in facets["type"]],
         },
         {
             "name": "user",
             "value": user,
             "list_id": "history-users",
             "options": [{"value": "", "label": "All Users"}]
-            + [{"value": u} for u in users],
+            + [{"value": u, "label": f"{u} ({n})"} for u, n in facets["user"]],
         },
     ]
 
-    chart_qs = qs.order_by("transaction_date")
-    chart_labels = [tx.transaction_date.strftime("%Y-%m-%d") for tx in chart_qs]
-    chart_data = [float(tx.quantity_change) for tx in chart_qs]
+    chart = timeseries.bucketed_series(
+        qs,
+        "transaction_date",
+        "quantity_change",
+        start=_parse_day(start_date),
+        end=_parse_day(end_date),
+        monthly=archived,
+    )
 
     tabs = [
         {
@@ -407,9 +423,12 @@ def history_reports(request):
         "sort": sort,
         "direction": direction,
         "total_quantity": total_quantity,
+        "archived_months": len(archived),
+        "archive_incomplete": archive_cut,
         "filters": filters,
-        "chart_labels": chart_labels,
-        "chart_data": chart_data,
+        "chart_labels": chart.labels,
+        "chart_data": chart.values,
+        "chart_bucket": chart.bucket,
         "tabs": tabs,
     }
     template = (
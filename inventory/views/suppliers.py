@@ -10,10 +10,13 @@ from django.views import View
 from django.views.decorators.csrf import csrf_protect
 from django.views.generic import TemplateView
 
+from core.query_budget import query_budget
+
 from ..forms.bulk_forms import BulkDeleteForm, BulkUploadForm
 from ..forms.supplier_forms import SupplierForm
 from ..models import Supplier
 from ..services import list_utils, supplier_service
+from .conditional import conditional_on
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +72,8 @@ class SuppliersListView(TemplateView):
         return ctx
 
 
+@query_budget(8)
+@method_decorator(conditional_on("suppliers"), name="get")
 class SuppliersTableView(TemplateView):
     """Render the paginated table of suppliers or export as CSV.
 
@@ -1,8 +1,15 @@
-from django.db.models import Sum
-from django.db.models.functions import TruncDate
+from datetime import datetime, time, timedelta
+
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from ..models import SaleTransaction, StockTransaction
+from ..services import timeseries
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
 
 
 def visualizations(request):
@@ -12,29 +19,43 @@ def visualizations(request):
 
     sales_qs = SaleTransaction.objects.all()
     stock_qs = StockTransaction.objects.all()
+    start = end = None
 
+    # Ledger bounds compare the column itself so PostgreSQL only reads the
+    # monthly partitions in range.
     if start_date:
         sales_qs = sales_qs.filter(sale_date__date__gte=start_date)
-        stock_qs = stock_qs.filter(transaction_date__date__gte=start_date)
+        start = parse_date(start_date)
+        if start:
+            stock_qs = stock_qs.filter(transaction_date__gte=_day_start(start))
     if end_date:
         sales_qs = sales_qs.filter(sale_date__date__lte=end_date)
-        stock_qs = stock_qs.filter(transaction_date__date__lte=end_date)
+        end = parse_date(end_date)
+        if end:
+            stock_qs = stock_qs.filter(
+                transaction_date__lt=_day_start(end + timedelta(days=1))
+            )
 
-    sales_data = (
-        sales_qs.annotate(date=TruncDate("sale_date"))
-        .values("date")
-        .annotate(total=Sum("quantity"))
-        .order_by("date")
-    )
-    stock_data = (
-        stock_qs.annotate(date=TruncDate("transaction_date"))
-        .values("date")
-        .annotate(total=Sum("quantity_change"))
-        .order_by("date")
+    # Both series share one bucket size so the heatmap rows line up.
+    sales_range = timeseries.date_range(sales_qs, "sale_date")
+    stock_range = timeseries.date_range(stock_qs, "transaction_date")
+    firsts = [d for d in (sales_range[0], stock_range[0]) if d]
+    lasts = [d for d in (sales_range[1], stock_range[1]) if d]
+    bucket = timeseries.choose_bucket(
+        start or min(firsts, default=None), end or max(lasts, default=None)
     )
-
-    sales_map = {d["date"].isoformat(): float(d["total"]) for d in sales_data}
-    stock_map = {d["date"].isoformat(): float(d["total"]) for d in stock_data}
+    sales_map = {
+        d.isoformat(): v
+        for d, v in timeseries.aggregate(
+            sales_qs, "sale_date", "quantity", bucket
+        ).items()
+    }
+    stock_map = {
+        d.isoformat(): v
+        for d, v in timeseries.aggregate(
+            stock_qs, "transaction_date", "quantity_change", bucket
+        ).items()
+    }
     dates = sorted(set(sales_map) | set(stock_map))
 
     heatmap_z = [
@@ -49,6 +70,7 @@ def visualizations(request):
         "start_date": start_date,
         "end_date": end_date,
         "dates": dates,
+        "bucket": bucket,
         "heatmap_z": heatmap_z,
         "scatter_y": scatter_y,
     }
@@ -3,22 +3,54 @@ from __future__ import annotations
 from django.shortcuts import render
 
 from ..forms.reorder_point_form import ReorderPointForm
-from ..services import stock_service
+
+DEFAULT_LEAD_TIME_DAYS = 7
 
 
 def what_if_reorder(request):
-    """Adjust reorder points and show projected stock levels."""
+    """Compare simulated stock under current and proposed reorder points.
+
+    Nothing is saved: each selected item is simulated with its current
+    reorder point and with the proposed one, at the given lead time.
+    """
 
     form = ReorderPointForm(request.POST or None)
     projections = []
     if request.method == "POST" and form.is_valid():
-        items = form.cleaned_data["items"]
-        reorder_point = form.cleaned_data["reorder_point"]
-        for item in items:
-            item.reorder_point = reorder_point
-            item.save(update_fields=["reorder_point"])
-            history = stock_service.get_stock_history(item.pk)
-            projections.append({"item": item, "history": history})
+        # NumPy is only imported when a simulation is run.
+        from ..services import reorder_simulation
+
+        items = list(form.cleaned_data["items"])
+        proposed = float(form.cleaned_data["reorder_point"])
+        lead_time = form.cleaned_data["lead_time_days"] or DEFAULT_LEAD_TIME_DAYS
+        item_ids = [item.pk for item in items]
+        current = [float(item.reorder_point or 0) for item in items]
+        result = reorder_simulation.simulate(
+            [float(item.current_stock or 0) for item in items],
+            reorder_simulation.demand_history(item_ids),
+            [current, [proposed] * len(items)],
+            [lead_time, lead_time],
+            unit_costs=reorder_simulation.unit_costs(item_ids),
+            seed=0,
+        )
+        for i, item in enumerate(items):
+            projections.append(
+                {
+                    "item": item,
+                    "history": [round(v, 2) for v in result.mean_stock[1, i].tolist()],
+                    "scenarios": [
+                        {
+                            "label": label,
+                            "reorder_point": float(result.reorder_points[s, i]),
+                            "stockout_probability": float(
+                                result.stockout_probability[s, i]
+                            ),
+                            "holding_cost": round(float(result.holding_cost[s, i]), 2),
+                        }
+                        for s, label in enumerate(["Current", "Proposed"])
+                    ],
+                }
+            )
     return render(
         request,
         "inventory/what_if_reorder.html",
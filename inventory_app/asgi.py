@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "inventory_app.settings")
+# Under ASGI every request runs its sync code on a fresh thread, so persistent
+# connections would be opened per request and never reused.
+os.environ.setdefault("CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
@@ -55,10 +55,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "core.middleware.LoginRequiredMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -97,13 +99,41 @@ DATABASES = {
 
 # Only apply options if a database engine is specified
 if DATABASES["default"].get("ENGINE"):
-    # For PostgreSQL, make SSL mode conditional
+    # Modest keep-alive (the ASGI entry point sets CONN_MAX_AGE=0)
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+    # Test persistent connections before reuse instead of failing a request.
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    # PostgreSQL: SSL, pgbouncer compatibility, prepared statements, pooling
     if DATABASES["default"]["ENGINE"].endswith("postgresql"):
+        options = DATABASES["default"].setdefault("OPTIONS", {})
         if env.bool("DATABASE_SSL_REQUIRE", default=True):
-            DATABASES["default"].setdefault("OPTIONS", {})
-            DATABASES["default"]["OPTIONS"]["sslmode"] = "require"
-    # Modest keep-alive
-    DATABASES["default"]["CONN_MAX_AGE"] = 60
+            options["sslmode"] = "require"
+        if env.bool("DATABASE_PGBOUNCER", default=False):
+            # pgbouncer/Supavisor in transaction mode may hand each transaction
+            # a different server connection, so nothing may outlive one:
+            # no named server-side cursors and no prepared statements.
+            DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+            options["prepare_threshold"] = None
+        elif env.bool("DATABASE_SERVER_SIDE_BINDING", default=False):
+            # psycopg prepares a statement server-side once it has run
+            # prepare_threshold times on a connection (the hot ledger
+            # UPDATE/INSERT get there quickly); needs server-side binding.
+            options["server_side_binding"] = True
+            options["prepare_threshold"] = env.int(
+                "DATABASE_PREPARE_THRESHOLD", default=5
+            )
+        if env.bool("DATABASE_POOL", default=True):
+            # One psycopg pool per worker process. Connections go back to it
+            # at the end of each request, so persistent connections are off;
+            # CONN_HEALTH_CHECKS makes the pool check them on checkout.
+            options["pool"] = {
+                "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+                "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+                "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+                "max_lifetime": env.float("DATABASE_POOL_MAX_LIFETIME", default=1800.0),
+                "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=300.0),
+            }
+            DATABASES["default"]["CONN_MAX_AGE"] = 0
 
 
 # Password validation
@@ -162,6 +192,110 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 25,
 }
 
+# Restart PO/GRN numbering every calendar year (e.g. PO-2025-0001).
+DOCUMENT_NUMBER_PER_YEAR = env.bool("DOCUMENT_NUMBER_PER_YEAR", default=False)
+
+# Query accounting (core.middleware.QueryBudgetMiddleware). Requests running
+# more queries than the view's @query_budget, or QUERY_BUDGET_DEFAULT when none
+# is declared, are logged; so is any SQL shape repeated this many times. The
+# Server-Timing header exposes query counts, so it is only sent in DEBUG unless
+# QUERY_BUDGET_SERVER_TIMING is set.
+QUERY_BUDGET_DEFAULT = env.int("QUERY_BUDGET_DEFAULT", default=50)
+QUERY_BUDGET_REPEAT_THRESHOLD = env.int("QUERY_BUDGET_REPEAT_THRESHOLD", default=10)
+QUERY_BUDGET_SERVER_TIMING = env.bool("QUERY_BUDGET_SERVER_TIMING", default=DEBUG)
+
+# Change feeds (inventory.services.change_feed) keep re-sending rows written
+# in the last CHANGE_FEED_SAFETY_LAG seconds so that transactions committing
+# later than that with an earlier timestamp or id are not skipped. Raise it
+# if writes to items, suppliers or the ledger can run longer.
+CHANGE_FEED_SAFETY_LAG = env.float("CHANGE_FEED_SAFETY_LAG", default=10.0)
+
+# Metrics (core.metrics). Set METRICS_DIR to a directory shared by all
+# gunicorn workers so /metrics aggregates them. /metrics needs no login from
+# these networks (checked on REMOTE_ADDR and every X-Forwarded-For hop).
+METRICS_DIR = env("METRICS_DIR", default="")
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5.0)
+METRICS_ALLOWED_NETWORKS = env.list(
+    "METRICS_ALLOWED_NETWORKS",
+    default=[
+        "127.0.0.0/8",
+        "::1/128",
+        "10.0.0.0/8",
+        "172.16.0.0/12",
+        "192.168.0.0/16",
+    ],
+)
+
+# Request/command profiling (core.profiling). Profiles are kept in a ring of
+# PROFILING_KEEP files. With PROFILING_SLOW_MS > 0, PROFILING_SAMPLE_RATE of
+# requests are profiled and kept when slower than that threshold.
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR / "var" / "profiles"))
+PROFILING_KEEP = env.int("PROFILING_KEEP", default=50)
+PROFILING_SLOW_MS = env.int("PROFILING_SLOW_MS", default=0)
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.1)
+
+# Where `archive_stock_transactions --to file` writes archived ledger months.
+LEDGER_ARCHIVE_DIR = env(
+    "LEDGER_ARCHIVE_DIR", default=str(BASE_DIR / "var" / "ledger_archive")
+)
+
+# Threads (each holding one database connection) that async views use to run
+# independent queries concurrently (core.async_db); 0 runs them one by one.
+ASYNC_DB_POOL_SIZE = env.int("ASYNC_DB_POOL_SIZE", default=4)
+
+# Cache shared by all workers: Redis when CACHE_URL is set (e.g.
+# redis://redis:6379/1), otherwise files under CACHE_DIR, which needs no
+# service for development and tests. Keys are namespaced by CACHE_KEY_PREFIX;
+# bump CACHE_VERSION to orphan every entry written by an older release.
+CACHE_URL = env("CACHE_URL", default="")
+# Redis values at least this large are zlib-compressed (core.cache); the file
+# backend compresses every value.
+CACHE_COMPRESS_MIN_BYTES = env.int("CACHE_COMPRESS_MIN_BYTES", default=1024)
+_cache_common = {
+    "KEY_PREFIX": env("CACHE_KEY_PREFIX", default="inventory"),
+    "VERSION": env.int("CACHE_VERSION", default=1),
+    "TIMEOUT": env.int("CACHE_TIMEOUT", default=300),
+}
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "OPTIONS": {
+                "serializer": "core.cache.CompressedRedisSerializer",
+                "socket_connect_timeout": 2,
+                "socket_timeout": 2,
+            },
+            **_cache_common,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": env("CACHE_DIR", default=str(BASE_DIR / "var" / "cache")),
+            "OPTIONS": {"MAX_ENTRIES": env.int("CACHE_MAX_ENTRIES", default=5000)},
+            **_cache_common,
+        }
+    }
+
+# Sessions are read from the cache and only written through to the database,
+# which saves a query on every authenticated request.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Mixed into every ETag; change it on deploy so clients drop cached partials
+# rendered by older templates.
+ETAG_SALT = env("ETAG_SALT", default="")
+
+# Table versions are published to the cache on every bump; the TTL only
+# bounds how long writes made outside the ORM take to show.
+TABLE_VERSION_CACHE_TTL = env.int("TABLE_VERSION_CACHE_TTL", default=300)
+# Rendered list fragments (see inventory.views.fragments). Fragments larger
+# than FRAGMENT_CACHE_MAX_BYTES are rendered every time rather than evicting
+# many small, frequently used ones.
+FRAGMENT_CACHE_TTL = env.int("FRAGMENT_CACHE_TTL", default=60 * 60)
+FRAGMENT_CACHE_MAX_BYTES = env.int("FRAGMENT_CACHE_MAX_BYTES", default=256 * 1024)
+
 LOGIN_URL = "/"
 LOGIN_REDIRECT_URL = "/dashboard/"
 LOGOUT_REDIRECT_URL = "/"
@@ -172,6 +306,7 @@ LOGIN_EXEMPT_URLS = [
     r"^accounts/login/$",
     r"^accounts/logout/$",
     r"^healthz$",
+    r"^metrics$",
     r"^static/",
 ]
 
@@ -19,9 +19,25 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic.base import RedirectView
 
-from core.views import dashboard, dashboard_kpis, health_check, root_view
+from core.views import (
+    cache_view,
+    dashboard,
+    dashboard_kpis,
+    health_check,
+    metrics_view,
+    profile_download,
+    profiles_list,
+    root_view,
+)
 
 urlpatterns = [
+    path("admin/profiles/", profiles_list, name="profiles"),
+    path(
+        "admin/profiles/<str:profile_id>.<str:fmt>",
+        profile_download,
+        name="profile-download",
+    ),
+    path("admin/cache/", cache_view, name="cache-stats"),
     path("admin/", admin.site.urls),
     path(
         "login/",
@@ -32,6 +48,7 @@ urlpatterns = [
     path("dashboard/", dashboard, name="dashboard"),
     path("dashboard/kpis/", dashboard_kpis, name="dashboard-kpis"),
     path("healthz", health_check, name="health-check"),
+    path("metrics", metrics_view, name="metrics"),
     path("accounts/", include("django.contrib.auth.urls")),
     path("", include("core.urls")),
     path("api/", include("inventory.urls")),  # DRF API
@@ -45,3 +45,45 @@ def logged_in_client(client, db):
     client.force_login(user)
     yield
     client.logout()
+
+
+@pytest.fixture(autouse=True)
+def sequential_async_db(settings):
+    """Run async views' concurrent queries on the test's own connection.
+
+    Pool threads open their own connections, which cannot see data written
+    inside the test's transaction.
+    """
+
+    settings.ASYNC_DB_POOL_SIZE = 0
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_cache_dir(tmp_path_factory):
+    """Keep the test run's file cache apart from the development one."""
+
+    from django.conf import settings
+    from django.test import override_settings
+
+    if "FileBasedCache" not in settings.CACHES["default"]["BACKEND"]:
+        yield
+        return
+    caches = {"default": {**settings.CACHES["default"]}}
+    caches["default"]["LOCATION"] = str(tmp_path_factory.mktemp("cache"))
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache.
+
+    Cached table versions and fragments would otherwise outlive the rolled
+    back data they describe.
+    """
+
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
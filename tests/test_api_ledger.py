@@ -0,0 +1,172 @@
+from datetime import date
+
+import pytest
+
+from inventory.models import (
+    GoodsReceivedNote,
+    GRNItem,
+    Item,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    StockTransaction,
+    Supplier,
+)
+from inventory.services import purchase_order_service
+
+
+@pytest.mark.django_db
+def test_stock_transactions_cursor_pagination(client, item_factory):
+    item = item_factory(name="Flour")
+    StockTransaction.objects.bulk_create(
+        [
+            StockTransaction(item=item, quantity_change=i, transaction_type="ADJ")
+            for i in range(5)
+        ]
+    )
+    resp = client.get("/api/stock-transactions/", {"page_size": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "count" not in data
+    ids = [row["transaction_id"] for row in data["results"]]
+    resp = client.get(data["next"])
+    ids += [row["transaction_id"] for row in resp.json()["results"]]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 4
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_trim_output_and_select(
+    client, item_factory, django_assert_max_num_queries
+):
+    item = item_factory(name="Sugar")
+    StockTransaction.objects.create(
+        item=item, quantity_change=2, transaction_type="ADJ", notes="x"
+    )
+    with django_assert_max_num_queries(4):
+        resp = client.get("/api/stock-transactions/", {"fields": "transaction_id,item"})
+    assert resp.status_code == 200
+    assert resp.json()["results"] == [
+        {"transaction_id": StockTransaction.objects.get().pk, "item": item.pk}
+    ]
+    resp = client.get("/api/items/", {"fields": "item_id,category_id"})
+    assert set(resp.json()["results"][0]) == {"item_id", "category_id"}
+    resp = client.get("/api/stock-transactions/", {"fields": "nope"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_create_stock_transactions_moves_stock(
+    client, item_factory, django_assert_max_num_queries
+):
+    items = [item_factory(name=f"Item {i}", current_stock=10) for i in range(5)]
+    payload = [
+        {"item": item.pk, "quantity_change": "2.00", "transaction_type": "RECEIVING"}
+        for item in items
+    ] + [{"item": items[0].pk, "quantity_change": "-1", "transaction_type": "ISSUE"}]
+    # Constant in the number of rows: session/user lookups, one in_bulk per
+    # related field, the grouped stock UPDATE and the ledger INSERT.
+    with django_assert_max_num_queries(12):
+        resp = client.post(
+            "/api/stock-transactions/", payload, content_type="application/json"
+        )
+    assert resp.status_code == 201, resp.content
+    assert len(resp.json()) == 6
+    stocks = dict(
+        Item.objects.filter(pk__in=[i.pk for i in items]).values_list(
+            "pk", "current_stock"
+        )
+    )
+    assert stocks[items[0].pk] == 11
+    assert stocks[items[1].pk] == 12
+    assert StockTransaction.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_bulk_create_is_all_or_nothing(client, item_factory):
+    item = item_factory(name="Salt", current_stock=1)
+    payload = [
+        {"item": item.pk, "quantity_change": "1", "transaction_type": "ADJ"},
+        {"item": 9999, "quantity_change": "1", "transaction_type": "ADJ"},
+    ]
+    resp = client.post(
+        "/api/stock-transactions/", payload, content_type="application/json"
+    )
+    assert resp.status_code == 400
+    item.refresh_from_db()
+    assert item.current_stock == 1
+    assert StockTransaction.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_grn_items_refreshes_po_totals(client, item_factory):
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Rice")
+    _, _, po_id = purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today()},
+        [{"item_id": item.pk, "quantity_ordered": 10, "unit_price": 2}],
+    )
+    poi = PurchaseOrderItem.objects.get(purchase_order_id=po_id)
+    grn = GoodsReceivedNote.objects.create(
+        purchase_order_id=po_id, supplier=supplier, received_date=date.today()
+    )
+    row = {
+        "grn": grn.pk,
+        "po_item": poi.pk,
+        "quantity_ordered_on_po": "10",
+        "quantity_received": "3",
+        "unit_price_at_receipt": "2",
+    }
+    resp = client.post("/api/grn-items/", [row, row], content_type="application/json")
+    assert resp.status_code == 201, resp.content
+    assert GRNItem.objects.count() == 2
+    assert PurchaseOrder.objects.get(pk=po_id).received_total == 6
+    assert PurchaseOrder.objects.get(pk=po_id).status == "PARTIAL"
+
+    resp = client.post(
+        "/api/grn-items/",
+        {**row, "quantity_received": "4"},
+        content_type="application/json",
+    )
+    assert resp.status_code == 201, resp.content
+    assert PurchaseOrder.objects.get(pk=po_id).status == "COMPLETE"
+
+
+@pytest.mark.django_db
+def test_deleting_a_grn_rolls_back_po_totals(client, item_factory):
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Rice")
+    _, _, po_id = purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today(), "status": "ORDERED"},
+        [{"item_id": item.pk, "quantity_ordered": 10, "unit_price": 2}],
+    )
+    poi = PurchaseOrderItem.objects.get(purchase_order_id=po_id)
+    first, second = [
+        GoodsReceivedNote.objects.create(
+            purchase_order_id=po_id, supplier=supplier, received_date=date.today()
+        )
+        for _ in range(2)
+    ]
+    for grn, qty in ((first, "4"), (second, "6")):
+        resp = client.post(
+            "/api/grn-items/",
+            {
+                "grn": grn.pk,
+                "po_item": poi.pk,
+                "quantity_ordered_on_po": "10",
+                "quantity_received": qty,
+                "unit_price_at_receipt": "2",
+            },
+            content_type="application/json",
+        )
+        assert resp.status_code == 201, resp.content
+    assert PurchaseOrder.objects.get(pk=po_id).status == "COMPLETE"
+
+    assert client.delete(f"/api/goods-received-notes/{second.pk}/").status_code == 204
+    po = PurchaseOrder.objects.get(pk=po_id)
+    poi.refresh_from_db()
+    assert (po.received_total, poi.received_qty, po.status) == (4, 4, "PARTIAL")
+
+    assert client.delete(f"/api/goods-received-notes/{first.pk}/").status_code == 204
+    po = PurchaseOrder.objects.get(pk=po_id)
+    assert (po.received_total, po.status) == (0, "ORDERED")
+    assert not purchase_order_service.find_total_mismatches([po_id])
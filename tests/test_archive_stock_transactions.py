@@ -0,0 +1,181 @@
+import csv
+import datetime
+import gzip
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from inventory.models import ArchivedStockTotal, ChangeTombstone, StockTransaction
+from inventory.services import item_service, ledger_archive, ml
+
+UTC = datetime.timezone.utc
+
+
+def _tx(item, qty, tx_type, when):
+    tx = StockTransaction.objects.create(
+        item=item, quantity_change=Decimal(qty), transaction_type=tx_type
+    )
+    # transaction_date is auto_now_add; back-date it afterwards.
+    StockTransaction.objects.filter(pk=tx.pk).update(transaction_date=when)
+    return tx
+
+
+@pytest.fixture
+def ledger(item_factory):
+    flour = item_factory(name="Flour")
+    sugar = item_factory(name="Sugar")
+    now = datetime.datetime.now(UTC)
+    old = datetime.datetime(2020, 1, 15, tzinfo=UTC)
+    _tx(flour, "10", "RECEIVING", old)
+    _tx(flour, "-3", "ISSUE", old + datetime.timedelta(days=1))
+    _tx(flour, "4", "RECEIVING", datetime.datetime(2020, 2, 3, tzinfo=UTC))
+    _tx(sugar, "7", "RECEIVING", old)
+    _tx(flour, "2", "RECEIVING", now)
+    return flour, sugar
+
+
+def test_archive_cutoff_keeps_full_months():
+    today = datetime.date(2026, 3, 18)
+    assert ledger_archive.archive_cutoff(1, today) == datetime.date(2026, 2, 1)
+    assert ledger_archive.archive_cutoff(3, today) == datetime.date(2025, 12, 1)
+
+
+@pytest.mark.django_db
+def test_dry_run_reports_without_archiving(ledger):
+    out = io.StringIO()
+    call_command("archive_stock_transactions", "--dry-run", "--months", "2", stdout=out)
+
+    assert "2020-01: 3 rows, net 14" in out.getvalue()
+    assert "Would archive 4 transactions from 2 month(s)" in out.getvalue()
+    assert StockTransaction.objects.count() == 5
+    assert not ArchivedStockTotal.objects.exists()
+
+
+@pytest.mark.django_db
+def test_archive_to_files_keeps_balances_exact(ledger, tmp_path):
+    flour, sugar = ledger
+    item_service.get_all_items_with_stock.clear()
+    before = {
+        row["item_id"]: row["current_stock"]
+        for row in item_service.get_all_items_with_stock()
+    }
+    abc_before = ml.abc_classification()
+
+    call_command(
+        "archive_stock_transactions",
+        "--months",
+        "2",
+        "--to",
+        "file",
+        "--output-dir",
+        str(tmp_path),
+        stdout=io.StringIO(),
+    )
+
+    assert list(StockTransaction.objects.values_list("quantity_change", flat=True)) == [
+        Decimal("2")
+    ]
+    totals = {
+        (t.item_id, t.transaction_type, t.month): (
+            t.quantity_change,
+            t.transaction_count,
+        )
+        for t in ArchivedStockTotal.objects.all()
+    }
+    assert totals == {
+        (flour.pk, "RECEIVING", datetime.date(2020, 1, 1)): (Decimal("10"), 1),
+        (flour.pk, "ISSUE", datetime.date(2020, 1, 1)): (Decimal("-3"), 1),
+        (flour.pk, "RECEIVING", datetime.date(2020, 2, 1)): (Decimal("4"), 1),
+        (sugar.pk, "RECEIVING", datetime.date(2020, 1, 1)): (Decimal("7"), 1),
+    }
+
+    item_service.get_all_items_with_stock.clear()
+    after = {
+        row["item_id"]: row["current_stock"]
+        for row in item_service.get_all_items_with_stock()
+    }
+    assert after == before == {flour.pk: Decimal("13"), sugar.pk: Decimal("7")}
+    assert item_service.get_item_details(flour.pk)["current_stock"] == Decimal("13")
+    assert ml.abc_classification() == abc_before
+
+    with gzip.open(tmp_path / "stock_transactions_2020_01.csv.gz", "rt") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r["quantity_change"] for r in rows] == ["10.00", "-3.00", "7.00"]
+    assert rows[0]["item_id"] == str(flour.pk)
+    assert (tmp_path / "stock_transactions_2020_02.csv.gz").exists()
+
+    # Archived rows were moved, not deleted: no change-feed tombstones.
+    assert not ChangeTombstone.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rearchiving_a_month_adds_to_its_totals_and_file(ledger, tmp_path):
+    flour, _ = ledger
+    cutoff = datetime.date(2020, 3, 1)
+    ledger_archive.archive_before(cutoff, destination="file", output_dir=tmp_path)
+    _tx(flour, "5", "RECEIVING", datetime.datetime(2020, 1, 20, tzinfo=UTC))
+
+    months = ledger_archive.archive_before(
+        cutoff, destination="file", output_dir=tmp_path
+    )
+
+    assert [(m["month"], m["rows"]) for m in months] == [(datetime.date(2020, 1, 1), 1)]
+    total = ArchivedStockTotal.objects.get(
+        item=flour, transaction_type="RECEIVING", month=datetime.date(2020, 1, 1)
+    )
+    assert (total.quantity_change, total.transaction_count) == (Decimal("15"), 2)
+    with gzip.open(tmp_path / "stock_transactions_2020_01.csv.gz", "rt") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r["quantity_change"] for r in rows] == ["10.00", "-3.00", "7.00", "5.00"]
+
+
+@pytest.mark.django_db
+def test_archive_to_table_requires_postgres(ledger):
+    with pytest.raises(CommandError, match="requires PostgreSQL"):
+        call_command(
+            "archive_stock_transactions", "--months", "2", stdout=io.StringIO()
+        )
+    assert StockTransaction.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_history_report_adds_archived_months(client, ledger, tmp_path):
+    flour, _ = ledger
+    call_command(
+        "archive_stock_transactions",
+        "--months",
+        "2",
+        "--to",
+        "file",
+        "--output-dir",
+        str(tmp_path),
+        stdout=io.StringIO(),
+    )
+    url = reverse("history_reports")
+
+    resp = client.get(url, {"item": flour.pk})
+    assert resp.context["total_quantity"] == Decimal("13")
+    assert resp.context["archived_months"] == 2
+    assert resp.context["chart_bucket"] == "month"
+    assert resp.context["chart_data"][:2] == [7.0, 4.0]
+
+    resp = client.get(
+        url,
+        {
+            "item": flour.pk,
+            "type": "RECEIVING",
+            "start_date": "2020-01-01",
+            "end_date": "2020-01-31",
+        },
+    )
+    assert resp.context["total_quantity"] == Decimal("10")
+    assert not resp.context["archive_incomplete"]
+
+    resp = client.get(url, {"item": flour.pk, "start_date": "2020-01-10"})
+    assert resp.context["archive_incomplete"]
+    resp = client.get(url, {"user": "admin"})
+    assert resp.context["archive_incomplete"]
+    assert b"Incomplete" in resp.content
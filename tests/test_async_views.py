@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from core import async_db
+from inventory.models import StockTransaction, Supplier
+
+
+@pytest.fixture
+def aclient(async_client):
+    async_client.force_login(get_user_model().objects.get(username="admin"))
+    return async_client
+
+
+@pytest.mark.django_db
+def test_async_views_under_asgi(aclient, item_factory, settings):
+    settings.QUERY_BUDGET_SERVER_TIMING = True
+    item = item_factory(name="Basmati", reorder_point=10, current_stock=5)
+    item_factory(name="Sugar")
+    Supplier.objects.create(name="Supp")
+    StockTransaction.objects.create(
+        item=item,
+        quantity_change=2,
+        transaction_type="RECEIVING",
+        transaction_date=timezone.now(),
+    )
+    get = async_to_sync(aclient.get)
+
+    resp = get(reverse("dashboard-kpis"))
+    assert resp.status_code == 200
+    assert b"Low-stock Items" in resp.content
+    assert "Server-Timing" in resp.headers
+    resp = get(reverse("dashboard-kpis"), headers={"if-none-match": resp["ETag"]})
+    assert resp.status_code == 304
+
+    resp = get(reverse("item_search"), {"q": "basm"})
+    assert (
+        resp.content.decode().strip() == f'<option value="{item.pk}">Basmati</option>'
+    )
+
+    resp = get(reverse("ajax-dashboard-data"), {"item": item.pk})
+    assert resp.json()["values"] == [2.0]
+
+
+@pytest.mark.django_db
+def test_async_views_require_login(async_client):
+    resp = async_to_sync(async_client.get)(reverse("dashboard-kpis"))
+    assert resp.status_code == 302
+
+
+def test_gather_runs_calls_on_bounded_pool(settings):
+    settings.ASYNC_DB_POOL_SIZE = 2
+    async_db.shutdown()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def call():
+        # Both calls must be running at once to pass the barrier.
+        barrier.wait()
+        return threading.current_thread().name
+
+    try:
+        names = async_to_sync(async_db.gather)(call, call)
+    finally:
+        async_db.shutdown()
+    assert len(set(names)) == 2
+    assert all(name.startswith("async-db") for name in names)
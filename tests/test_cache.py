@@ -0,0 +1,55 @@
+import pickle
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.cache import COMPRESSED_PREFIX, CompressedRedisSerializer, cache_stats
+
+
+def test_serializer_compresses_only_large_values(settings):
+    settings.CACHE_COMPRESS_MIN_BYTES = 100
+    serializer = CompressedRedisSerializer()
+    small, large = {"a": 1}, "x" * 1000
+
+    assert serializer.dumps(small) == pickle.dumps(small, pickle.HIGHEST_PROTOCOL)
+    packed = serializer.dumps(large)
+    assert packed.startswith(COMPRESSED_PREFIX) and len(packed) < 100
+    assert serializer.loads(packed) == large
+    assert serializer.loads(serializer.dumps(small)) == small
+    # Integers stay raw so that Redis can increment them.
+    assert serializer.dumps(7) == 7
+    assert serializer.loads(b"8") == 8
+
+
+def test_stats_describe_the_file_cache():
+    cache.clear()  # drop the logged-in client's session
+    cache.set("forecast", list(range(100)))
+
+    stats = cache_stats()
+
+    assert stats["backend"].endswith("FileBasedCache")
+    assert stats["key_prefix"] == "inventory"
+    assert dict(stats["stats"])["Entries"] == 1
+    assert not stats["error"]
+
+
+@pytest.mark.django_db
+def test_sessions_are_read_from_the_cache(client):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(reverse("items_table"))
+    assert not [q for q in ctx.captured_queries if "django_session" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_cache_page_is_staff_only(client, django_user_model):
+    django_user_model.objects.filter(username="admin").update(is_staff=True)
+    resp = client.get("/admin/cache/")
+    assert resp.status_code == 200
+    assert b"FileBasedCache" in resp.content
+
+    user = django_user_model.objects.create_user("clerk", password="pw")
+    client.force_login(user)
+    assert client.get("/admin/cache/").status_code == 302
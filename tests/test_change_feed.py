@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from inventory.models import Item, StockTransaction
+from inventory.services import change_feed, stock_service
+
+
+@pytest.fixture(autouse=True)
+def no_safety_lag(settings):
+    settings.CHANGE_FEED_SAFETY_LAG = 0
+
+
+@pytest.mark.django_db
+def test_item_feed_pages_upserts_and_tombstones(client, item_factory):
+    items = [item_factory(name=f"Item {i}") for i in range(3)]
+    resp = client.get("/api/items/changes/", {"limit": 2})
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [r["item_id"] for r in page["upserts"]] == [i.pk for i in items[:2]]
+    assert page["has_more"] is True
+
+    page = client.get("/api/items/changes/", {"since": page["next_since"]}).json()
+    assert [r["item_id"] for r in page["upserts"]] == [items[2].pk]
+    assert page["deletes"] == []
+    assert page["has_more"] is False
+    token = page["next_since"]
+
+    page = client.get("/api/items/changes/", {"since": token}).json()
+    assert page["upserts"] == [] and page["deletes"] == []
+
+    items[0].name = "Renamed"
+    items[0].save()
+    deleted_id = items[1].pk
+    items[1].delete()
+    page = client.get("/api/items/changes/", {"since": token}).json()
+    assert [r["item_id"] for r in page["upserts"]] == [items[0].pk]
+    assert page["deletes"] == [deleted_id]
+
+
+@pytest.mark.django_db
+def test_full_sync_skips_old_tombstones(item_factory):
+    item_factory(name="Gone").delete()
+    kept = item_factory(name="Kept")
+    page = change_feed.read_changes(
+        Item.objects.all(), fields=("updated_at", "item_id")
+    )
+    assert [i.pk for i in page["upserts"]] == [kept.pk]
+    assert page["deletes"] == []
+
+
+@pytest.mark.django_db
+def test_stock_transaction_feed_uses_id_watermark(client, item_factory):
+    item = item_factory(name="Flour", current_stock=0)
+    stock_service.record_stock_transaction(item.pk, 1, "RECEIVING")
+    token = client.get("/api/stock-transactions/changes/").json()["next_since"]
+    stock_service.record_stock_transaction(item.pk, 2, "RECEIVING")
+    page = client.get(
+        "/api/stock-transactions/changes/",
+        {"since": token, "fields": "transaction_id,quantity_change"},
+    ).json()
+    latest = StockTransaction.objects.latest("transaction_id")
+    assert page["upserts"] == [{"transaction_id": latest.pk, "quantity_change": "2.00"}]
+
+
+@pytest.mark.django_db
+def test_invalid_since_token_is_rejected(client):
+    resp = client.get("/api/items/changes/", {"since": "not-a-token"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_token_waits_for_recent_writes_to_settle(settings, item_factory):
+    settings.CHANGE_FEED_SAFETY_LAG = 60
+    items = Item.objects.all()
+    fields = ("updated_at", "item_id")
+    settled = item_factory(name="Settled")
+    Item.objects.filter(pk=settled.pk).update(
+        updated_at=timezone.now() - timedelta(minutes=5)
+    )
+    recent = item_factory(name="Recent")
+    page = change_feed.read_changes(items, fields=fields, limit=1)
+    assert [i.pk for i in page["upserts"]] == [settled.pk]
+    assert page["has_more"] is True
+
+    page = change_feed.read_changes(items, fields=fields, since=page["next_since"])
+    assert [i.pk for i in page["upserts"]] == [recent.pk]
+    token = page["next_since"]
+
+    # A transaction that started earlier commits now, behind "recent".
+    late = item_factory(name="Late")
+    Item.objects.filter(pk=late.pk).update(
+        updated_at=recent.updated_at - timedelta(seconds=1)
+    )
+    page = change_feed.read_changes(items, fields=fields, since=token)
+    assert [i.pk for i in page["upserts"]] == [late.pk, recent.pk]
+    assert page["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_id_feed_keeps_rereading_unsettled_rows(settings, item_factory):
+    settings.CHANGE_FEED_SAFETY_LAG = 60
+    item = item_factory(name="Flour", current_stock=0)
+    stock_service.record_stock_transaction(item.pk, 1, "RECEIVING")
+    ledger = StockTransaction.objects.all()
+    first = change_feed.read_changes(
+        ledger, fields=("transaction_id",), written_at="transaction_date"
+    )
+    again = change_feed.read_changes(
+        ledger,
+        fields=("transaction_id",),
+        since=first["next_since"],
+        written_at="transaction_date",
+    )
+    assert [t.pk for t in again["upserts"]] == [t.pk for t in first["upserts"]]
+
+    settings.CHANGE_FEED_SAFETY_LAG = 0
+    settled = change_feed.read_changes(
+        ledger,
+        fields=("transaction_id",),
+        since=again["next_since"],
+        written_at="transaction_date",
+    )
+    done = change_feed.read_changes(
+        ledger,
+        fields=("transaction_id",),
+        since=settled["next_since"],
+        written_at="transaction_date",
+    )
+    assert len(settled["upserts"]) == 1
+    assert done["upserts"] == []
@@ -0,0 +1,57 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from inventory.management.commands import check_indexes
+
+# SQLite versions of db/migrations/006_ledger_indexes.sql (no CONCURRENTLY or
+# INCLUDE).
+INDEXES = [
+    "CREATE INDEX test_st_item_date ON stock_transactions (item_id, transaction_date DESC)",
+    "CREATE INDEX test_st_type_date ON stock_transactions "
+    "(transaction_type, transaction_date, quantity_change)",
+    "CREATE INDEX test_st_user_date ON stock_transactions (user_id, transaction_date)",
+    "CREATE INDEX test_items_low_stock ON items (name) "
+    "WHERE reorder_point IS NOT NULL AND current_stock < reorder_point",
+    "CREATE INDEX test_grn_received_date ON goods_received_notes (received_date)",
+    "CREATE INDEX test_po_status ON purchase_orders (status)",
+]
+
+
+@pytest.mark.django_db
+def test_check_indexes_reports_full_scans_until_indexes_exist():
+    out = io.StringIO()
+    with pytest.raises(CommandError, match="scan a whole table"):
+        call_command("check_indexes", stdout=out)
+    assert "receipts last 7 days: full scan of stock_transactions" in out.getvalue()
+    assert "open purchase orders: full scan of purchase_orders" in out.getvalue()
+
+    with connection.cursor() as cursor:
+        for sql in INDEXES:
+            cursor.execute(sql)
+
+    out = io.StringIO()
+    call_command("check_indexes", stdout=out)
+    assert "full scan" not in out.getvalue()
+    assert "All hot queries use an index." in out.getvalue()
+
+
+def test_postgres_plans_count_scans_of_partitions():
+    def plan(*relations):
+        scans = [{"Node Type": "Seq Scan", "Relation Name": r} for r in relations]
+        return json.dumps([{"Plan": {"Node Type": "Append", "Plans": scans}}])
+
+    with patch.object(connection, "vendor", "postgresql"):
+        for relation in ("stock_transactions_y2025m03", "stock_transactions_default"):
+            assert check_indexes._uses_full_scan(plan(relation), "stock_transactions")
+        assert not check_indexes._uses_full_scan(
+            plan(
+                "stock_transactions_archive_y2025m03",
+                "stock_transactions_unpartitioned",
+            ),
+            "stock_transactions",
+        )
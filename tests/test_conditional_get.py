@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from inventory.models import Item, TableVersion
+from inventory.models.versions import (
+    VERSION_CACHE_PREFIX,
+    bump_table_versions,
+    get_table_versions,
+)
+
+
+@pytest.mark.django_db
+def test_set_based_writes_bump_table_version(
+    item_factory, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        item = item_factory(name="Flour")
+    before = get_table_versions(["items"])["items"]
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        Item.objects.filter(pk=item.pk).update(current_stock=5)
+        Item.objects.filter(pk=item.pk).update(current_stock=6)
+    # Both writes share one commit callback.
+    assert len(callbacks) == 1
+    assert get_table_versions(["items"])["items"] == before + 1
+    assert TableVersion.objects.filter(table_name="items").exists()
+
+
+@pytest.mark.django_db
+def test_bump_publishes_the_version_it_wrote(
+    django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    TableVersion.objects.create(table_name="suppliers", version=41)
+    cache.set(VERSION_CACHE_PREFIX + "suppliers", 7)
+    with django_capture_on_commit_callbacks() as callbacks:
+        bump_table_versions("suppliers", "recipes")
+    # One upsert returns both versions, between its savepoint statements.
+    with django_assert_num_queries(3):
+        callbacks[0]()
+    assert cache.get_many(
+        [VERSION_CACHE_PREFIX + "suppliers", VERSION_CACHE_PREFIX + "recipes"]
+    ) == {VERSION_CACHE_PREFIX + "suppliers": 42, VERSION_CACHE_PREFIX + "recipes": 1}
+    assert get_table_versions(["suppliers", "recipes"]) == {
+        "suppliers": 42,
+        "recipes": 1,
+    }
+
+
+@pytest.mark.django_db
+def test_items_table_partial_returns_304_until_data_changes(
+    client,
+    item_factory,
+    django_capture_on_commit_callbacks,
+    django_assert_max_num_queries,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        item_factory(name="Sugar")
+    url = reverse("items_table")
+    resp = client.get(url, {"q": "Su"})
+    assert resp.status_code == 200
+    etag = resp["ETag"]
+    assert "no-cache" in resp["Cache-Control"]
+
+    with django_assert_max_num_queries(3):
+        resp = client.get(url, {"q": "Su"}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+
+    resp = client.get(url, {"q": "Sa"}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item_factory(name="Sugar cubes")
+    resp = client.get(url, {"q": "Su"}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_api_list_returns_304(client, item_factory, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        item_factory(name="Rice")
+    resp = client.get("/api/items/")
+    assert resp.status_code == 200
+    etag = resp["ETag"]
+    resp = client.get("/api/items/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    with django_capture_on_commit_callbacks(execute=True):
+        Item.objects.filter(name="Rice").update(notes="long grain")
+    resp = client.get("/api/items/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
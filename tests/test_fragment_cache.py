@@ -0,0 +1,89 @@
+import re
+
+import pytest
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from inventory.models import Item, Recipe
+from inventory.views.fragments import CSRF_PLACEHOLDER
+
+
+@pytest.fixture
+def items(item_factory, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return [item_factory(name=name) for name in ("Flour", "Sugar")]
+
+
+@pytest.mark.django_db
+def test_repeat_items_table_is_served_without_queries(
+    client, items, django_assert_num_queries
+):
+    url = reverse("items_table")
+    first = client.get(url, {"q": "Su"})
+    assert b"Sugar" in first.content
+
+    # Only the user lookup of the logged-in client remains.
+    with django_assert_num_queries(1):
+        again = client.get(url, {"q": "Su"})
+    assert b"Sugar" in again.content
+    assert b"Flour" not in again.content
+
+
+@pytest.mark.django_db
+def test_items_table_changes_after_a_committed_write(
+    client, items, django_capture_on_commit_callbacks
+):
+    url = reverse("items_table")
+    assert b"Sugar cubes" not in client.get(url).content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Item.objects.filter(pk=items[1].pk).update(name="Sugar cubes")
+
+    assert b"Sugar cubes" in client.get(url).content
+
+
+@pytest.mark.django_db
+def test_uncommitted_writes_bypass_the_cache(client, items):
+    url = reverse("items_table")
+    client.get(url)
+    with transaction.atomic():
+        Item.objects.filter(pk=items[1].pk).update(name="Sugar cubes")
+        assert b"Sugar cubes" in client.get(url).content
+
+
+@pytest.mark.django_db
+def test_cached_fragment_carries_the_users_csrf_token(
+    django_user_model, items, django_assert_num_queries
+):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(django_user_model.objects.get(username="admin"))
+    url = reverse("items_table")
+    client.get(url)
+    with django_assert_num_queries(1):
+        resp = client.get(url)
+    assert CSRF_PLACEHOLDER.encode() not in resp.content
+    token = re.search(rb'name="csrfmiddlewaretoken" value="([^"]+)"', resp.content)
+
+    resp = client.post(
+        reverse("item_toggle_active", args=[items[0].pk]),
+        HTTP_X_CSRFTOKEN=token.group(1).decode(),
+    )
+    assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+def test_recipes_grid_is_cached_until_recipes_change(
+    client, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        Recipe.objects.create(name="Bread")
+    url = reverse("recipes_list")
+    client.get(url, HTTP_HX_REQUEST="true")
+    with django_assert_num_queries(1):
+        resp = client.get(url, HTTP_HX_REQUEST="true")
+    assert b"Bread" in resp.content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Recipe.objects.create(name="Cake")
+    assert b"Cake" in client.get(url, HTTP_HX_REQUEST="true").content
@@ -1,8 +1,18 @@
+import io
 from datetime import date
+from decimal import Decimal
 
 import pytest
+from django.core.management import CommandError, call_command
 
-from inventory.models import PurchaseOrder, PurchaseOrderItem, Supplier
+from inventory.models import (
+    GoodsReceivedNote,
+    Item,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    StockTransaction,
+    Supplier,
+)
 from inventory.services import goods_receiving_service, purchase_order_service
 
 
@@ -39,5 +49,104 @@ def test_create_grn_updates_stock_and_po(item_factory):
     assert item.current_stock == 5
     po_item.refresh_from_db()
     assert po_item.received_total == 5
+    assert po_item.received_value == 5
     po = PurchaseOrder.objects.get(pk=po_id)
     assert po.status == "PARTIAL"
+    assert po.ordered_total == 10
+    assert po.received_total == 5
+    assert po.progress_percent == 50
+    assert purchase_order_service.find_total_mismatches([po_id]) == []
+
+    # Drifted counters and the status derived from them are repaired together.
+    PurchaseOrderItem.objects.filter(pk=po_item.pk).update(received_qty=10)
+    PurchaseOrder.objects.filter(pk=po_id).update(status="COMPLETE")
+    with pytest.raises(CommandError, match="--fix"):
+        call_command("reconcile_po_totals", stdout=io.StringIO())
+    call_command("reconcile_po_totals", "--fix", stdout=io.StringIO())
+    po.refresh_from_db()
+    assert po.status == "PARTIAL"
+    assert purchase_order_service.find_total_mismatches([po_id]) == []
+
+
+@pytest.mark.django_db
+def test_create_grn_query_count_is_constant(
+    item_factory, django_assert_max_num_queries
+):
+    supplier = Supplier.objects.create(name="Vendor")
+    items = [item_factory(name=f"Item {i}", current_stock=0) for i in range(6)]
+    success, msg, po_id = purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today()},
+        [
+            {"item_id": item.item_id, "quantity_ordered": 4, "unit_price": 1.0}
+            for item in items
+        ],
+    )
+    assert success, msg
+    po_items = PurchaseOrderItem.objects.filter(purchase_order_id=po_id)
+    items_data = [
+        {
+            "item_id": poi.item_id,
+            "po_item_id": poi.pk,
+            "quantity_received": 4,
+            "unit_price_at_receipt": poi.unit_price,
+        }
+        for poi in po_items
+    ]
+    grn_data = {
+        "po_id": po_id,
+        "supplier_id": supplier.pk,
+        "received_date": date.today(),
+        "received_by_user_id": "tester",
+    }
+    # Constant in the number of lines; includes the savepoints and the first-use
+    # insert of the GRN sequence row.
+    with django_assert_max_num_queries(21):
+        success, msg, grn_id = goods_receiving_service.create_grn(grn_data, items_data)
+    assert success, msg
+    stocks = Item.objects.filter(pk__in=[i.pk for i in items]).values_list(
+        "current_stock", flat=True
+    )
+    assert set(stocks) == {4}
+    grn = GoodsReceivedNote.objects.get(pk=grn_id)
+    assert grn.grn_number
+    ledger = StockTransaction.objects.filter(
+        related_po_id=po_id, notes=f"GRN {grn.grn_number}"
+    )
+    assert ledger.count() == 6
+    assert PurchaseOrder.objects.get(pk=po_id).status == "COMPLETE"
+
+
+@pytest.mark.django_db
+def test_fractional_receipts_reconcile(item_factory):
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Saffron", current_stock=0)
+    success, msg, po_id = purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today()},
+        [{"item_id": item.item_id, "quantity_ordered": 2, "unit_price": 0.33}],
+    )
+    assert success, msg
+    po_item = PurchaseOrderItem.objects.get(purchase_order_id=po_id)
+    grn_data = {
+        "po_id": po_id,
+        "supplier_id": supplier.pk,
+        "received_date": date.today(),
+        "received_by_user_id": "tester",
+    }
+    for _ in range(3):
+        success, msg, _ = goods_receiving_service.create_grn(
+            grn_data,
+            [
+                {
+                    "item_id": item.item_id,
+                    "po_item_id": po_item.pk,
+                    "quantity_received": "0.5",
+                    "unit_price_at_receipt": "0.33",
+                }
+            ],
+        )
+        assert success, msg
+
+    # Each 0.165 line is worth 0.17; the stored total must not be 0.50.
+    po_item.refresh_from_db()
+    assert po_item.received_value == Decimal("0.51")
+    assert purchase_order_service.find_total_mismatches([po_id]) == []
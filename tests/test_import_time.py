@@ -0,0 +1,43 @@
+"""Import-time budget for worker boot (``python -X importtime``)."""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded on first use only; importing any of these at boot costs every
+# gunicorn worker and manage.py call hundreds of milliseconds.
+HEAVY_MODULES = ("statsmodels", "scipy", "pandas", "numpy", "fpdf", "supabase")
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+BOOT = "import django; django.setup(); " "import inventory_app.wsgi, inventory_app.urls"
+
+
+def _importtime():
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="inventory_app.settings")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match:
+            depth = len(match.group(2))
+            cumulative[match.group(3)] = (int(match.group(1)), depth)
+    return cumulative
+
+
+def test_boot_does_not_import_heavy_modules_and_fits_budget():
+    modules = _importtime()
+    heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+    assert heavy == [], f"imported at boot: {heavy[:10]}"
+    total_ms = sum(us for us, depth in modules.values() if depth == 0) / 1000
+    assert total_ms < BUDGET_MS, f"boot imports took {total_ms:.0f} ms"
@@ -0,0 +1,149 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from inventory.models import Indent, IndentItem, StockTransaction
+from inventory.services import indent_service
+
+
+def _indent(mrn, lines, status="APPROVED", required=None):
+    indent = Indent.objects.create(
+        mrn=mrn, department="Kitchen", status=status, date_required=required
+    )
+    for item, qty in lines:
+        IndentItem.objects.create(
+            indent=indent, item=item, requested_qty=qty, issued_qty=0
+        )
+    return indent
+
+
+@pytest.fixture
+def stock(item_factory):
+    return (
+        item_factory(name="Flour", current_stock=10),
+        item_factory(name="Sugar", current_stock=3),
+    )
+
+
+@pytest.mark.django_db
+def test_issue_indents_in_one_batch(stock, django_assert_max_num_queries):
+    flour, sugar = stock
+    first = _indent(
+        "MRN-1", [(flour, 4), (sugar, 2)], required=datetime.date(2024, 1, 1)
+    )
+    second = _indent(
+        "MRN-2", [(flour, 5), (sugar, 2)], required=datetime.date(2024, 1, 2)
+    )
+    pending = _indent("MRN-3", [(flour, 1)], status="PENDING")
+
+    with django_assert_max_num_queries(12):
+        success, msg, statuses = indent_service.issue_indents(
+            [first.pk, second.pk, pending.pk], user_id="ann"
+        )
+
+    assert success, msg
+    assert statuses == {first.pk: "COMPLETED", second.pk: "PROCESSING"}
+    assert "Short of stock" in msg and str(sugar.pk) in msg
+    flour.refresh_from_db()
+    sugar.refresh_from_db()
+    assert (flour.current_stock, sugar.current_stock) == (1, 0)
+    lines = {
+        (line.indent_id, line.item_id): (line.issued_qty, line.item_status)
+        for line in IndentItem.objects.all()
+    }
+    assert lines[(second.pk, flour.pk)] == (Decimal("5"), "ISSUED")
+    assert lines[(second.pk, sugar.pk)] == (Decimal("1"), "PARTIAL")
+    assert lines[(pending.pk, flour.pk)] == (Decimal("0"), None)
+    ledger = StockTransaction.objects.filter(related_indent=second).order_by("item_id")
+    assert [(t.item_id, t.quantity_change, t.transaction_type) for t in ledger] == [
+        (flour.pk, Decimal("-5"), "ISSUE"),
+        (sugar.pk, Decimal("-1"), "ISSUE"),
+    ]
+    first.refresh_from_db()
+    assert (first.status, first.processed_by_user_id) == ("COMPLETED", "ann")
+
+    # Issuing again only tops up what is still outstanding.
+    sugar.current_stock = 5
+    sugar.save()
+    success, _, statuses = indent_service.issue_indents([first.pk, second.pk])
+    assert statuses == {second.pk: "COMPLETED"}
+    sugar.refresh_from_db()
+    assert sugar.current_stock == 4
+
+
+@pytest.mark.django_db
+def test_issue_indents_without_partial_skips_short_indents(stock):
+    flour, sugar = stock
+    indent = _indent("MRN-1", [(flour, 4), (sugar, 5)])
+
+    success, _, statuses = indent_service.issue_indents([indent.pk], partial=False)
+
+    assert not success and statuses == {}
+    assert not StockTransaction.objects.exists()
+    indent.refresh_from_db()
+    assert indent.status == "APPROVED"
+
+
+@pytest.mark.django_db
+def test_issue_indents_reports_shortages_only_for_issued_indents(stock):
+    flour, sugar = stock
+    held = _indent("MRN-1", [(sugar, 5)], required=datetime.date(2024, 1, 1))
+    issued = _indent("MRN-2", [(flour, 4)], required=datetime.date(2024, 1, 2))
+
+    success, msg, statuses = indent_service.issue_indents(
+        [held.pk, issued.pk], partial=False
+    )
+
+    assert success and statuses == {issued.pk: "COMPLETED"}
+    assert "Short of stock" not in msg
+    assert "1 indent(s) could not be issued in full" in msg
+
+
+@pytest.mark.django_db
+def test_issue_indents_completes_only_indents_with_issued_lines(stock):
+    flour, _ = stock
+    empty = _indent("MRN-1", [])
+    done = _indent("MRN-2", [(flour, 2)], status="PROCESSING")
+    IndentItem.objects.filter(indent=done).update(issued_qty=2)
+
+    success, _, statuses = indent_service.issue_indents([empty.pk, done.pk])
+
+    assert success and statuses == {done.pk: "COMPLETED"}
+    empty.refresh_from_db()
+    assert empty.status == "APPROVED"
+    assert not StockTransaction.objects.exists()
+
+
+@pytest.mark.django_db
+def test_indents_issue_view_issues_all_approved(client, stock):
+    flour, _ = stock
+    indent = _indent("MRN-1", [(flour, 2)])
+
+    resp = client.post(reverse("indents_issue"))
+
+    assert resp.status_code == 302
+    indent.refresh_from_db()
+    assert indent.status == "COMPLETED"
+    assert StockTransaction.objects.get(related_indent=indent).user_id == "admin"
+
+
+@pytest.mark.django_db
+def test_next_batch_tops_up_partly_issued_indents(stock):
+    _, sugar = stock
+    indent = _indent("MRN-1", [(sugar, 5)])
+
+    call_command("issue_indents", stdout=io.StringIO())
+    indent.refresh_from_db()
+    assert indent.status == "PROCESSING"
+
+    sugar.current_stock = 10
+    sugar.save()
+    call_command("issue_indents", stdout=io.StringIO())
+    indent.refresh_from_db()
+    assert indent.status == "COMPLETED"
+    sugar.refresh_from_db()
+    assert sugar.current_stock == 8
@@ -0,0 +1,139 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from inventory.models import LedgerFacet, StockTransaction
+from inventory.services import ledger_facets, stock_service
+
+UTC = datetime.timezone.utc
+
+
+def _at(day):
+    return datetime.datetime.combine(day, datetime.time(12), tzinfo=UTC)
+
+
+@pytest.fixture
+def ledger(item_factory, django_capture_on_commit_callbacks, monkeypatch):
+    jan1, jan2 = datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)
+    # Every write runs in a captured "transaction" so that all table-version
+    # bumps are executed rather than merged into a pending one.
+    with django_capture_on_commit_callbacks(execute=True):
+        flour = item_factory(name="Flour")
+        StockTransaction.objects.create(
+            item=flour, quantity_change=5, transaction_type="RECEIVING", user_id="ann"
+        )
+        with monkeypatch.context() as patch:
+            # Keep the explicit transaction_date of the back-dated rows.
+            patch.setattr(
+                StockTransaction._meta.get_field("transaction_date"),
+                "auto_now_add",
+                False,
+            )
+            StockTransaction.objects.bulk_create(
+                [
+                    StockTransaction(
+                        item=flour,
+                        quantity_change=-1,
+                        transaction_type="ISSUE",
+                        user_id=user,
+                        transaction_date=_at(day),
+                    )
+                    for user, day in [("ann", jan1), ("bob", jan2), ("", jan2)]
+                ]
+            )
+    return flour
+
+
+@pytest.mark.django_db
+def test_inserts_are_counted_once_per_transaction(ledger):
+    today = datetime.datetime.now(UTC).date()
+    rows = {
+        (f.facet, f.value, f.day): f.count
+        for f in LedgerFacet.objects.filter(facet__in=["type", "user"])
+    }
+    assert rows == {
+        ("type", "RECEIVING", today): 1,
+        ("type", "ISSUE", datetime.date(2024, 1, 1)): 1,
+        ("type", "ISSUE", datetime.date(2024, 1, 2)): 2,
+        ("user", "ann", today): 1,
+        ("user", "ann", datetime.date(2024, 1, 1)): 1,
+        ("user", "bob", datetime.date(2024, 1, 2)): 1,
+    }
+    assert (
+        LedgerFacet.objects.get(facet="item", day=datetime.date(2024, 1, 2)).count == 2
+    )
+
+
+@pytest.mark.django_db
+def test_facet_counts_follow_the_date_range(ledger):
+    facets = ledger_facets.facet_counts()
+    assert facets["type"] == [("ISSUE", 3), ("RECEIVING", 1)]
+    assert facets["user"] == [("ann", 2), ("bob", 1)]
+    assert facets["item"] == [(str(ledger.pk), 4)]
+
+    january = ledger_facets.facet_counts(
+        datetime.date(2024, 1, 2), datetime.date(2024, 1, 31)
+    )
+    assert january["type"] == [("ISSUE", 2)]
+    assert january["user"] == [("bob", 1)]
+
+
+@pytest.mark.django_db
+def test_facet_counts_are_cached_until_the_ledger_changes(
+    ledger, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    ledger_facets.facet_counts()
+    with django_assert_num_queries(0):
+        assert ledger_facets.facet_counts()["user"] == [("ann", 2), ("bob", 1)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        StockTransaction.objects.create(
+            item=ledger, quantity_change=1, transaction_type="ADJUSTMENT", user_id="cy"
+        )
+
+    assert ledger_facets.facet_counts()["user"] == [("ann", 2), ("bob", 1), ("cy", 1)]
+
+
+@pytest.mark.django_db
+def test_deleted_rows_are_subtracted(ledger, django_capture_on_commit_callbacks):
+    bob_row = StockTransaction.objects.get(user_id="bob")
+    blank_user_row = StockTransaction.objects.get(user_id="")
+    with django_capture_on_commit_callbacks(execute=True):
+        assert stock_service.remove_stock_transactions_bulk([bob_row.pk])
+    with django_capture_on_commit_callbacks(execute=True):
+        blank_user_row.delete()
+
+    facets = ledger_facets.facet_counts()
+    assert facets["type"] == [("ISSUE", 1), ("RECEIVING", 1)]
+    assert facets["user"] == [("ann", 2)]
+    assert not LedgerFacet.objects.filter(day=datetime.date(2024, 1, 2)).exists()
+    maintained = set(LedgerFacet.objects.values_list("facet", "value", "day", "count"))
+    ledger_facets.rebuild()
+    assert set(LedgerFacet.objects.values_list("facet", "value", "day", "count")) == (
+        maintained
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_maintained_counts(ledger):
+    maintained = set(LedgerFacet.objects.values_list("facet", "value", "day", "count"))
+
+    ledger_facets.rebuild()
+
+    assert set(LedgerFacet.objects.values_list("facet", "value", "day", "count")) == (
+        maintained
+    )
+
+
+@pytest.mark.django_db
+def test_history_filters_use_facets(client, ledger):
+    client.get(reverse("history_reports"))
+    resp = client.get(reverse("history_reports"))
+
+    filters = {f["name"]: f["options"] for f in resp.context["filters"]}
+    assert filters["type"][1:] == [
+        {"value": "ISSUE", "label": "ISSUE (3)"},
+        {"value": "RECEIVING", "label": "RECEIVING (1)"},
+    ]
+    assert [o["value"] for o in filters["user"]] == ["", "ann", "bob"]
@@ -0,0 +1,38 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.utils.functional import SimpleLazyObject
+
+from core.middleware import LoginRequiredMiddleware, exempt_pattern
+
+
+def _request(path, user):
+    request = RequestFactory().get(path)
+    request.user = SimpleLazyObject(user)
+    return request
+
+
+def _unloadable_user():
+    raise AssertionError("request.user was loaded")
+
+
+@pytest.mark.parametrize("path", ["/healthz", "/static/css/app.css", "/", "/login/"])
+def test_exempt_paths_do_not_load_the_user(path):
+    middleware = LoginRequiredMiddleware(lambda request: None)
+    assert middleware.process_request(_request(path, _unloadable_user)) is None
+
+
+@pytest.mark.parametrize("path", ["/items/", "/healthz/extra", "/staticfiles/x"])
+def test_other_paths_require_login(path):
+    middleware = LoginRequiredMiddleware(lambda request: None)
+    response = middleware.process_request(_request(path, AnonymousUser))
+    assert response.status_code == 302
+
+
+def test_exempt_pattern_keeps_each_expression_anchored():
+    pattern = exempt_pattern([r"^$", r"^healthz$", r"^static/"])
+    assert pattern.match("")
+    assert pattern.match("static/app.css")
+    assert not pattern.match("items/")
+    assert not pattern.match("healthz2")
+    assert exempt_pattern([]) is None
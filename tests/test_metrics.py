@@ -0,0 +1,162 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from core import metrics
+from inventory.models import Supplier
+from inventory.services import purchase_order_service, supabase_cache
+
+
+def test_render_counters_and_histograms():
+    c = metrics.counter("test_events_total", "Test events.", labels=("kind",))
+    h = metrics.histogram("test_duration_seconds", "Test durations.", buckets=(0.1, 1))
+    c.labels("a").inc()
+    c.labels("a").inc(2)
+    h.observe(0.05)
+    h.observe(0.5)
+    h.observe(5)
+    text = metrics.render()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 3' in text
+    assert 'test_duration_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_duration_seconds_bucket{le="1"} 2' in text
+    assert 'test_duration_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_duration_seconds_count 3" in text
+    assert metrics.counter("test_events_total", "Test events.", labels=("kind",)) is c
+    with pytest.raises(ValueError):
+        metrics.gauge("test_events_total", "Clash.")
+
+
+def test_snapshots_from_other_workers_are_merged(tmp_path, settings):
+    settings.METRICS_DIR = str(tmp_path)
+    c = metrics.counter("test_merged_total", "Merged across workers.")
+    g = metrics.gauge("test_in_flight", "Per-worker gauge.")
+    c.inc(2)
+    g.set(1)
+    # A worker that has exited: its counters still count, its gauges do not.
+    dead_pid = 2**22 + 7
+    (tmp_path / f"metrics_{dead_pid}.json").write_text(
+        json.dumps(
+            {
+                "pid": dead_pid,
+                "metrics": {
+                    "test_merged_total": {
+                        "kind": "counter",
+                        "help": "Merged across workers.",
+                        "labels": [],
+                        "samples": [[[], 5.0]],
+                    },
+                    "test_in_flight": {
+                        "kind": "gauge",
+                        "help": "Per-worker gauge.",
+                        "labels": [],
+                        "samples": [[[], 9.0]],
+                    },
+                },
+            }
+        )
+    )
+    text = metrics.render()
+    assert "test_merged_total 7" in text
+    assert "test_in_flight{pid=" in text
+    assert f'pid="{dead_pid}"' not in text
+
+    metrics.flush()
+    assert list(tmp_path.glob("metrics_*.json"))
+
+
+def _counter_snapshot(pid, value):
+    return json.dumps(
+        {
+            "pid": pid,
+            "metrics": {
+                "test_folded_total": {
+                    "kind": "counter",
+                    "help": "Folded.",
+                    "labels": [],
+                    "samples": [[[], value]],
+                }
+            },
+        }
+    )
+
+
+def test_exited_workers_are_folded_into_one_file(tmp_path, settings):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics.counter("test_folded_total", "Folded.")
+    for pid in (2**22 + 11, 2**22 + 13):
+        (tmp_path / f"metrics_{pid}.json").write_text(_counter_snapshot(pid, 3.0))
+
+    assert "test_folded_total 6" in metrics.render()
+    assert [p.name for p in tmp_path.glob("metrics_*.json")] == [metrics.AGGREGATE_FILE]
+    # Folding twice must not count the dead workers again.
+    assert "test_folded_total 6" in metrics.render()
+
+    (tmp_path / f"metrics_{2**22 + 17}.json").write_text(
+        _counter_snapshot(2**22 + 17, 1.0)
+    )
+    assert "test_folded_total 7" in metrics.render()
+
+
+def test_reused_pid_keeps_the_previous_owners_totals(tmp_path, settings, monkeypatch):
+    settings.METRICS_DIR = str(tmp_path)
+    monkeypatch.setattr(metrics, "_flushed", False)
+    c = metrics.counter("test_folded_total", "Folded.")
+    c.reset()
+    c.inc()
+    # Left behind by an exited process that had this process's pid.
+    (tmp_path / f"metrics_{os.getpid()}.json").write_text(
+        _counter_snapshot(os.getpid(), 4.0)
+    )
+
+    metrics.flush()
+    metrics.flush()
+
+    assert "test_folded_total 5" in metrics.render()
+
+
+def test_exit_flush_is_registered_by_the_first_request(monkeypatch):
+    registered = []
+    monkeypatch.setattr(metrics, "_exit_flush", False)
+    monkeypatch.setattr(metrics.atexit, "register", registered.append)
+
+    metrics.maybe_flush()
+    metrics.maybe_flush()
+
+    assert registered == [metrics.flush]
+
+
+@pytest.mark.django_db
+def test_services_are_instrumented(item_factory):
+    before = purchase_order_service.CREATE_PO_SECONDS._default.snapshot()["counts"]
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Rice")
+    purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today()},
+        [{"item_id": item.pk, "quantity_ordered": 1, "unit_price": 1}],
+    )
+    after = purchase_order_service.CREATE_PO_SECONDS._default.snapshot()["counts"]
+    assert sum(after) == sum(before) + 1
+
+    cached = supabase_cache.get_cached(lambda: 1, 60, name="test")
+    cached()
+    cached()
+    text = metrics.render()
+    assert 'inventory_cache_requests_total{cache="test",result="hit"} 1' in text
+    assert 'inventory_cache_requests_total{cache="test",result="miss"} 1' in text
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_open_to_local_network_only(client):
+    client.logout()
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    resp = client.get("/metrics", REMOTE_ADDR="203.0.113.5")
+    assert resp.status_code == 302
+    # A public client behind the local reverse proxy is not local.
+    resp = client.get("/metrics", HTTP_X_FORWARDED_FOR="203.0.113.5, 10.0.0.2")
+    assert resp.status_code == 302
@@ -0,0 +1,116 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+
+from core import profiling
+from core.middleware import ProfilingMiddleware
+
+
+@pytest.fixture
+def profile_dir(tmp_path, settings):
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_KEEP = 3
+    return tmp_path
+
+
+def _busy():
+    return sum(i * i for i in range(2000))
+
+
+def test_ring_keeps_newest_profiles(profile_dir):
+    ids = []
+    for _ in range(5):
+        profiler = profiling.start()
+        _busy()
+        ids.append(profiling.save(profiler, kind="test", label="busy"))
+    assert len(list(profile_dir.glob("*.prof"))) == 3
+    assert [p["id"] for p in profiling.list_profiles()] == sorted(ids)[-3:][::-1]
+
+
+def test_speedscope_export_has_weighted_stacks(profile_dir):
+    profiler = profiling.start()
+    _busy()
+    profile_id = profiling.save(profiler, kind="test", label="busy")
+    data = profiling.to_speedscope(profiling.stats_path(profile_id))
+    profile = data["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) > 0
+    names = {f["name"] for f in data["shared"]["frames"]}
+    assert "_busy" in names
+    assert profiling.stats_path("../../etc/passwd") is None
+
+
+@pytest.mark.django_db
+def test_staff_request_flag_captures_profile(client, profile_dir):
+    resp = client.get("/healthz", {"_profile": "1"})
+    profile_id = resp["X-Profile-Id"]
+    [meta] = profiling.list_profiles()
+    assert meta["id"] == profile_id
+    assert meta["trigger"] == "requested"
+
+    resp = client.get("/admin/profiles/")
+    assert profile_id in resp.content.decode()
+    resp = client.get(f"/admin/profiles/{profile_id}.speedscope")
+    assert json.loads(resp.content)["profiles"][0]["type"] == "sampled"
+    resp = client.get(f"/admin/profiles/{profile_id}.prof")
+    assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+def test_non_staff_cannot_request_profiles(client, profile_dir, django_user_model):
+    user = django_user_model.objects.create_user("clerk", password="x")
+    client.force_login(user)
+    resp = client.get("/healthz", HTTP_X_PROFILE="1")
+    assert "X-Profile-Id" not in resp
+    assert client.get("/admin/profiles/").status_code == 302
+
+
+def test_unflagged_async_requests_stay_on_the_event_loop(profile_dir):
+    async def view(request):
+        return HttpResponse("ok")
+
+    middleware = ProfilingMiddleware(view)
+    request = AsyncRequestFactory().get("/healthz")
+    with patch("core.middleware.sync_to_async", side_effect=AssertionError):
+        response = async_to_sync(middleware)(request)
+    assert "X-Profile-Id" not in response
+
+
+@pytest.mark.django_db
+def test_staff_flag_captures_profile_under_asgi(async_client, profile_dir):
+    async_client.force_login(get_user_model().objects.get(username="admin"))
+    resp = async_to_sync(async_client.get)("/healthz", headers={"X-Profile": "1"})
+    [meta] = profiling.list_profiles()
+    assert resp["X-Profile-Id"] == meta["id"]
+    assert meta["user"] == "admin"
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_sampled(profile_dir, settings):
+    from django.test import Client
+
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    settings.PROFILING_SLOW_MS = 0.001
+    Client().get("/healthz")
+    settings.PROFILING_SLOW_MS = 100_000
+    Client().get("/healthz")
+    [meta] = profiling.list_profiles()
+    assert meta["trigger"] == "slow"
+    assert meta["user"] == ""
+
+
+@pytest.mark.django_db
+def test_command_profile_flag(profile_dir):
+    err = io.StringIO()
+    call_command("reconcile_po_totals", profile=True, stdout=io.StringIO(), stderr=err)
+    assert "Profile saved" in err.getvalue()
+    [meta] = profiling.list_profiles()
+    assert meta["kind"] == "command"
+    assert meta["label"] == "reconcile_po_totals"
@@ -5,6 +5,8 @@ import pytest
 from inventory.models import (
     GoodsReceivedNote,
     GRNItem,
+    Indent,
+    IndentItem,
     PurchaseOrder,
     PurchaseOrderItem,
     Supplier,
@@ -49,7 +51,157 @@ def test_get_orders_progress(item_factory):
         quantity_received=4,
         unit_price_at_receipt=1,
     )
+    # Rows written directly bypass the services, so the stored totals lag
+    # until they are reconciled.
+    fields = {m["field"] for m in purchase_order_service.find_total_mismatches([po.pk])}
+    assert fields == {
+        "received_qty",
+        "received_value",
+        "ordered_total",
+        "received_total",
+    }
+    purchase_order_service.recalculate_po_totals([po.pk])
+    assert purchase_order_service.find_total_mismatches([po.pk]) == []
     progress = purchase_order_service.get_orders_progress([po.pk])
     assert progress[po.pk]["ordered_total"] == 10
     assert progress[po.pk]["received_total"] == 4
     assert progress[po.pk]["percent"] == 40
+
+
+@pytest.mark.django_db
+def test_create_pos_bulk_validates_references(item_factory):
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Widget")
+    success, msg, po_ids = purchase_order_service.create_pos_bulk(
+        [
+            (
+                {"supplier_id": supplier.pk, "order_date": date.today()},
+                [{"item_id": item.item_id, "quantity_ordered": 1, "unit_price": 1}],
+            ),
+            (
+                {"supplier_id": supplier.pk, "order_date": date.today()},
+                [{"item_id": 9999, "quantity_ordered": 1, "unit_price": 1}],
+            ),
+        ]
+    )
+    assert not success
+    assert "9999" in msg
+    assert po_ids == []
+    assert PurchaseOrder.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_pos_from_indents_groups_by_last_supplier(
+    item_factory, django_assert_max_num_queries
+):
+    veg = Supplier.objects.create(name="Veg Co")
+    dairy = Supplier.objects.create(name="Dairy Co")
+    onion = item_factory(name="Onion")
+    milk = item_factory(name="Milk")
+    salt = item_factory(name="Salt")
+    for supplier, item, price in ((veg, onion, 2), (dairy, milk, 3)):
+        po = PurchaseOrder.objects.create(supplier=supplier, order_date=date.today())
+        PurchaseOrderItem.objects.create(
+            purchase_order=po, item=item, quantity_ordered=1, unit_price=price
+        )
+    indent_ids = []
+    for i in range(20):
+        indent = Indent.objects.create(mrn=f"MRN-{i}", status="APPROVED")
+        indent_ids.append(indent.pk)
+        IndentItem.objects.create(indent=indent, item=onion, requested_qty=2)
+        IndentItem.objects.create(
+            indent=indent, item=milk, requested_qty=5, issued_qty=1
+        )
+    # Salt has never been ordered, so this indent waits for a supplier.
+    mixed = Indent.objects.create(mrn="MRN-S", status="APPROVED")
+    IndentItem.objects.create(indent=mixed, item=onion, requested_qty=3)
+    IndentItem.objects.create(indent=mixed, item=salt, requested_qty=1)
+    pending = Indent.objects.create(mrn="MRN-P", status="PENDING")
+    IndentItem.objects.create(indent=pending, item=onion, requested_qty=100)
+
+    with django_assert_max_num_queries(20):
+        success, msg, po_ids = purchase_order_service.create_pos_from_indents(
+            indent_ids + [mixed.pk, pending.pk]
+        )
+    assert success, msg
+    assert "1 item(s) have no supplier" in msg
+    assert "1 indent(s) left APPROVED" in msg
+    assert len(po_ids) == 2
+    lines = {
+        line.item_id: line
+        for line in PurchaseOrderItem.objects.filter(purchase_order_id__in=po_ids)
+    }
+    assert lines[onion.item_id].quantity_ordered == 40
+    assert lines[onion.item_id].purchase_order.supplier_id == veg.pk
+    assert lines[onion.item_id].unit_price == 2
+    assert lines[milk.item_id].quantity_ordered == 80
+    assert lines[milk.item_id].purchase_order.supplier_id == dairy.pk
+    assert salt.item_id not in lines
+    assert set(
+        Indent.objects.filter(pk__in=indent_ids).values_list("status", flat=True)
+    ) == {"PROCESSING"}
+    mixed.refresh_from_db()
+    assert mixed.status == "APPROVED"
+    pending.refresh_from_db()
+    assert pending.status == "PENDING"
+
+    # Once salt has a supplier the held indent is ordered in full.
+    success, msg, po_ids = purchase_order_service.create_pos_from_indents(
+        indent_ids + [mixed.pk], supplier_overrides={salt.item_id: veg.pk}
+    )
+    assert success, msg
+    assert dict(
+        PurchaseOrderItem.objects.filter(purchase_order_id__in=po_ids).values_list(
+            "item_id", "quantity_ordered"
+        )
+    ) == {onion.item_id: 3, salt.item_id: 1}
+    mixed.refresh_from_db()
+    assert mixed.status == "PROCESSING"
+
+
+@pytest.mark.django_db
+def test_create_pos_from_indents_prices_overrides_from_their_supplier(item_factory):
+    veg = Supplier.objects.create(name="Veg Co")
+    market = Supplier.objects.create(name="Market")
+    onion = item_factory(name="Onion")
+    leek = item_factory(name="Leek")
+    for supplier, item, price, day in (
+        (market, onion, 5, 1),
+        (veg, onion, 2, 2),
+        (veg, leek, 4, 2),
+    ):
+        po = PurchaseOrder.objects.create(
+            supplier=supplier, order_date=date(2024, 1, day)
+        )
+        PurchaseOrderItem.objects.create(
+            purchase_order=po, item=item, quantity_ordered=1, unit_price=price
+        )
+    indent = Indent.objects.create(mrn="MRN-1", status="APPROVED")
+    IndentItem.objects.create(indent=indent, item=onion, requested_qty=2)
+    IndentItem.objects.create(indent=indent, item=leek, requested_qty=1)
+
+    success, msg, po_ids = purchase_order_service.create_pos_from_indents(
+        [indent.pk],
+        supplier_overrides={onion.item_id: market.pk, leek.item_id: market.pk},
+    )
+
+    assert success, msg
+    [po] = PurchaseOrder.objects.filter(pk__in=po_ids)
+    assert po.supplier_id == market.pk
+    prices = dict(po.purchaseorderitem_set.values_list("item_id", "unit_price"))
+    assert prices == {onion.item_id: 5, leek.item_id: 0}
+    assert f"ordered at 0: [{leek.item_id}]" in msg
+
+
+@pytest.mark.django_db
+def test_create_pos_from_indents_needs_a_supplier(item_factory):
+    salt = item_factory(name="Salt")
+    indent = Indent.objects.create(mrn="MRN-1", status="APPROVED")
+    IndentItem.objects.create(indent=indent, item=salt, requested_qty=1)
+
+    success, msg, po_ids = purchase_order_service.create_pos_from_indents([indent.pk])
+
+    assert not success
+    assert str(salt.item_id) in msg
+    indent.refresh_from_db()
+    assert indent.status == "APPROVED"
@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import query_budget
+from core.middleware import QueryBudgetMiddleware
+from inventory.models import Item
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = query_budget.fingerprint('SELECT * FROM "items" WHERE "id" IN (%s, %s, %s)')
+    b = query_budget.fingerprint('SELECT *  FROM "items" WHERE "id" IN (%s, %s)')
+    assert a == b
+    assert query_budget.fingerprint("SELECT 1 LIMIT 21") == "SELECT N LIMIT N"
+
+
+@pytest.mark.django_db
+def test_server_timing_header_reports_queries(client, settings):
+    settings.QUERY_BUDGET_SERVER_TIMING = True
+    resp = client.get("/api/items/")
+    assert resp.status_code == 200
+    assert resp["Server-Timing"].startswith("db;dur=")
+    assert "queries" in resp["Server-Timing"]
+    assert "total;dur=" in resp["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_server_timing_header_is_off_outside_debug(client, settings):
+    del settings.QUERY_BUDGET_SERVER_TIMING
+    settings.DEBUG = False
+    assert "Server-Timing" not in client.get("/api/items/").headers
+
+
+def _n_plus_one_view(request):
+    for item in Item.objects.all():
+        Item.objects.filter(pk=item.pk).exists()
+    return HttpResponse("ok")
+
+
+def _run(view, settings, budget=None):
+    if budget is not None:
+        view = query_budget.query_budget(budget)(view)
+    settings.QUERY_BUDGET_REPEAT_THRESHOLD = 3
+    middleware = QueryBudgetMiddleware(lambda request: view(request))
+    request = RequestFactory().get("/loop/")
+    middleware.process_view(request, view, (), {})
+    return middleware(request)
+
+
+@pytest.mark.django_db
+def test_repeated_query_shape_is_logged(item_factory, settings, caplog):
+    for i in range(4):
+        item_factory(name=f"Item {i}")
+    with caplog.at_level(logging.WARNING, logger="core.query_budget"):
+        _run(_n_plus_one_view, settings)
+    assert any("Possible N+1" in r.getMessage() for r in caplog.records)
+    # No budget declared and under the default: nothing recorded.
+    assert query_budget.violations == []
+
+
+@pytest.mark.django_db
+def test_declared_budget_violation_is_recorded(item_factory, settings):
+    for i in range(4):
+        item_factory(name=f"Item {i}")
+    _run(_n_plus_one_view, settings, budget=2)
+    try:
+        [violation] = query_budget.violations
+        assert violation["path"] == "/loop/"
+        assert violation["budget"] == 2
+        assert violation["count"] == 5
+        assert violation["repeated"][0][1] == 4
+    finally:
+        query_budget.violations.clear()
@@ -0,0 +1,106 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from inventory.models import (
+    GoodsReceivedNote,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    StockTransaction,
+    Supplier,
+)
+from inventory.services import reorder_planner
+
+TODAY = datetime.date(2024, 3, 31)
+
+
+def _issue(item, qty, day):
+    tx = StockTransaction.objects.create(
+        item=item, quantity_change=-qty, transaction_type="ISSUE"
+    )
+    StockTransaction.objects.filter(pk=tx.pk).update(
+        transaction_date=datetime.datetime.combine(
+            day, datetime.time(12), tzinfo=datetime.timezone.utc
+        )
+    )
+
+
+@pytest.fixture
+def catalogue(item_factory):
+    supplier = Supplier.objects.create(name="Mill")
+    flour = item_factory(name="Flour", current_stock=20, reorder_point=0)
+    salt = item_factory(name="Salt", current_stock=5000, reorder_point=10)
+    yeast = item_factory(name="Yeast", current_stock=1, reorder_point=5)
+    item_factory(name="Retired", current_stock=0, reorder_point=50, is_active=False)
+    # Flour: 90 units a day, ~80% of usage; salt: one large, well covered
+    # issue; yeast was never ordered, so it has no supplier.
+    for offset in range(90):
+        _issue(flour, 90, TODAY - datetime.timedelta(days=offset))
+    _issue(salt, 2100, TODAY)
+    old = PurchaseOrder.objects.create(
+        supplier=supplier, order_date=datetime.date(2024, 1, 1), status="COMPLETE"
+    )
+    for item in (flour, salt):
+        PurchaseOrderItem.objects.create(
+            purchase_order=old,
+            item=item,
+            quantity_ordered=10,
+            unit_price=Decimal("2.50"),
+            received_qty=10,
+        )
+    GoodsReceivedNote.objects.create(
+        purchase_order=old, supplier=supplier, received_date=datetime.date(2024, 1, 4)
+    )
+    return supplier, flour, salt, yeast
+
+
+@pytest.mark.django_db
+def test_plan_reorders_uses_demand_lead_time_and_open_orders(catalogue):
+    supplier, flour, salt, yeast = catalogue
+
+    plan = {s["item_id"]: s for s in reorder_planner.plan_reorders(TODAY)}
+
+    assert set(plan) == {flour.pk, yeast.pk}
+    line = plan[flour.pk]
+    assert line["abc_class"] == "A"
+    assert line["lead_time_days"] == 3
+    # Constant demand: level = 3 days x 90; order up to that plus 7 days.
+    assert line["reorder_level"] == 270
+    assert line["quantity"] == 270 + 7 * 90 - 20
+    assert (line["supplier_id"], line["unit_price"]) == (supplier.pk, Decimal("2.50"))
+    assert plan[yeast.pk]["supplier_id"] is None
+    assert plan[yeast.pk]["quantity"] == 4
+
+
+@pytest.mark.django_db
+def test_draft_purchase_orders_groups_by_supplier_and_is_idempotent(
+    catalogue, django_assert_max_num_queries
+):
+    supplier, flour, _, yeast = catalogue
+
+    with django_assert_max_num_queries(20):
+        success, msg, po_ids = reorder_planner.draft_purchase_orders(order_date=TODAY)
+
+    assert success, msg
+    assert str(yeast.pk) in msg
+    (po,) = PurchaseOrder.objects.filter(pk__in=po_ids)
+    assert (po.supplier_id, po.status) == (supplier.pk, "DRAFT")
+    assert po.expected_delivery_date == TODAY + datetime.timedelta(days=3)
+    assert list(
+        po.purchaseorderitem_set.values_list("item_id", "quantity_ordered")
+    ) == [(flour.pk, Decimal("880"))]
+
+    # The draft now covers the shortfall, so a second run orders nothing more.
+    assert [s["item_id"] for s in reorder_planner.plan_reorders(TODAY)] == [yeast.pk]
+
+
+@pytest.mark.django_db
+def test_draft_reorder_pos_command_dry_run(catalogue, capsys):
+    call_command("draft_reorder_pos", "--dry-run", "--order-date", "2024-03-31")
+
+    out = capsys.readouterr().out
+    assert "Flour [A]: order 880" in out
+    assert "2 item(s) to reorder." in out
+    assert not PurchaseOrder.objects.filter(status="DRAFT").exists()
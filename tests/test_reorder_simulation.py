@@ -0,0 +1,71 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from inventory.models import StockTransaction
+from inventory.services import reorder_simulation
+
+
+def test_steady_demand_is_covered_by_a_timely_reorder():
+    demand = np.ones((1, 30))
+
+    result = reorder_simulation.simulate(
+        [10], demand, [5, 0], [2, 3], horizon=30, draws=5, order_days=7, seed=1
+    )
+
+    assert result.stockout_probability.tolist() == [[0.0], [1.0]]
+    # Ordered when stock reaches 5; 7 units arrive two days later.
+    assert result.mean_stock[0, 0, :9].tolist() == [10, 9, 8, 7, 6, 5, 4, 10, 9]
+    assert result.mean_stock[0].min() == 4
+
+
+def test_scenarios_share_demand_draws():
+    rng = np.random.default_rng(0)
+    demand = rng.poisson(3, size=(50, 90))
+    points, leads = reorder_simulation.scenario_grid([0, 10, 20, 40], [2, 7])
+
+    result = reorder_simulation.simulate(
+        np.full(50, 30), demand, points, leads, unit_costs=np.full(50, 365), seed=0
+    )
+
+    assert result.stockout_probability.shape == (8, 50)
+    by_point = result.stockout_probability.mean(axis=1).reshape(2, 4)
+    cost = result.holding_cost.mean(axis=1).reshape(2, 4)
+    # Higher reorder points trade stockouts for holding cost at each lead time.
+    assert (np.diff(by_point, axis=1) <= 0).all()
+    assert (np.diff(cost, axis=1) >= 0).all()
+    assert (by_point[1] >= by_point[0]).all()
+
+
+def test_lead_times_must_be_positive():
+    with pytest.raises(ValueError):
+        reorder_simulation.simulate([1], np.ones((1, 5)), [1], [0])
+
+
+@pytest.mark.django_db
+def test_demand_history_reads_outgoing_movements_in_one_query(
+    item_factory, django_assert_num_queries
+):
+    flour, sugar = item_factory(name="Flour"), item_factory(name="Sugar")
+    end = datetime.date(2024, 1, 10)
+    for item, qty, day in [
+        (flour, -2, 10),
+        (flour, -1, 10),
+        (flour, 5, 10),
+        (sugar, -4, 8),
+        (sugar, -9, 1),
+    ]:
+        tx = StockTransaction.objects.create(
+            item=item, quantity_change=qty, transaction_type="ISSUE"
+        )
+        StockTransaction.objects.filter(pk=tx.pk).update(
+            transaction_date=datetime.datetime(
+                2024, 1, day, 12, tzinfo=datetime.timezone.utc
+            )
+        )
+
+    with django_assert_num_queries(1):
+        demand = reorder_simulation.demand_history([flour.pk, sugar.pk], 5, end)
+
+    assert demand.tolist() == [[0, 0, 0, 0, 3], [0, 0, 4, 0, 0]]
@@ -0,0 +1,92 @@
+import re
+from datetime import date
+from pathlib import Path
+
+import pytest
+from django.db import connection
+
+from inventory.models import DocumentSequence, PurchaseOrder, Supplier
+from inventory.services import purchase_order_service, sequence_service
+
+
+@pytest.mark.django_db
+def test_next_number_increments_per_prefix():
+    assert sequence_service.next_number("PO") == "PO-0001"
+    assert sequence_service.next_number("PO") == "PO-0002"
+    assert sequence_service.next_number("GRN") == "GRN-0001"
+
+
+@pytest.mark.django_db
+def test_per_year_sequences_reset():
+    first = sequence_service.next_number(
+        "PO", on_date=date(2025, 12, 31), per_year=True
+    )
+    second = sequence_service.next_number("PO", on_date=date(2026, 1, 1), per_year=True)
+    assert first == "PO-2025-0001"
+    assert second == "PO-2026-0001"
+    assert DocumentSequence.objects.filter(prefix="PO").count() == 2
+
+
+@pytest.mark.django_db
+def test_reserve_numbers_allocates_batch(django_assert_max_num_queries):
+    sequence_service.next_number("GRN")
+    with django_assert_max_num_queries(4):
+        numbers = sequence_service.reserve_numbers("GRN", 3)
+    assert numbers == ["GRN-0002", "GRN-0003", "GRN-0004"]
+    assert sequence_service.next_number("GRN") == "GRN-0005"
+
+
+@pytest.mark.django_db
+def test_create_po_stores_number(item_factory, settings):
+    settings.DOCUMENT_NUMBER_PER_YEAR = False
+    supplier = Supplier.objects.create(name="Vendor")
+    item = item_factory(name="Widget")
+    ok, msg, po_id = purchase_order_service.create_po(
+        {"supplier_id": supplier.pk, "order_date": date.today()},
+        [{"item_id": item.item_id, "quantity_ordered": 1, "unit_price": 1}],
+    )
+    assert ok, msg
+    po = PurchaseOrder.objects.get(pk=po_id)
+    assert po.po_number == "PO-0001"
+    assert purchase_order_service.get_po_by_id(po_id)["po_number"] == "PO-0001"
+
+
+def _backfill_statements():
+    """Return the legacy-number UPDATEs of 002_document_sequences.sql for SQLite."""
+    path = (
+        Path(__file__).resolve().parents[1] / "db/migrations/002_document_sequences.sql"
+    )
+    sql = path.read_text()
+    statements = re.findall(r"^UPDATE .*?;", sql, flags=re.S | re.M)
+    return [
+        re.sub(r"(\w+)::text", r"CAST(\1 AS text)", stmt.replace("public.", ""))
+        for stmt in statements
+    ]
+
+
+def _pg_lpad(value, length, fill):
+    # PostgreSQL's lpad truncates strings longer than ``length``.
+    return (
+        value[:length] if len(value) >= length else fill * (length - len(value)) + value
+    )
+
+
+@pytest.mark.django_db
+def test_legacy_number_backfill_matches_format_number():
+    supplier = Supplier.objects.create(name="Vendor")
+    for po_id in (7, 1234, 12345):
+        PurchaseOrder.objects.create(
+            po_id=po_id, supplier=supplier, order_date=date(2024, 1, 1)
+        )
+    connection.ensure_connection()
+    connection.connection.create_function("lpad", 3, _pg_lpad)
+
+    with connection.cursor() as cursor:
+        for statement in _backfill_statements():
+            cursor.execute(statement)
+
+    numbers = dict(PurchaseOrder.objects.values_list("po_id", "po_number"))
+    assert numbers == {
+        pk: sequence_service.format_number("PO", pk) for pk in (7, 1234, 12345)
+    }
+    assert numbers[12345] == "PO-12345"
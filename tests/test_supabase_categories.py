@@ -77,7 +77,7 @@ def test_load_categories_supabase_exception(monkeypatch):
 
     class FailingClient(DummyClient):
         def table(self, name):
-            raise supabase_categories.SupabaseException("fail")
+            raise supabase_client.SupabaseException("fail")
 
     monkeypatch.setattr(
         supabase_client, "create_client", lambda u, k: FailingClient()
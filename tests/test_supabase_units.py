@@ -50,7 +50,7 @@ def test_load_units_supabase_exception(monkeypatch):
 
     class FailingClient(DummyClient):
         def table(self, name):
-            raise supabase_units.SupabaseException("fail")
+            raise supabase_client.SupabaseException("fail")
 
     monkeypatch.setattr(supabase_client, "create_client", lambda u, k: FailingClient())
     units = supabase_units._load_units_from_supabase()
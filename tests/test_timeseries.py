@@ -0,0 +1,81 @@
+import datetime
+import math
+
+import pytest
+from django.urls import reverse
+
+from inventory.models import StockTransaction
+from inventory.services import timeseries
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    points = [(x, math.sin(x / 50)) for x in range(5000)]
+    points[2500] = (2500, 40.0)
+
+    kept = timeseries.lttb(points, 200)
+
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == 4999
+    assert kept == sorted(kept)
+    assert 2500 in kept
+
+
+def test_lttb_returns_short_series_unchanged():
+    assert timeseries.lttb([(0, 1), (1, 2), (2, 3)], 10) == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "days, bucket", [(30, "day"), (4000, "day"), (4001, "week"), (40000, "month")]
+)
+def test_choose_bucket_picks_finest_bucket_within_budget(days, bucket):
+    start = datetime.date(2000, 1, 1)
+    end = start + datetime.timedelta(days=days - 1)
+    assert timeseries.choose_bucket(start, end, max_points=1000) == bucket
+
+
+def _ledger(item, start, days):
+    txs = StockTransaction.objects.bulk_create(
+        StockTransaction(item=item, quantity_change=1, transaction_type="RECEIVING")
+        for _ in range(days)
+    )
+    for offset, tx in enumerate(txs):
+        StockTransaction.objects.filter(pk=tx.pk).update(
+            transaction_date=datetime.datetime.combine(
+                start + datetime.timedelta(days=offset // 2),
+                datetime.time(12),
+                tzinfo=datetime.timezone.utc,
+            )
+        )
+
+
+@pytest.mark.django_db
+def test_bucketed_series_sums_per_day_and_downsamples(item_factory):
+    item = item_factory(name="Flour")
+    _ledger(item, datetime.date(2024, 1, 1), 60)
+    qs = StockTransaction.objects.all()
+
+    daily = timeseries.bucketed_series(qs, "transaction_date", "quantity_change")
+    assert daily.bucket == "day"
+    assert len(daily.labels) == 30
+    assert daily.labels[0] == "2024-01-01"
+    assert set(daily.values) == {2.0}
+
+    thinned = timeseries.bucketed_series(
+        qs, "transaction_date", "quantity_change", max_points=10
+    )
+    assert thinned.bucket == "day"
+    assert len(thinned.labels) == 10
+    assert thinned.labels[0] == "2024-01-01" and thinned.labels[-1] == "2024-01-30"
+
+
+@pytest.mark.django_db
+def test_history_chart_is_bucketed(client, item_factory):
+    item = item_factory(name="Flour")
+    _ledger(item, datetime.date(2024, 1, 1), 10)
+
+    resp = client.get(reverse("history_reports"))
+
+    assert resp.status_code == 200
+    assert resp.context["chart_bucket"] == "day"
+    assert resp.context["chart_labels"] == [f"2024-01-0{day}" for day in range(1, 6)]
+    assert resp.context["chart_data"] == [2.0] * 5
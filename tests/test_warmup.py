@@ -0,0 +1,65 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from django.template import engines
+
+from core import warmup
+from inventory.services import supabase_client
+
+CONFIG = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+class DummyClient:
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def execute(self):
+        return type("Resp", (), {"data": []})()
+
+
+@pytest.mark.django_db
+def test_warm_up_compiles_templates_and_drops_supabase_client(monkeypatch):
+    monkeypatch.setattr(supabase_client, "_client", DummyClient())
+    results = warmup.warm_up()
+    assert results["urlconf"] > 0
+    assert results["models"] > 0
+    assert results["templates"] > 0
+    assert "supabase" in results
+    assert supabase_client._client is None
+
+    loader = engines["django"].engine.template_loaders[0]
+    assert any("core/home.html" in key for key in loader.get_template_cache)
+
+
+def test_warm_up_survives_failing_step(monkeypatch):
+    def broken():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(warmup, "STEPS", {"broken": broken, "ok": lambda: 1})
+    assert warmup.warm_up() == {"ok": 1}
+
+
+def test_gunicorn_config_from_environment(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("GUNICORN_PRELOAD", raising=False)
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "gthread")
+    config = runpy.run_path(str(CONFIG))
+    assert config["preload_app"] is True
+    assert config["threads"] == 4
+    assert config["workers"] == config["cpu_count"]() + 1
+    assert config["max_requests_jitter"] > 0
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "sync")
+    monkeypatch.setenv("GUNICORN_PRELOAD", "false")
+    config = runpy.run_path(str(CONFIG))
+    assert (config["workers"], config["threads"], config["preload_app"]) == (
+        3,
+        1,
+        False,
+    )
+    assert config["default_workers"]("sync", 2) == 5
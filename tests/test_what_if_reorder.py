@@ -5,17 +5,26 @@ from inventory.services import stock_service
 
 
 @pytest.mark.django_db
-def test_what_if_reorder_projection(client, item_factory):
+def test_what_if_reorder_projection(
+    client, item_factory, django_assert_max_num_queries
+):
     item = item_factory(current_stock=10, reorder_point=5)
     stock_service.record_stock_transaction(
         item_id=item.item_id,
-        quantity_change=5,
-        transaction_type="RECEIVING",
+        quantity_change=-2,
+        transaction_type="ISSUE",
     )
     url = reverse("what_if_reorder")
-    response = client.post(url, {"items": [item.item_id], "reorder_point": 3})
+    with django_assert_max_num_queries(6):
+        response = client.post(
+            url, {"items": [item.item_id], "reorder_point": 3, "lead_time_days": 2}
+        )
     assert response.status_code == 200
     item.refresh_from_db()
-    assert item.reorder_point == 3
-    expected = stock_service.get_stock_history(item.item_id)
-    assert response.context["projections"][0]["history"] == expected
+    assert item.reorder_point == 5
+    (projection,) = response.context["projections"]
+    assert projection["history"][0] == 8.0
+    assert len(projection["history"]) == 31
+    current, proposed = projection["scenarios"]
+    assert (current["reorder_point"], proposed["reorder_point"]) == (5.0, 3.0)
+    assert 0 <= proposed["stockout_probability"] <= 1
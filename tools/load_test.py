@@ -0,0 +1,267 @@
+"""Compare gunicorn setups under a closed-loop HTTP load.
+
+By default ``baseline`` and ``tuned`` are started in turn from the project
+root and measured with the same load:
+
+* ``baseline`` - plain ``gunicorn inventory_app.wsgi:application`` defaults
+  (one sync worker, no preload, no warm-up), as the Docker image used to run;
+* ``tuned`` - ``gunicorn.conf.py`` (preload, warm-up, CPU-based workers);
+* ``asgi`` - the same configuration serving the ASGI app with uvicorn
+  workers (``--variant asgi``, needs ``uvicorn-worker``).
+
+For each one the script reports the boot time, the latency of each page's
+first request (cold caches) and the throughput and latency percentiles of
+``--concurrency`` clients requesting ``--paths`` for ``--duration`` seconds.
+Pass ``--url`` to load an already running server instead.
+
+Usage::
+
+    python tools/load_test.py --duration 20 --concurrency 8
+    python tools/load_test.py --url http://localhost:8000 --user admin
+
+Only the standard library is used. The database configured through the
+environment must be migrated and contain the ``--user`` account (``admin`` /
+``admin`` is created by ``migrate``); seed it with ``seed_benchmark_data`` for
+realistic pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.cookiejar
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_PATHS = [
+    "/",
+    "/items/",
+    "/items/table/",
+    "/suppliers/table/",
+    "/stock-movements/",
+    "/dashboard/kpis/",
+]
+
+WSGI_APP = "inventory_app.wsgi:application"
+ASGI_APP = "inventory_app.asgi:application"
+CONFIG = str(ROOT / "gunicorn.conf.py")
+
+VARIANTS = {
+    # An empty config file stops gunicorn from picking up gunicorn.conf.py.
+    "baseline": ["-c", os.devnull, WSGI_APP],
+    "tuned": ["-c", CONFIG, WSGI_APP],
+    # Needs uvicorn-worker; same worker count as "tuned" for equal memory.
+    "asgi": ["-c", CONFIG, "-k", "uvicorn_worker.UvicornWorker", ASGI_APP],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Session:
+    """Cookie-aware opener logged in through the home page form."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.jar = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.jar)
+        )
+
+    def get(self, path: str, timeout: float = 30) -> int:
+        with self.opener.open(self.base_url + path, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+
+    def login(self, username: str, password: str) -> None:
+        with self.opener.open(self.base_url + "/", timeout=30) as resp:
+            page = resp.read().decode()
+        match = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page)
+        if not match:
+            raise SystemExit("No login form at / - is the user already logged in?")
+        data = urllib.parse.urlencode(
+            {
+                "csrfmiddlewaretoken": match.group(1),
+                "username": username,
+                "password": password,
+            }
+        ).encode()
+        request = urllib.request.Request(
+            self.base_url + "/", data=data, headers={"Referer": self.base_url + "/"}
+        )
+        with self.opener.open(request, timeout=30) as resp:
+            resp.read()
+        if not any(cookie.name == "sessionid" for cookie in self.jar):
+            raise SystemExit(f"Login as {username!r} failed")
+
+
+def _wait_until_up(base_url: str, proc: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/healthz", timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.05)
+    raise SystemExit(f"gunicorn did not answer within {timeout:.0f}s")
+
+
+def _cold(session: Session, paths) -> dict:
+    timings = {}
+    for path in paths:
+        started = time.perf_counter()
+        session.get(path)
+        timings[path] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def _load(session: Session, paths, concurrency: int, duration: float) -> dict:
+    latencies: list = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset: int) -> None:
+        local, failed, i = [], 0, offset
+        while time.perf_counter() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                session.get(path)
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                failed += 1
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / duration,
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+    }
+
+
+def run_variant(name: str, args, env) -> dict:
+    port = _free_port()
+    base_url = f"http://localhost:{port}"
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        *VARIANTS[name],
+        "--bind",
+        f"127.0.0.1:{port}",
+    ]
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True)
+    try:
+        boot = _wait_until_up(base_url, proc, args.boot_timeout)
+        result = measure(base_url, args)
+        result["boot"] = boot
+        return result
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=60)
+
+
+def measure(base_url: str, args) -> dict:
+    session = Session(base_url)
+    session.login(args.user, args.password)
+    cold = _cold(session, args.paths)
+    return {"cold": cold, **_load(session, args.paths, args.concurrency, args.duration)}
+
+
+def report(results: dict) -> None:
+    names = list(results)
+    width = max(12, *(len(n) for n in names))
+    print()
+    print("".ljust(28) + "".join(n.rjust(width) for n in names))
+
+    def row(label, values, fmt):
+        print(label.ljust(28) + "".join(fmt.format(v).rjust(width) for v in values))
+
+    if all("boot" in r for r in results.values()):
+        row("boot (s)", [r["boot"] for r in results.values()], "{:.2f}")
+    for path in next(iter(results.values()))["cold"]:
+        row(f"first {path} (ms)", [r["cold"][path] for r in results.values()], "{:.0f}")
+    row("requests", [r["requests"] for r in results.values()], "{}")
+    row("errors", [r["errors"] for r in results.values()], "{}")
+    row("throughput (req/s)", [r["rps"] for r in results.values()], "{:.1f}")
+    for key in ("mean", "p50", "p95", "p99"):
+        row(f"{key} (ms)", [r[key] for r in results.values()], "{:.1f}")
+    if len(results) == 2:
+        base, tuned = results.values()
+        if base["rps"]:
+            print(f"\nthroughput gain: {tuned['rps'] / base['rps']:.2f}x")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Load this running server instead.")
+    parser.add_argument(
+        "--variant",
+        action="append",
+        choices=sorted(VARIANTS),
+        help="Server setup to start (repeatable; default: baseline and tuned).",
+    )
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--boot-timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        report({"server": measure(args.url, args)})
+        return
+
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "inventory_app.settings")
+    results = {}
+    for name in args.variant or ["baseline", "tuned"]:
+        print(f"-- {name}", flush=True)
+        results[name] = run_variant(name, args, env)
+    report(results)
+
+
+if __name__ == "__main__":
+    main()